@@ -3,7 +3,7 @@ import sys
 # Ensure the path is correct for your project structure.
 sys.path.extend(
     ["C:/Projects/td-automated-text-layouts/scripts"])
-from helpers.find_transcript_groupings import find_grouping_times  # nopep8
+from helpers.show_inputs import align_and_wrap  # nopep8
 
 # -----------------
 # USER PARAMETERS
@@ -12,15 +12,14 @@ from helpers.find_transcript_groupings import find_grouping_times  # nopep8
 transcript_filename = "../input_files/attentionIsAllYouNeed1_transcript.json"
 groupings_filename = "../input_files/attentionIsAllYouNeed1_groupings.txt"
 
+# Caching and line wrapping (USE_ALIGNMENT_CACHE, USE_LAYOUT_CACHE, WRAP_ON_PIXEL_WIDTH,
+# LINE_BREAKING, MAX_CHARS_PER_LINE) are shared by every script, see helpers/show_inputs.py
+
 # Font styling
 font_name = "Bahnschrift"
 font_typeface = "Regular"
 font_size = 130
 
-# The maximum number of characters allowed on a single line of text.
-# The user must determine this value based on the chosen font and font size.
-MAX_CHARS_PER_LINE = 12
-
 # node layout spacing
 NODES_PER_ROW = 4
 BASE_SPACING = 200
@@ -37,20 +36,13 @@ LAST_FRAME = me.time.end  # Last frame of the project
 # -----------------
 
 
-def create_text_layouts():
+def create_text_layouts(alignment, all_lines):
     """
-    Reads a groupings file and creates a Base COMP with Text and Layout TOPs
-    for each line. 
+    Creates a Base COMP with Text and Layout TOPs for each grouping in the
+    alignment, with the lines all_lines wrapped it into (see align_and_wrap).
     """
-
-    # Open the word groupings file and process each line
-    with open(groupings_filename, 'r') as f:
-        group_lines = f.readlines()
-
-    for i, line in enumerate(group_lines):
-        line = line.strip()  # Remove any leading/trailing whitespace
-        if not line:
-            continue
+    for i, item in enumerate(alignment):
+        line = item['group'].strip()  # Remove any leading/trailing whitespace
 
         # Calculate the row and column for the current node.
         row = i // NODES_PER_ROW
@@ -66,17 +58,8 @@ def create_text_layouts():
         internal_node_x = 0
         internal_node_y = 0
 
-        # 2. Process the line to fit words within max_chars_per_line
-        words = line.split()
-        processed_lines = []
-        current_line = ""
-        for word in words:
-            if len(current_line) + len(word) + 1 > MAX_CHARS_PER_LINE:
-                processed_lines.append(current_line)
-                current_line = word
-            else:
-                current_line += f" {word}" if current_line else word
-        processed_lines.append(current_line)
+        # 2. Process the line to fit words within the Text TOP width
+        processed_lines = all_lines[i]
 
         # 3. Create a Text TOP for each processed line
         num_strings_in_list = len(processed_lines)
@@ -165,9 +148,7 @@ def setup_animation():
     main_switch.par.index.expr = f"op('{index_out.name}')['index']"
 
 
-def parse_transcript():
-    matched_timings = find_grouping_times(
-        groupings_filename, transcript_filename)
+def parse_transcript(alignment):
 
     anim = op('mainAnimation')
     keys_dat = anim.op('keys')
@@ -177,7 +158,10 @@ def parse_transcript():
     keys_dat.appendRow([1, 1, 0, 0, 0, "constant()", 0, 0])
 
     # Loop through groupings and add rows to keys DAT
-    for i, item in enumerate(matched_timings):
+    # The key value is the group's position, which is also its mainSwitch input
+    for i, item in enumerate(alignment):
+        if item["start_time"] is None:
+            continue  # Grouping was not found in the transcript
         start_frame = item["start_time"] * FPS
         keys_dat.appendRow([1, start_frame, i, 0, 0, "constant()", 0, 0])
 
@@ -198,14 +182,18 @@ old_components.extend(parent.findChildren(name="index_out"))
 for op_object in old_components:
     op_object.destroy()
 
+# Align the groupings with the transcript and wrap them once, every step below reuses them
+alignment, all_lines = align_and_wrap(
+    groupings_filename, transcript_filename, parent, font_name, font_typeface, font_size)
+
 # Run the main functions
 print("Creating text layouts...")
-create_text_layouts()
+create_text_layouts(alignment, all_lines)
 
 print("Setting up main animation switch...")
 setup_animation()
 
 print("Loading transcript into animation...")
-parse_transcript()
+parse_transcript(alignment)
 
 print("Script finished.")
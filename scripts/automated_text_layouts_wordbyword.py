@@ -3,7 +3,7 @@ import sys
 # Ensure the path is correct for your project structure.
 sys.path.extend(
     ["C:/Projects/td-automated-text-layouts/scripts"])
-from helpers.find_transcript_groupings import find_grouping_times  # nopep8
+from helpers.show_inputs import align_and_wrap  # nopep8
 
 # -----------------
 # USER PARAMETERS
@@ -12,15 +12,14 @@ from helpers.find_transcript_groupings import find_grouping_times  # nopep8
 transcript_filename = "../input_files/attentionIsAllYouNeed1_transcript.json"
 groupings_filename = "../input_files/attentionIsAllYouNeed1_groupings.txt"
 
+# Caching and line wrapping (USE_ALIGNMENT_CACHE, USE_LAYOUT_CACHE, WRAP_ON_PIXEL_WIDTH,
+# LINE_BREAKING, MAX_CHARS_PER_LINE) are shared by every script, see helpers/show_inputs.py
+
 # Font styling
 font_name = "Bahnschrift"
 font_typeface = "Regular"
 font_size = 130
 
-# The maximum number of characters allowed on a single line of text.
-# The user must determine this value based on the chosen font and font size.
-MAX_CHARS_PER_LINE = 12
-
 # node layout spacing
 NODES_PER_ROW = 4
 BASE_SPACING = 200
@@ -41,19 +40,13 @@ LAST_FRAME = me.time.end  # Last frame of the project
 # -----------------
 
 
-def create_text_layouts():
+def create_text_layouts(alignment, all_lines):
     """
-    Reads a groupings file and creates a Base COMP with Text and Layout TOPs
-    for each line. 
+    Creates a Base COMP with Text and Layout TOPs for each grouping in the
+    alignment, with the lines all_lines wrapped it into (see align_and_wrap).
     """
-    # Open the word groupings file and process each line
-    with open(groupings_filename, 'r') as f:
-        group_lines = f.readlines()
-
-    for i, line in enumerate(group_lines):
-        line = line.strip()  # Remove any leading/trailing whitespace
-        if not line:
-            continue
+    for i, item in enumerate(alignment):
+        line = item['group'].strip()  # Remove any leading/trailing whitespace
 
         animation_x = 0  # stays the same
         animation_y = 0  # increment by TOP_SPACING_Y * 2 for each group
@@ -83,17 +76,8 @@ def create_text_layouts():
         base.nodeX = col * BASE_SPACING
         base.nodeY = row * -BASE_SPACING  # build downwards
 
-        # --- Process the line to fit words within max_chars_per_line ---
-        words = line.split()
-        processed_lines = []
-        current_line = ""
-        for word in words:
-            if len(current_line) + len(word) + 1 > MAX_CHARS_PER_LINE:
-                processed_lines.append(current_line)
-                current_line = word
-            else:
-                current_line += f" {word}" if current_line else word
-        processed_lines.append(current_line)
+        # --- Process the line to fit words within the Text TOP width ---
+        processed_lines = all_lines[i]
 
         # --- Create Internal Network for each line ---
         all_layout_tops = []
@@ -236,13 +220,11 @@ def setup_animation():
     main_switch.par.index.expr = f"op('{index_out.name}')['index']"
 
 
-def create_animations():
+def create_animations(alignment):
     """
-    Parses the transcript to create all keyframe animations. The word-by-word
+    Uses the alignment to create all keyframe animations. The word-by-word
     animation is only created if ENABLE_WORD_BY_WORD_ANIMATION is True.
     """
-    matched_group_timings = find_grouping_times(groupings_filename, transcript_filename)  # nopep8
-
     # --- Populate the Main Animation for Group Switching ---
     anim = op('mainAnimation')
     keys_dat = anim.op('keys')
@@ -250,7 +232,10 @@ def create_animations():
     keys_dat.appendRow([1, 1, 0, 0, 0, "constant()", 0, 0]
                        )  # Append first row at Frame 1
     # Loop through groupings and add rows to keys DAT
-    for i, item in enumerate(matched_group_timings):
+    # The key value is the group's position, which is also its mainSwitch input
+    for i, item in enumerate(alignment):
+        if item["start_time"] is None:
+            continue  # Grouping was not found in the transcript
         start_frame = item["start_time"] * FPS
         keys_dat.appendRow([1, start_frame, i, 0, 0, "constant()", 0, 0])
     # Append last row at last_frame
@@ -260,32 +245,31 @@ def create_animations():
     if not ENABLE_WORD_BY_WORD_ANIMATION:
         print("Skipping word-by-word animation creation.")
         return
-    for i, group_data in enumerate(matched_group_timings):
+    for i, group_data in enumerate(alignment):
         group_comp = parent.op(f"group{i}")
-        if not group_comp:
+        if not group_comp or group_data["start_time"] is None:
             continue
 
-        text_tops = group_comp.findChildren(type=textTOP, name="text*")
-        for text_top in text_tops:
-            line_text = text_top.par.text.eval()
-            anim_op_name = text_top.name.replace("text", "word_anim")
-            word_anim = group_comp.op(anim_op_name)
-            if not word_anim:
-                continue
-
-            words_for_line = find_words_for_line(line_text, group_data)
-            num_words = len(words_for_line)
-            if num_words == 0:
-                continue
-
-            word_keys_dat = word_anim.op('keys')
+        # The matched words come in reading order, so hand them out line by line
+        word_timings = iter(group_data['words'])
+        j = 0
+        line_anim = group_comp.op(f"line_anim{j}")
+        while line_anim:
+            channels_dat = line_anim.op('channels')
+            word_keys_dat = line_anim.op('keys')
             word_keys_dat.clear(keepFirstRow=True)
-            word_keys_dat.appendRow([1, 1, 0, 0, 0, "constant()", 0, 0])
-            for j, word_info in enumerate(words_for_line):
-                start_frame = word_info['start_time'] * FPS
-                phase_value = (j + 1) / num_words
+            # One channel (word{k}_alpha) per word on the line, after the header row
+            for channel_id in range(1, channels_dat.numRows):
+                word_info = next(word_timings, None)
+                if word_info is None:
+                    break
+                start_frame = word_info['start'] * FPS
                 word_keys_dat.appendRow(
-                    [1, start_frame, phase_value, 0, 0, "constant()", 0, 0])
+                    [channel_id, 1, 0, 0, 0, "constant()", 0, 0])
+                word_keys_dat.appendRow(
+                    [channel_id, start_frame, 1, 0, 0, "constant()", 0, 0])
+            j += 1
+            line_anim = group_comp.op(f"line_anim{j}")
 
 
 # -----------------
@@ -301,14 +285,18 @@ old_components.extend(parent.findChildren(name="index_out"))
 for op_object in old_components:
     op_object.destroy()
 
+# Align the groupings with the transcript and wrap them once, every step below reuses them
+alignment, all_lines = align_and_wrap(
+    groupings_filename, transcript_filename, parent, font_name, font_typeface, font_size)
+
 # Run the main functions
 print("Creating text layouts...")
-create_text_layouts()
+create_text_layouts(alignment, all_lines)
 
 print("Setting up main animation switch...")
 setup_animation()
 
 print("Loading transcript into animation...")
-create_animations()
+create_animations(alignment)
 
 print("Script finished.")
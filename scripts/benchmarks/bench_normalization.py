@@ -0,0 +1,37 @@
+import os
+import string
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers.text_cleaning import clean_words  # nopep8
+from synthetic import synthetic_words  # nopep8
+
+# Size of the synthetic transcript
+NUM_WORDS = 1_000_000
+VOCABULARY_SIZE = 20_000
+
+
+def original_clean_word(word):
+    """
+    The per-word clean_word as it was before batch cleaning, kept here as the baseline.
+    """
+    word = word.replace("’", "'").replace("‘", "'").replace("`", "'")
+    translator = str.maketrans('', '', string.punctuation.replace("'", ""))
+    return word.lower().translate(translator)
+
+
+if __name__ == "__main__":
+    words = synthetic_words(NUM_WORDS, VOCABULARY_SIZE)
+
+    start = time.perf_counter()
+    baseline = [original_clean_word(word) for word in words]
+    baseline_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = clean_words(words)
+    batched_seconds = time.perf_counter() - start
+
+    print(f"{NUM_WORDS:,} words, {VOCABULARY_SIZE:,} word vocabulary")
+    print(f"per-word clean_word: {baseline_seconds:.3f} s")
+    print(f"clean_words batch:   {batched_seconds:.3f} s")
+    print(f"speedup:             {baseline_seconds / batched_seconds:.1f}x")
@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers.find_transcript_groupings import find_grouping_times_json, align_groupings  # nopep8
+from helpers.generate_animation_data import find_word_level_times  # nopep8
+from helpers.line_breaking import LineBreaker, GREEDY, BALANCED  # nopep8
+from helpers.batch_packing import pack_show, DEFAULT_CONTAINER_WIDTH, DEFAULT_CONTAINER_HEIGHT  # nopep8
+from helpers.packing import SKYLINE  # nopep8
+from helpers.text_cleaning import clean_words  # nopep8
+from helpers.layouts import LayoutSettings  # nopep8
+from helpers.show_plan import plan_show, plan_table_show  # nopep8
+from helpers.network_plan import plan_records, diff_plan  # nopep8
+from synthetic import WORD_LENGTHS, write_synthetic_inputs, synthetic_groupings, synthetic_words, stub_metrics  # nopep8
+
+# Transcript sizes, in words
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+QUICK_SIZES = [1_000, 10_000]
+VOCABULARY_SIZE = 20_000
+
+# Settings of the wrapping benchmarks, like the entry scripts' defaults
+MAX_CHARS_PER_LINE = 12
+FONT_SIZE = 130
+FPS = 60
+
+# A benchmark counts as a regression when it is this much slower than the baseline
+REGRESSION_THRESHOLD = 1.25
+# Timings shorter than this are too noisy to compare
+MIN_COMPARED_SECONDS = 0.01
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def original_wrap(text):
+    """
+    The character-count wrapping loop as it was before LineBreaker, kept here as the baseline.
+    """
+    processed_lines = []
+    current_line = ""
+    for word in text.split():
+        if len(current_line) + len(word) + 1 > MAX_CHARS_PER_LINE:
+            processed_lines.append(current_line)
+            current_line = word
+        else:
+            current_line += f" {word}" if current_line else word
+    processed_lines.append(current_line)
+    return processed_lines
+
+
+def run_timed(function, track_memory=True):
+    """
+    Calls function once for the time and, with track_memory, once more under
+    tracemalloc for the peak memory (tracing slows Python down, so the two
+    are never measured in the same call).
+
+    Returns:
+        tuple: (seconds, peak memory in bytes or None, the function's result).
+    """
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak = None
+    if track_memory:
+        tracemalloc.start()
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+def packing_density(packed_groups, container_width, container_height):
+    """
+    Returns the mean share of the container covered by the word boxes of a
+    packed group, and the share of words that were placed at all.
+    """
+    if not packed_groups:
+        return 0.0, 0.0
+    area = float(container_width * container_height)
+    densities = [sum(word['width'] * word['height'] for word in group['words']) / area
+                 for group in packed_groups]
+    placed = sum(len(group['words']) for group in packed_groups)
+    total = sum(len(group['group'].split()) for group in packed_groups)
+    return sum(densities) / len(densities), placed / total if total else 0.0
+
+
+class BenchmarkRun:
+    """
+    Collects the results of one run, keyed by "benchmark/words", and prints
+    them as they come in.
+    """
+
+    def __init__(self, track_memory=True):
+        self.track_memory = track_memory
+        self.results = {}
+
+    def time(self, name, num_words, function, density=None):
+        """
+        Times function over num_words words and records the result.
+
+        Args:
+            density (callable): For packing benchmarks, returns the (density, share
+                                placed) of the function's result (see packing_density).
+
+        Returns:
+            The function's result.
+        """
+        seconds, peak, result = run_timed(function, self.track_memory)
+        record = {
+            'words': num_words,
+            'seconds': seconds,
+            'words_per_second': num_words / seconds if seconds else None,
+            'peak_memory_mb': peak / 2 ** 20 if peak is not None else None,
+        }
+        if density is not None:
+            record['density'], record['placed'] = density(result)
+        self.results[f"{name}/{num_words}"] = record
+
+        line = f"{name:<40} {num_words:>10,} words {seconds:9.3f} s {record['words_per_second'] or 0:14,.0f} words/s"
+        if record['peak_memory_mb'] is not None:
+            line += f" {record['peak_memory_mb']:9.1f} MB"
+        if 'density' in record:
+            line += f"  density {record['density']:.1%}, placed {record['placed']:.1%}"
+        print(line)
+        return result
+
+
+def run_alignment_benchmarks(run, folder, num_words):
+    groupings_file_path, transcript_file_path = write_synthetic_inputs(folder, num_words, VOCABULARY_SIZE)
+    run.time("find_grouping_times_json", num_words,
+             lambda: find_grouping_times_json(groupings_file_path, transcript_file_path))
+    run.time("find_word_level_times", num_words,
+             lambda: find_word_level_times(groupings_file_path, transcript_file_path))
+    return align_groupings(groupings_file_path, transcript_file_path)
+
+
+def wrap_all(groups, measure, max_width, method):
+    """
+    Wraps every group with a new LineBreaker, so memoized lines never carry over between runs.
+    """
+    line_breaker = LineBreaker(measure, max_width, method)
+    return [line_breaker.wrap(group) for group in groups]
+
+
+def run_wrapping_benchmarks(run, alignment, num_words, metrics):
+    groups = [item['group'].strip() for item in alignment]
+    run.time("wrap/original_loop", num_words, lambda: [original_wrap(group) for group in groups])
+    for method in (GREEDY, BALANCED):
+        run.time(f"wrap/characters_{method}", num_words,
+                 lambda: wrap_all(groups, len, MAX_CHARS_PER_LINE, method))
+        run.time(f"wrap/pixels_{method}", num_words,
+                 lambda: wrap_all(groups, metrics.text_width, DEFAULT_CONTAINER_WIDTH, method))
+
+
+def run_plan_benchmarks(run, alignment, num_words, metrics):
+    """
+    Plans the whole network of a show (see helpers/show_plan.py), and
+    diffs it after an edit, which needs nothing from TouchDesigner.
+    """
+    all_lines = wrap_all([item['group'].strip() for item in alignment], metrics.text_width,
+                         DEFAULT_CONTAINER_WIDTH, BALANCED)
+    settings = LayoutSettings(metrics.font, metrics.typeface, metrics.size, DEFAULT_CONTAINER_WIDTH,
+                              DEFAULT_CONTAINER_HEIGHT, last_frame=FPS * 3600)
+    plan = run.time("plan/show", num_words, lambda: plan_show(alignment, all_lines, settings, "audio.mp3", FPS))
+    run.time("plan/table_show", num_words,
+             lambda: plan_table_show(alignment, all_lines, settings, "audio.mp3", FPS))
+    if not alignment:
+        return
+
+    # A rerun after changing the options of one grouping
+    previous = plan_records(plan)
+    edited = [dict(item) for item in alignment]
+    middle = edited[len(edited) // 2]
+    middle['options'] = list(middle.get('options') or []) + ["invert_colors"]
+    edited_plan = plan_show(edited, all_lines, settings, "audio.mp3", FPS)
+    run.time("plan/diff_one_edit", num_words, lambda: diff_plan(edited_plan, previous))
+
+
+def run_packing_benchmarks(run, num_words, metrics, strategies):
+    """
+    Packs every grouping of a synthetic show the way pack_words_generatively
+    does, with word sizes from stub glyph metrics instead of Text TOPs (see
+    batch_packing.pack_show), once per word length distribution.
+    """
+    for word_lengths in WORD_LENGTHS:
+        words = synthetic_words(num_words, VOCABULARY_SIZE, word_lengths=word_lengths)
+        groupings = synthetic_groupings(words)
+        for strategy in strategies:
+            run.time(f"pack/{strategy}_{word_lengths}", num_words,
+                     lambda: pack_show(groupings, metrics, strategy=strategy, workers=1),
+                     density=lambda packed: packing_density(packed, DEFAULT_CONTAINER_WIDTH,
+                                                            DEFAULT_CONTAINER_HEIGHT))
+
+
+def compare_with_baseline(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Prints how every benchmark compares to the same benchmark in a baseline
+    run and returns the names of the ones that got slower than threshold.
+    """
+    regressions = []
+    print(f"\nCompared with the baseline of {baseline['meta']['date']}:")
+    for name, record in results.items():
+        previous = baseline['benchmarks'].get(name)
+        if previous is None:
+            continue
+        ratio = record['seconds'] / previous['seconds'] if previous['seconds'] else float('inf')
+        flag = ""
+        if ratio > threshold and previous['seconds'] >= MIN_COMPARED_SECONDS:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        line = f"{name:<52} {previous['seconds']:9.3f} s -> {record['seconds']:9.3f} s ({ratio:5.2f}x){flag}"
+        if 'density' in record and 'density' in previous:
+            line += f"  density {previous['density']:.1%} -> {record['density']:.1%}"
+        print(line)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Times alignment, wrapping, network planning and packing on synthetic inputs of growing size.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="Transcript sizes in words")
+    parser.add_argument('--quick', action='store_true', help=f"Only run the sizes {QUICK_SIZES}")
+    parser.add_argument('--strategies', nargs='+', default=[SKYLINE],
+                        help="Packing strategies to time (see helpers/packing.py)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Skip the peak memory runs (halves the running time)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH,
+                        help="The baseline JSON file to compare with")
+    parser.add_argument('--save', action='store_true', help="Save this run as the new baseline")
+    args = parser.parse_args()
+
+    sizes = QUICK_SIZES if args.quick else args.sizes
+    metrics = stub_metrics(size=FONT_SIZE)
+    run = BenchmarkRun(track_memory=not args.no_memory)
+
+    with tempfile.TemporaryDirectory() as folder:
+        for num_words in sizes:
+            print(f"\n--- {num_words:,} words ---")
+            words = synthetic_words(num_words, VOCABULARY_SIZE)
+            run.time("clean_words", num_words, lambda: clean_words(words))
+            alignment = run_alignment_benchmarks(run, folder, num_words)
+            run_wrapping_benchmarks(run, alignment, num_words, metrics)
+            run_plan_benchmarks(run, alignment, num_words, metrics)
+            run_packing_benchmarks(run, num_words, metrics, args.strategies)
+
+    report = {
+        'meta': {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sizes': sizes,
+        },
+        'benchmarks': run.results
+    }
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(run.results, json.load(f))
+        if regressions:
+            print(f"\n{len(regressions)} benchmarks are more than {REGRESSION_THRESHOLD}x slower than the baseline")
+
+    if args.save or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"\nSaved this run as the baseline: {args.baseline}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,127 @@
+import json
+import os
+import random
+import string
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from helpers.font_metrics import GlyphMetrics  # nopep8
+
+# Word length distributions: (shortest, longest, weight of each length from shortest up)
+WORD_LENGTHS = {
+    "short": (1, 6, [3, 6, 8, 6, 4, 2]),  # Mostly function words, like conversational speech
+    "mixed": (1, 14, [2, 6, 8, 7, 6, 5, 4, 3, 3, 2, 2, 1, 1, 1]),  # Close to English running text
+    "long": (6, 18, [2, 3, 4, 5, 5, 5, 4, 4, 3, 3, 2, 2, 1]),  # Technical vocabulary
+}
+DEFAULT_WORD_LENGTHS = "mixed"
+
+# Words per grouping, like hand-made groupings files
+DEFAULT_GROUP_SIZES = (2, 8)
+
+ANIMATION_STYLES = ["group_swirl", "group_rectangular", "word_basic"]
+OPTIONS = [[], ["audioreactive_scale"], ["invert_colors"]]
+
+# Character widths of the stub metrics, as a fraction of the font size
+NARROW_CHARACTERS = "fijlrt.,;:'!|I"
+WIDE_CHARACTERS = "mwMW@%"
+
+
+def synthetic_words(num_words, vocabulary_size, seed=0, word_lengths=None):
+    """
+    Builds a transcript-like word column: a Zipf-ish draw from a vocabulary
+    of capitalized words, some with trailing punctuation or curly apostrophes.
+
+    Args:
+        word_lengths (str): A key of WORD_LENGTHS; defaults to the uniform
+                            2 to 10 letters of the original normalization benchmark.
+    """
+    rng = random.Random(seed)
+    vocabulary = []
+    for i in range(vocabulary_size):
+        if word_lengths is None:
+            length = rng.randint(2, 10)
+        else:
+            shortest, longest, weights = WORD_LENGTHS[word_lengths]
+            length = rng.choices(range(shortest, longest + 1), weights=weights)[0]
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(length))
+        if i % 7 == 0:
+            word = word.capitalize()
+        if i % 11 == 0:
+            word += rng.choice(['.', ',', '?', '’s', '—'])
+        vocabulary.append(word)
+    weights = [1 / (rank + 1) for rank in range(vocabulary_size)]
+    return rng.choices(vocabulary, weights=weights, k=num_words)
+
+
+def synthetic_transcript(words, seed=0):
+    """
+    Gives every word start and end times, in the transcript JSON format
+    (see input_files/*_transcript.json).
+    """
+    rng = random.Random(seed)
+    transcript = []
+    time = 0.0
+    for index, word in enumerate(words):
+        start = time + rng.uniform(0.0, 0.3)
+        end = start + 0.05 + 0.04 * len(word)
+        transcript.append({'word': word, 'original_global_index': index,
+                           'start': round(start, 3), 'end': round(end, 3), 'case': 'success'})
+        time = end
+    return transcript
+
+
+def synthetic_groupings(words, group_sizes=DEFAULT_GROUP_SIZES, seed=0):
+    """
+    Splits the words into consecutive groupings of group_sizes[0] to
+    group_sizes[1] words, in the groupings JSON format, so every grouping
+    matches the transcript exactly.
+    """
+    rng = random.Random(seed)
+    groupings = []
+    position = 0
+    while position < len(words):
+        size = rng.randint(*group_sizes)
+        groupings.append({
+            'group': " ".join(words[position:position + size]),
+            'animation_style': rng.choice(ANIMATION_STYLES),
+            'options': rng.choice(OPTIONS)
+        })
+        position += size
+    return groupings
+
+
+def write_synthetic_inputs(folder, num_words, vocabulary_size=20_000, word_lengths=DEFAULT_WORD_LENGTHS,
+                           group_sizes=DEFAULT_GROUP_SIZES, seed=0):
+    """
+    Writes a synthetic transcript and a groupings file covering it to folder.
+
+    Returns:
+        tuple: (groupings file path, transcript file path).
+    """
+    words = synthetic_words(num_words, vocabulary_size, seed, word_lengths)
+    name = f"synthetic_{word_lengths}_{num_words}"
+    transcript_file_path = os.path.join(folder, f"{name}_transcript.json")
+    groupings_file_path = os.path.join(folder, f"{name}_groupings.json")
+    with open(transcript_file_path, 'w', encoding='utf-8') as f:
+        json.dump(synthetic_transcript(words, seed), f, ensure_ascii=False)
+    with open(groupings_file_path, 'w', encoding='utf-8') as f:
+        json.dump(synthetic_groupings(words, group_sizes, seed), f, ensure_ascii=False)
+    return groupings_file_path, transcript_file_path
+
+
+def stub_metrics(font="Bahnschrift", typeface="Regular", size=130):
+    """
+    Returns GlyphMetrics with plausible proportional widths for a sans-serif
+    font, so anything that measures text can run without TouchDesigner.
+    """
+    advances = {}
+    for c in string.printable[:-5] + "’—":
+        if c in NARROW_CHARACTERS or c == " ":
+            factor = 0.28
+        elif c in WIDE_CHARACTERS:
+            factor = 0.82
+        elif c.isupper():
+            factor = 0.66
+        else:
+            factor = 0.52
+        advances[c] = factor * size
+    return GlyphMetrics(font, typeface, size, advances, height=1.2 * size)
@@ -1,19 +1,24 @@
+try:
+    from helpers.network_plan import OpPlan
+except ImportError:  # Running directly from the helpers folder
+    from network_plan import OpPlan
+
 # -----------------
 # BACKGROUNDS
 # -----------------
 
 
-def background_one(parent, noiseTOP):
-    noise = parent.create(noiseTOP, 'bg1')
-    noise.viewer = True
-    noise.par.period = 1.74
-    noise.par.harmon = 5
-    noise.par.spread = 0.8
-    noise.par.gain = 1.34
-    noise.par.exp = 2.72
-    noise.par.mono = 0
-    noise.par.tz.expr = "me.time.frame/100"
-    noise.par.resolutionw = parent.par.w
-    noise.par.resolutionh = parent.par.h
-    noise.nodeX = -200
-    return noise
+def background_one(width, height, name="bg1"):
+    """
+    Plans the noise background every group is composited over.
+    """
+    return OpPlan("noiseTOP", name, {
+        'period': 1.74,
+        'harmon': 5,
+        'spread': 0.8,
+        'gain': 1.34,
+        'exp': 2.72,
+        'mono': 0,
+        'resolutionw': width,
+        'resolutionh': height
+    }, expressions={'tz': "me.time.frame/100"}, node_x=-200, viewer=True)
@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+try:
+    from helpers.font_metrics import GlyphMetrics, load_glyph_metrics
+    from helpers.packing import pack_words, DEFAULT_PACKING_STRATEGY, FIT_GLOBAL
+    from helpers.streaming import iter_groupings
+    from helpers.layout_cache import layout_key, layout_cache_for, cached_layouts
+except ImportError:  # Running directly from the helpers folder
+    from font_metrics import GlyphMetrics, load_glyph_metrics
+    from packing import pack_words, DEFAULT_PACKING_STRATEGY, FIT_GLOBAL
+    from streaming import iter_groupings
+    from layout_cache import layout_key, layout_cache_for, cached_layouts
+
+# Defaults for packing a show
+DEFAULT_CONTAINER_WIDTH = 1920
+DEFAULT_CONTAINER_HEIGHT = 1080
+DEFAULT_PADDING = 25
+DEFAULT_SEED = 0
+DEFAULT_GROUPS_PER_TASK = 64  # Groups sent to a worker at a time
+
+LAYOUT_FILE_VERSION = 1
+
+# Set in each worker process by _init_worker, so the metrics are sent once per worker
+_worker_metrics = None
+_worker_settings = None
+
+
+def _init_worker(metrics, settings):
+    global _worker_metrics, _worker_settings
+    _worker_metrics = metrics
+    _worker_settings = settings
+
+
+def _pack_groups(groups):
+    """
+    Packs a batch of group texts in a worker process and returns their layout_data.
+    """
+    container_width, container_height, padding, strategy, fit, seed = _worker_settings
+    packed = []
+    for group in groups:
+        words = group.split()
+        packed.append(pack_words(words, _worker_metrics.measure_words(words), container_width,
+                                 container_height, padding, strategy=strategy, seed=seed, fit=fit))
+    return packed
+
+
+def pack_show(groupings, metrics, container_width=DEFAULT_CONTAINER_WIDTH,
+              container_height=DEFAULT_CONTAINER_HEIGHT, padding=DEFAULT_PADDING,
+              strategy=DEFAULT_PACKING_STRATEGY, fit=FIT_GLOBAL, seed=DEFAULT_SEED,
+              workers=None, groups_per_task=DEFAULT_GROUPS_PER_TASK, cache=None):
+    """
+    Packs the words of every grouping of a show, spread over a pool of
+    worker processes. Word sizes come from glyph metrics, so nothing here
+    needs TouchDesigner.
+
+    Args:
+        groupings (str or iterable): A groupings file path or an iterable of grouping dicts.
+        metrics (GlyphMetrics): The font's glyph metrics (see font_metrics).
+        container_width, container_height (float): The size every group is packed into.
+        padding (float): Space kept to the right of and below every word.
+        strategy, fit, seed: See packing.pack_words.
+        workers (int): Number of worker processes, defaults to the number of CPU cores.
+                       With workers=1 everything runs in this process.
+        groups_per_task (int): How many groupings a worker packs per task.
+        cache (DiskCache): A layout cache (see layout_cache); only groups
+                           whose layout is not in it are packed.
+
+    Returns:
+        list: One dict per non-empty grouping, in order, with 'index' (its position
+              among the non-empty groupings, as in align_groupings), 'group' and
+              'words' (its layout_data, see packing.pack_words).
+    """
+    if isinstance(groupings, str):
+        groupings = iter_groupings(groupings)
+    items = [item for item in groupings if item.get("group", "").strip()]
+    groups = [item["group"].strip() for item in items]
+    settings = (container_width, container_height, padding, strategy, fit, seed)
+    keys = [layout_key('packing', group, item.get("animation_style"), item.get("options"),
+                       metrics.font, metrics.typeface, metrics.size,
+                       (container_width, container_height), padding, strategy, fit, seed)
+            for group, item in zip(groups, items)]
+
+    def pack_missing(positions):
+        missing_groups = [groups[k] for k in positions]
+        tasks = [missing_groups[start:start + groups_per_task]
+                 for start in range(0, len(missing_groups), groups_per_task)]
+        if workers == 1 or len(tasks) <= 1:
+            _init_worker(metrics, settings)
+            return [layout for batch in map(_pack_groups, tasks) for layout in batch]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(metrics, settings)) as executor:
+            return [layout for batch in executor.map(_pack_groups, tasks) for layout in batch]
+
+    layouts, _ = cached_layouts(cache, keys, pack_missing)
+    return [{'index': index, 'group': group, 'words': layout}
+            for index, (group, layout) in enumerate(zip(groups, layouts))]
+
+
+def write_layout_file(layout_file_path, packed_groups, metrics, container_width, container_height):
+    """
+    Writes packed groups to a layout-data JSON file for the TouchDesigner
+    side to apply (see rectangle_packing_adjusted.create_layouts_from_file).
+    """
+    temp_path = f"{layout_file_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': LAYOUT_FILE_VERSION,
+            'font': metrics.font,
+            'typeface': metrics.typeface,
+            'font_size': metrics.size,
+            'container_width': container_width,
+            'container_height': container_height,
+            'groups': packed_groups
+        }, f, ensure_ascii=False)
+    os.replace(temp_path, layout_file_path)  # TD never reads a half-written file
+
+
+def read_layout_file(layout_file_path):
+    """
+    Reads a layout-data file written by write_layout_file.
+    """
+    with open(layout_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def start_pack_show(python_executable, groupings_file_path, layout_file_path, font, typeface, size,
+                    container_width=DEFAULT_CONTAINER_WIDTH, container_height=DEFAULT_CONTAINER_HEIGHT,
+                    padding=DEFAULT_PADDING):
+    """
+    Starts this script in a separate Python process and returns the Popen
+    object right away, so TouchDesigner keeps running while the show is
+    packed. Poll it (e.g. from an Execute DAT) and apply the layout file
+    once poll() returns 0.
+
+    Args:
+        python_executable (str): A regular Python 3 interpreter (not TouchDesigner itself).
+    """
+    return subprocess.Popen([
+        python_executable, os.path.abspath(__file__),
+        groupings_file_path, layout_file_path,
+        '--font', font, '--typeface', typeface, '--size', str(size),
+        '--width', str(container_width), '--height', str(container_height),
+        '--padding', str(padding)
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Packs every grouping of a show into a layout-data file.")
+    parser.add_argument('groupings', nargs='?',
+                        default="../../input_files/attentionIsAllYouNeed1_groupings.json")
+    parser.add_argument('layout', nargs='?', default="./testing/show_layout.json")
+    parser.add_argument('--font', default="Bahnschrift")
+    parser.add_argument('--typeface', default="Regular")
+    parser.add_argument('--size', type=float, default=130)
+    parser.add_argument('--metrics', help="A glyph metrics JSON file (defaults to the stored metrics of the font)")
+    parser.add_argument('--width', type=float, default=DEFAULT_CONTAINER_WIDTH)
+    parser.add_argument('--height', type=float, default=DEFAULT_CONTAINER_HEIGHT)
+    parser.add_argument('--padding', type=float, default=DEFAULT_PADDING)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Pack every group again instead of reusing cached layouts")
+    args = parser.parse_args()
+
+    if args.metrics:
+        font_metrics = GlyphMetrics.load(args.metrics)
+    else:
+        font_metrics = load_glyph_metrics(args.font, args.typeface, args.size)
+    if font_metrics is None:
+        print(f"ERROR: No glyph metrics for {args.font} {args.typeface} {args.size}. "
+              "Build them once in TouchDesigner with text_measurement.glyph_metrics_for.")
+        sys.exit(1)
+
+    start_time = time.perf_counter()
+    packed = pack_show(args.groupings, font_metrics, args.width, args.height, args.padding,
+                       workers=args.workers,
+                       cache=None if args.no_cache else layout_cache_for(args.groupings))
+    write_layout_file(args.layout, packed, font_metrics, args.width, args.height)
+    print(f"Packed {len(packed)} groupings in {time.perf_counter() - start_time:.2f} s "
+          f"and saved them to '{args.layout}'")
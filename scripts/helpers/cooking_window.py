@@ -0,0 +1,159 @@
+import os
+
+# Groups around the current one that keep cooking (see active_window)
+DEFAULT_WINDOW_BEFORE = 0  # Groups before the current one
+DEFAULT_WINDOW_AFTER = 1  # Groups after it, so the next one is cooked before it is shown
+
+# Storage key, on a group COMP, of the resolutions its TOPs had before release_textures
+RELEASED_RESOLUTIONS_KEY = 'cooking_window_resolutions'
+
+# The folder that holds the helpers package, for callbacks that import it
+SCRIPTS_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The CHOP Execute callback of show_plan.plan_cooking_window
+COOKING_WINDOW_CALLBACK = """# Lets only the groups around the current one cook (see helpers/cooking_window.py)
+import sys
+if {scripts_folder!r} not in sys.path:
+    sys.path.append({scripts_folder!r})
+from helpers.cooking_window import GroupComps, move_cooking_window  # nopep8
+
+
+def onValueChange(channel, sampleIndex, val, prev):
+    move_cooking_window(GroupComps(op({table_name!r}), parent()), prev, val, {before}, {after})
+    return
+"""
+
+
+class GroupComps:
+    """
+    The group COMPs named in a Table DAT, one name per row in show order,
+    as a sequence. Each COMP is only looked up when it is used, so moving
+    the window does not touch the rest of the show.
+    """
+
+    def __init__(self, table, parent_op):
+        self.table = table
+        self.parent_op = parent_op
+
+    def __len__(self):
+        return self.table.numRows
+
+    def __getitem__(self, k):
+        return self.parent_op.op(self.table[k, 0].val)
+
+
+def active_window(index, count, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER):
+    """
+    Returns the positions of the groups that should cook while the group at
+    index is shown: before groups ahead of it and after groups following it,
+    clipped to the count groups of the show.
+    """
+    index = int(index)
+    return range(max(index - before, 0), min(index + after + 1, count))
+
+
+def window_changes(previous_index, index, count, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER):
+    """
+    Returns which groups to switch on and off when the shown group changes
+    from previous_index to index. Only the two windows are looked at, so
+    the work per change does not grow with the length of the show.
+
+    Returns:
+        tuple: (positions to enable, positions to disable).
+    """
+    active = active_window(index, count, before, after)
+    previous = active_window(previous_index, count, before, after)
+    return ([k for k in active if k not in previous],
+            [k for k in previous if k not in active])
+
+
+def release_textures(comp):
+    """
+    Shrinks every TOP inside comp that has its own resolution to 1x1 and
+    cooks it once more, so a group that stops cooking does not keep its
+    full-size textures on the GPU. The resolutions are kept in the COMP's
+    storage until restore_textures puts them back.
+    """
+    released = comp.fetch(RELEASED_RESOLUTIONS_KEY, {}, search=False)
+    for child in comp.findChildren():
+        width = getattr(child.par, 'resolutionw', None)
+        height = getattr(child.par, 'resolutionh', None)
+        if width is None or height is None:
+            continue
+        resolution = (width.eval(), height.eval())
+        if resolution != (1, 1):  # Not released yet, or written again by a rebuild since
+            released[comp.relativePath(child)] = resolution
+            child.par.resolutionw = 1
+            child.par.resolutionh = 1
+    comp.store(RELEASED_RESOLUTIONS_KEY, released)
+    comp.cook(force=True, recurse=True)
+
+
+def restore_textures(comp):
+    """
+    Gives the TOPs inside comp back the resolutions release_textures took
+    from them. Does nothing if they were not released.
+    """
+    released = comp.fetch(RELEASED_RESOLUTIONS_KEY, None, search=False)
+    if released is None:
+        return
+    for path, (width, height) in released.items():
+        child = comp.op(path)
+        if child is not None:
+            child.par.resolutionw = width
+            child.par.resolutionh = height
+    comp.unstore(RELEASED_RESOLUTIONS_KEY)
+
+
+def set_cooking_window(comps, index, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER):
+    """
+    Lets only the COMPs in the window around index cook, e.g. right after a
+    build, before the callback takes over. The textures of the others are
+    released (see release_textures).
+
+    Args:
+        comps (sequence): The group COMPs in show order.
+        index: The position of the group shown now.
+    """
+    active = active_window(index, len(comps), before, after)
+    for k in range(len(comps)):
+        comp = comps[k]
+        if k in active:
+            restore_textures(comp)
+            comp.allowCooking = True
+        else:
+            release_textures(comp)
+            comp.allowCooking = False
+
+
+def move_cooking_window(comps, previous_index, index, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER):
+    """
+    Moves the window from previous_index to index (see window_changes).
+    Groups leaving the window release their textures, so GPU memory stays
+    flat however long the show is. Groups entering it get their textures
+    back and are cooked right away, so the next group is ready before the
+    switch shows it.
+
+    Args:
+        comps (sequence): The group COMPs in show order (e.g. GroupComps).
+    """
+    enable, disable = window_changes(previous_index, index, len(comps), before, after)
+    for k in disable:
+        comp = comps[k]
+        release_textures(comp)
+        comp.allowCooking = False
+    for k in enable:
+        comp = comps[k]
+        restore_textures(comp)
+        comp.allowCooking = True
+        comp.cook(force=True, recurse=True)
+
+
+def cooking_window_callback(table_name, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER):
+    """
+    Returns the text of a CHOP Execute DAT that, whenever the index channel
+    changes, moves the window over the groups named in the Table DAT
+    table_name.
+    """
+    return COOKING_WINDOW_CALLBACK.format(scripts_folder=SCRIPTS_FOLDER, table_name=table_name,
+                                          before=int(before), after=int(after))
@@ -0,0 +1,101 @@
+import hashlib
+import os
+import pickle
+
+# Default size cap for a cache directory
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_FILE_EXTENSION = '.pickle'
+
+
+def file_digest(file_path):
+    """
+    Returns the SHA-256 hex digest of a file's contents, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    """
+    Combines any number of values (digests, parameters, versions) into one cache key.
+    """
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    A directory of pickled values keyed by content hashes, capped in size
+    with least-recently-used eviction.
+
+    Each value lives in its own file. Reading a value refreshes the file's
+    modification time, and when the directory grows past max_bytes the
+    files with the oldest modification times are deleted first.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_FILE_EXTENSION)
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under key, or default if there is none.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            # A truncated or outdated entry is just a miss
+            print(f"Warning: Ignoring unreadable cache entry {path} ({e})")
+            return default
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value, evict=True):
+        """
+        Stores value under key, then evicts old entries if the cache is over its size cap.
+        When storing many values, pass evict=False and call evict() once at the end.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)  # Readers never see a half-written entry
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """
+        Deletes least-recently-used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        total_bytes = 0
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(CACHE_FILE_EXTENSION):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+
+        entries.sort()  # Oldest first
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError:
+                pass
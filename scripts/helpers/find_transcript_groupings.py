@@ -1,183 +1,805 @@
 import json
-import string
+import os
+from bisect import bisect_left, bisect_right
+from difflib import SequenceMatcher
+try:
+    from helpers.text_cleaning import clean_word_lists, cached_cleaner
+    from helpers.transcript import Transcript
+    from helpers.streaming import iter_groupings, iter_json_records
+    from helpers.disk_cache import DiskCache, cache_key, file_digest, DEFAULT_MAX_BYTES
+except ImportError:  # Running directly from the helpers folder
+    from text_cleaning import clean_word_lists, cached_cleaner
+    from transcript import Transcript
+    from streaming import iter_groupings, iter_json_records
+    from disk_cache import DiskCache, cache_key, file_digest, DEFAULT_MAX_BYTES
+
+# Fuzzy alignment defaults (see align_groups_fuzzy)
+DEFAULT_BAND = 16  # Half-width of the alignment band, in words
+DEFAULT_MIN_SCORE = 0.5  # Minimum fraction of grouping words that must match exactly
+DEFAULT_ANCHOR_MIN_WORDS = 3  # Shortest exact grouping match trusted as an anchor
+DEFAULT_MAX_ANCHOR_OCCURRENCES = 8  # Groupings found more often than this are too ambiguous to anchor on
+
+# Streaming alignment default (see stream_align_groupings)
+DEFAULT_LOOKAHEAD = 2000  # Transcript words searched for a grouping before it counts as unmatched
+
+# Alignment cache (see align_groupings)
+ALIGNMENT_CACHE_FOLDER = '.alignment_cache'
+ALIGNMENT_CACHE_VERSION = 3  # Bump whenever cleaning or alignment results change
+
+
+def build_word_index(cleaned_transcript_words):
+    """
+    Builds a hash index over the cleaned transcript words, mapping each word
+    to the sorted list of positions where it occurs.
 
+    Args:
+        cleaned_transcript_words (sequence): The transcript words, already cleaned
+                                             (strings, or the token_ids of a Transcript).
 
-def clean_word(word):
+    Returns:
+        dict: A dictionary mapping each cleaned word to a list of indices.
     """
-    Cleans a word by standardizing apostrophes, converting to lowercase,
-    and removing other punctuation.
+    word_index = {}
+    for i, word in enumerate(cleaned_transcript_words):
+        positions = word_index.get(word)
+        if positions is None:
+            word_index[word] = [i]
+        else:
+            positions.append(i)
+    return word_index
+
+
+def find_group_match(cleaned_transcript_words, cleaned_grouping_words, transcript_cursor, word_index=None):
     """
-    # Standardize different types of apostrophes and quotes to a single straight quote
-    # This handles characters like ‘, ’, and `
-    word = word.replace("’", "'").replace("‘", "'").replace("`", "'")
+    Finds the first occurrence of a cleaned grouping in the cleaned transcript
+    at or after the cursor.
 
-    # Create a translator that removes all punctuation EXCEPT the now-standardized apostrophe
-    translator = str.maketrans('', '', string.punctuation.replace("'", ""))
-    result = word.lower().translate(translator)
-    return result
+    When a word index (see build_word_index) is given, the search is anchored
+    on the rarest word of the grouping, so only positions where that word
+    actually occurs are compared. Without an index, every transcript position
+    from the cursor onward is compared (the original sliding-slice scan).
 
+    Args:
+        cleaned_transcript_words (sequence): The transcript words, already cleaned
+                                             (strings, or the token_ids of a Transcript).
+        cleaned_grouping_words (sequence): The grouping words, cleaned the same way as the transcript.
+        transcript_cursor (int): The first transcript index the match may start at.
+        word_index (dict, optional): The index returned by build_word_index.
 
-def find_grouping_times(groupings_file_path, transcript_file_path):
+    Returns:
+        int: The transcript index where the match starts, or None if there is no match.
     """
-    Matches word groupings from a text file to a transcript JSON file
-    to determine the start and end time of each grouping.
+    num_grouping_words = len(cleaned_grouping_words)
+    last_start = len(cleaned_transcript_words) - num_grouping_words
+
+    if word_index is None:
+        # Search for the sequence of words in the transcript, starting from the cursor
+        for i in range(transcript_cursor, last_start + 1):
+            # Check if the slice of transcript words matches the current grouping
+            if cleaned_transcript_words[i: i + num_grouping_words] == cleaned_grouping_words:
+                return i
+        return None
+
+    # Anchor on the grouping word with the fewest occurrences in the transcript
+    anchor_offset = 0
+    anchor_positions = None
+    for offset, word in enumerate(cleaned_grouping_words):
+        positions = word_index.get(word)
+        if positions is None:
+            return None  # This word never occurs, so the grouping cannot match
+        if anchor_positions is None or len(positions) < len(anchor_positions):
+            anchor_offset = offset
+            anchor_positions = positions
+
+    # Candidate starts are in increasing order, so the first hit is the earliest match
+    first = bisect_left(anchor_positions, transcript_cursor + anchor_offset)
+    for k in range(first, len(anchor_positions)):
+        i = anchor_positions[k] - anchor_offset
+        if i > last_start:
+            break
+        if cleaned_transcript_words[i: i + num_grouping_words] == cleaned_grouping_words:
+            return i
+    return None
+
+
+def match_groupings(cleaned_transcript_words, cleaned_groups, use_index=True, fuzzy=False,
+                    band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE):
+    """
+    Matches every cleaned grouping against the cleaned transcript.
+
+    In the default exact mode each grouping is searched for from the cursor
+    left by the previous match (see find_group_match). In fuzzy mode the
+    whole grouping word sequence is aligned against the transcript with
+    align_groups_fuzzy, so groupings with misheard words are still placed.
 
     Args:
-        groupings_file_path (str): The path to the text file containing word groupings (one per line).
-        transcript_file_path (str): The path to the JSON file containing word-level timestamps.
+        cleaned_transcript_words (sequence): The transcript words, already cleaned
+                                             (strings, or the token_ids of a Transcript).
+        cleaned_groups (list): One sequence of cleaned words (or token IDs) per grouping.
+        use_index (bool): Resolve exact matches through a word index.
+        fuzzy (bool): Use the banded fuzzy alignment instead of exact matching.
+        band (int): Half-width of the alignment band, in words (fuzzy mode only).
+        min_score (float): Minimum fraction of matching words for a grouping
+                           to be kept (fuzzy mode only).
 
     Returns:
-        list: A list of dictionaries, where each dictionary contains the
-              grouping, its start time, and its end time. Returns an empty
-              list if files cannot be read or no matches are found.
+        list: One entry per grouping, either None (no match) or a tuple of
+              (start_word_index, end_word_index, score).
     """
-    try:
-        # Read the transcript data from the JSON file
-        with open(transcript_file_path, 'r', encoding='utf-8') as f:
-            transcript_data = json.load(f)
+    word_index = build_word_index(
+        cleaned_transcript_words) if use_index or fuzzy else None
 
-        # Read the groupings from the text file
-        with open(groupings_file_path, 'r', encoding='utf-8') as f:
-            groupings = [line.strip() for line in f if line.strip()]
+    if fuzzy:
+        return align_groups_fuzzy(cleaned_transcript_words, cleaned_groups, word_index,
+                                  band=band, min_score=min_score)
+    return exact_spans(cleaned_transcript_words, cleaned_groups, word_index)
 
-    except FileNotFoundError as e:
-        print(f"Error: Could not find the file - {e.filename}")
-        return []
-    except json.JSONDecodeError:
-        print(
-            f"Error: Could not decode JSON from {transcript_file_path}. Please check its format.")
-        return []
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        return []
 
-    # Clean the words in the transcript data for easier matching
-    cleaned_transcript_words = [clean_word(
-        item['word']) for item in transcript_data]
+def exact_spans(cleaned_transcript_words, cleaned_groups, word_index=None):
+    """
+    Matches the cleaned groupings exactly and in order: each grouping is
+    searched for from the cursor left by the previous match (see
+    find_group_match).
 
-    results = []
+    Returns:
+        list: One entry per grouping, either None (no match) or a tuple of
+              (start_word_index, end_word_index, 1.0).
+    """
+    spans = []
     transcript_cursor = 0  # This pointer keeps track of our position in the transcript
+    for cleaned_grouping_words in cleaned_groups:
+        span = _exact_span(cleaned_transcript_words, cleaned_grouping_words, transcript_cursor, word_index)
+        spans.append(span)
+        if span is not None:
+            # Move the cursor to the position after the found match
+            # This ensures we search for the next grouping from this point onward
+            transcript_cursor = span[1] + 1
 
-    # Iterate over each grouping to find its match in the transcript
-    for grouping in groupings:
-        grouping_words = grouping.split()
-        if not grouping_words:
+    return spans
+
+
+def _exact_span(cleaned_transcript_words, cleaned_grouping_words, transcript_cursor, word_index):
+    """
+    Returns the span (start_word_index, end_word_index, 1.0) of the first
+    exact match of a grouping at or after the cursor, or None.
+    """
+    if not cleaned_grouping_words:
+        return None
+
+    # Search for the sequence of words in the transcript, starting from the cursor
+    start_word_index = find_group_match(
+        cleaned_transcript_words, cleaned_grouping_words, transcript_cursor, word_index)
+    if start_word_index is None:
+        return None
+    return (start_word_index, start_word_index + len(cleaned_grouping_words) - 1, 1.0)
+
+
+def align_groups_fuzzy(cleaned_transcript_words, cleaned_groups, word_index=None,
+                       band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE,
+                       anchor_min_words=DEFAULT_ANCHOR_MIN_WORDS):
+    """
+    Aligns the whole grouping word sequence against the transcript, tolerating
+    misheard, missing and extra words.
+
+    Groupings of at least anchor_min_words words that match the transcript
+    exactly are used as anchors (see _select_anchors). When there are none,
+    the in-order exact matches of shorter groupings are used instead (see
+    exact_spans). The words between two anchors are then
+    aligned with a banded edit distance (see _align_gap), so the work is
+    proportional to the number of words times the band width and memory
+    never holds more than one gap's traceback.
+
+    Args:
+        cleaned_transcript_words (sequence): The transcript words, already cleaned
+                                             (strings, or the token_ids of a Transcript).
+        cleaned_groups (list): One sequence of cleaned words (or token IDs) per grouping.
+        word_index (dict, optional): The index returned by build_word_index.
+        band (int): Half-width of the alignment band, in words.
+        min_score (float): Minimum fraction of matching words for a grouping to be kept.
+        anchor_min_words (int): Minimum grouping length for an exact match to become an anchor.
+
+    Returns:
+        list: One entry per grouping, either None (no match) or a tuple of
+              (start_word_index, end_word_index, score).
+    """
+    if word_index is None:
+        word_index = build_word_index(cleaned_transcript_words)
+
+    # Flatten the groupings into one word sequence, remembering where each one starts
+    grouping_words = []
+    group_offsets = []
+    for cleaned_grouping_words in cleaned_groups:
+        group_offsets.append(len(grouping_words))
+        grouping_words.extend(cleaned_grouping_words)
+
+    # aligned[k] is the transcript index the k-th grouping word was aligned to
+    aligned = [None] * len(grouping_words)
+    matched = [False] * len(grouping_words)
+
+    # 1. Exact matches of long groupings become anchors
+    anchors = _select_anchors(cleaned_transcript_words, cleaned_groups, group_offsets,
+                              word_index, anchor_min_words)
+    if not anchors:
+        # No long grouping matched, so nothing tells where in the transcript the
+        # groupings are. Anchor on the in-order exact matches of any length instead
+        # of spreading the groupings over the whole transcript.
+        anchors = [(offset, span[0], len(cleaned_grouping_words))
+                   for offset, cleaned_grouping_words, span in
+                   zip(group_offsets, cleaned_groups,
+                       exact_spans(cleaned_transcript_words, cleaned_groups, word_index))
+                   if span is not None]
+    for offset, start_word_index, length in anchors:
+        for k in range(length):
+            aligned[offset + k] = start_word_index + k
+            matched[offset + k] = True
+
+    # 2. Align the words between consecutive anchors
+    prev_g, prev_t = 0, 0
+    anchors.append((len(grouping_words), len(cleaned_transcript_words), 0))
+    for k, (g_start, t_start, length) in enumerate(anchors):
+        _align_gap(grouping_words, cleaned_transcript_words, prev_g, g_start, prev_t, t_start,
+                   aligned, matched, band,
+                   free_start=(k == 0), free_end=(k == len(anchors) - 1))
+        prev_g, prev_t = g_start + length, t_start + length
+
+    # 3. Read each grouping's span and score back out of the word alignment
+    spans = []
+    for offset, cleaned_grouping_words in zip(group_offsets, cleaned_groups):
+        positions = [aligned[k] for k in range(offset, offset + len(cleaned_grouping_words))
+                     if aligned[k] is not None]
+        if not positions:
+            spans.append(None)
+            continue
+        score = sum(matched[offset: offset + len(cleaned_grouping_words)]) / \
+            len(cleaned_grouping_words)
+        if score < min_score:
+            spans.append(None)
             continue
+        spans.append((positions[0], positions[-1], score))
 
-        cleaned_grouping_words = [clean_word(word) for word in grouping_words]
-        num_grouping_words = len(cleaned_grouping_words)
+    return spans
 
-        # Search for the sequence of words in the transcript, starting from the cursor
-        for i in range(transcript_cursor, len(cleaned_transcript_words) - num_grouping_words + 1):
-            # Check if the slice of transcript words matches the current grouping
-            transcript_slice = cleaned_transcript_words[i: i +
-                                                        num_grouping_words]
-
-            if transcript_slice == cleaned_grouping_words:
-                # Match found!
-                start_word_index = i
-                end_word_index = i + num_grouping_words - 1
-
-                # Get the start time from the first word of the match
-                start_time = transcript_data[start_word_index]['start']
-                # Get the end time from the last word of the match
-                end_time = transcript_data[end_word_index]['end']
-
-                results.append({
-                    'grouping': grouping,
-                    'start_time': start_time,
-                    'end_time': end_time
-                })
 
-                # Move the cursor to the position after the found match
-                # This ensures we search for the next grouping from this point onward
-                transcript_cursor = end_word_index + 1
-                break  # Stop searching for this grouping and move to the next one
+def _select_anchors(cleaned_transcript_words, cleaned_groups, group_offsets, word_index,
+                    anchor_min_words, max_occurrences=DEFAULT_MAX_ANCHOR_OCCURRENCES):
+    """
+    Picks the exact grouping matches used as anchors by align_groups_fuzzy.
 
-    return results
+    Every occurrence of every long grouping is a candidate, and the anchors
+    are the largest set of candidates that appear in grouping order without
+    overlapping in the transcript. This keeps a repeated phrase from pulling
+    the alignment to the wrong occurrence. Groupings with more than
+    max_occurrences matches are too ambiguous to anchor on.
 
+    Returns:
+        list: (grouping_word_offset, transcript_word_index, length) tuples, in order.
+    """
+    candidates = []  # (offset, start, length, predecessor candidate)
+    tails = []  # tails[k]: smallest transcript end of an anchor chain of length k + 1
+    tail_candidates = []  # The candidate that ends each of those chains
+
+    for offset, cleaned_grouping_words in zip(group_offsets, cleaned_groups):
+        length = len(cleaned_grouping_words)
+        if length < anchor_min_words:
+            continue
+
+        occurrences = []
+        start_word_index = find_group_match(
+            cleaned_transcript_words, cleaned_grouping_words, 0, word_index)
+        while start_word_index is not None and len(occurrences) <= max_occurrences:
+            occurrences.append(start_word_index)
+            start_word_index = find_group_match(
+                cleaned_transcript_words, cleaned_grouping_words, start_word_index + 1, word_index)
+        if not occurrences or len(occurrences) > max_occurrences:
+            continue
 
-def find_grouping_times_json(groupings_file_path, transcript_file_path):
+        # Occurrences of the same grouping must not chain onto each other, so
+        # compute every chain length before updating the tails
+        updates = []
+        for start_word_index in occurrences:
+            k = bisect_right(tails, start_word_index)
+            predecessor = tail_candidates[k - 1] if k > 0 else None
+            candidates.append(
+                (offset, start_word_index, length, predecessor))
+            updates.append((k, start_word_index + length, len(candidates) - 1))
+        for k, end, candidate in updates:
+            if k == len(tails):
+                tails.append(end)
+                tail_candidates.append(candidate)
+            elif end < tails[k]:
+                tails[k] = end
+                tail_candidates[k] = candidate
+
+    # Walk back from the end of the longest chain
+    anchors = []
+    candidate = tail_candidates[-1] if tail_candidates else None
+    while candidate is not None:
+        offset, start_word_index, length, predecessor = candidates[candidate]
+        anchors.append((offset, start_word_index, length))
+        candidate = predecessor
+    anchors.reverse()
+    return anchors
+
+
+def _align_gap(grouping_words, transcript_words, g_lo, g_hi, t_lo, t_hi, aligned, matched, band,
+               free_start=False, free_end=False):
     """
-    Matches word groupings from a JSON file to a transcript JSON file
-    to determine the start and end time of each grouping.
+    Aligns grouping_words[g_lo:g_hi] against transcript_words[t_lo:t_hi] with
+    a banded edit distance and writes the result into aligned and matched.
+
+    Each row (grouping word) only evaluates the columns (transcript words)
+    within band of the expected diagonal, and the traceback keeps one small
+    bytearray per row. With free_start / free_end, transcript words before /
+    after the aligned region are skipped at no cost.
+    """
+    rows = g_hi - g_lo
+    cols = t_hi - t_lo
+    if rows == 0 or cols == 0:
+        return
+
+    # Expected transcript column for each row
+    if free_start and not free_end:
+        centers = [max(0, cols - rows + i) for i in range(rows + 1)]
+    elif free_end and not free_start:
+        centers = [min(cols, i) for i in range(rows + 1)]
+    else:
+        centers = [(i * cols) // rows for i in range(rows + 1)]
+
+    # Row i covers the columns from its own center to the next one, widened by the band
+    bounds = []
+    for i in range(rows + 1):
+        next_center = centers[min(i + 1, rows)]
+        bounds.append((max(0, centers[i] - band), min(cols, next_center + band)))
+
+    inf = float('inf')
+    DIAG, UP, LEFT, STOP = 0, 1, 2, 3
+
+    lo, hi = bounds[0]
+    prev_scores = [0 if free_start else j for j in range(lo, hi + 1)]
+    pointers = [bytearray([STOP if free_start or j == 0 else LEFT for j in range(lo, hi + 1)])]
+    prev_lo, prev_hi = lo, hi
+
+    for i in range(1, rows + 1):
+        lo, hi = bounds[i]
+        g_word = grouping_words[g_lo + i - 1]
+        scores = [inf] * (hi - lo + 1)
+        row_pointers = bytearray(hi - lo + 1)
+        for j in range(lo, hi + 1):
+            best = inf
+            move = STOP
+            if prev_lo <= j - 1 <= prev_hi:
+                cost = 0 if transcript_words[t_lo + j - 1] == g_word else 1
+                best = prev_scores[j - 1 - prev_lo] + cost
+                move = DIAG
+            if prev_lo <= j <= prev_hi and prev_scores[j - prev_lo] + 1 < best:
+                best = prev_scores[j - prev_lo] + 1
+                move = UP
+            if j > lo and scores[j - 1 - lo] + 1 < best:
+                best = scores[j - 1 - lo] + 1
+                move = LEFT
+            scores[j - lo] = best
+            row_pointers[j - lo] = move
+        prev_scores = scores
+        pointers.append(row_pointers)
+        prev_lo, prev_hi = lo, hi
+
+    # Pick the end cell: the cheapest one in the last row when trailing words are free
+    if free_end:
+        j = prev_lo + min(range(len(prev_scores)), key=prev_scores.__getitem__)
+    else:
+        j = min(cols, prev_hi)
+
+    # Trace back from the end cell, recording which transcript word each grouping word landed on
+    i = rows
+    while i > 0:
+        move = pointers[i][j - bounds[i][0]]
+        if move == DIAG:
+            aligned[g_lo + i - 1] = t_lo + j - 1
+            matched[g_lo + i - 1] = transcript_words[t_lo + j -
+                                                     1] == grouping_words[g_lo + i - 1]
+            i -= 1
+            j -= 1
+        elif move == UP:
+            i -= 1
+        elif move == LEFT:
+            j -= 1
+        else:
+            break
+
+
+def realign_changed_groupings(cleaned_transcript_words, previous_groups, previous_spans, cleaned_groups,
+                              use_index=True, fuzzy=False, band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE):
+    """
+    Updates a previous alignment after the groupings were edited, giving the
+    same spans as match_groupings on the new groupings.
+
+    The new groupings are diffed against the previous ones. An exact match
+    only depends on the grouping and on the cursor it is searched from (see
+    exact_spans), so an unchanged grouping keeps its previous span whenever
+    the cursor reaching it is the one the previous run had there. Only the
+    edited groupings, and the unchanged ones after them until the cursor
+    catches up with the previous run, are searched again.
+
+    In fuzzy mode the anchors are picked over all the groupings at once (see
+    _select_anchors), so a single edit can move groupings anywhere and the
+    whole alignment is redone.
 
     Args:
-        groupings_file_path (str): The path to the JSON file containing word groupings (one per line).
-        transcript_file_path (str): The path to the JSON file containing word-level timestamps.
+        cleaned_transcript_words (sequence): The transcript words, already cleaned.
+        previous_groups (list): The cleaned groupings of the previous run, as tuples.
+        previous_spans (list): The spans match_groupings returned for previous_groups.
+        cleaned_groups (list): One sequence of cleaned words (or token IDs) per new grouping.
+        use_index, fuzzy, band, min_score: As for match_groupings.
 
     Returns:
-        list: A list of dictionaries, where each dictionary contains the
-              grouping, its start time, and its end time. Returns an empty
-              list if files cannot be read or no matches are found.
+        list: One entry per new grouping, either None (no match) or a tuple of
+              (start_word_index, end_word_index, score).
     """
-    try:
-        # Read the transcript data from the JSON transcript file
-        with open(transcript_file_path, 'r', encoding='utf-8') as f:
-            transcript_data = json.load(f)
+    if fuzzy:
+        return match_groupings(cleaned_transcript_words, cleaned_groups, use_index=use_index,
+                               fuzzy=fuzzy, band=band, min_score=min_score)
+
+    # previous_index[k] is the previous grouping the k-th new one is an unchanged copy of
+    new_groups = [tuple(group) for group in cleaned_groups]
+    previous_index = [None] * len(new_groups)
+    matcher = SequenceMatcher(None, previous_groups, new_groups, autojunk=False)
+    for tag, a_lo, a_hi, b_lo, b_hi in matcher.get_opcodes():
+        if tag == 'equal':
+            previous_index[b_lo:b_hi] = range(a_lo, a_hi)
+
+    # The cursor each previous grouping was searched from
+    previous_cursors = []
+    transcript_cursor = 0
+    for span in previous_spans:
+        previous_cursors.append(transcript_cursor)
+        if span is not None:
+            transcript_cursor = span[1] + 1
+
+    spans = []
+    word_index = None  # Only built once a grouping has to be searched for
+    transcript_cursor = 0
+    for k, cleaned_grouping_words in enumerate(cleaned_groups):
+        a = previous_index[k]
+        if a is not None and previous_cursors[a] == transcript_cursor:
+            span = previous_spans[a]  # Same grouping searched from the same place
+        else:
+            if word_index is None and use_index:
+                word_index = build_word_index(cleaned_transcript_words)
+            span = _exact_span(cleaned_transcript_words, cleaned_grouping_words, transcript_cursor, word_index)
+        spans.append(span)
+        if span is not None:
+            transcript_cursor = span[1] + 1
+
+    return spans
+
+
+def load_groupings(groupings_file_path):
+    """
+    Reads word groupings from either a JSON groupings file (a list of objects
+    with "group", "animation_style" and "options") or a text file with one
+    grouping per line.
+
+    Args:
+        groupings_file_path (str): The path to the groupings file.
+
+    Returns:
+        list: A list of grouping dictionaries. Groupings read from a text
+              file only have a "group" key.
+    """
+    with open(groupings_file_path, 'r', encoding='utf-8') as f:
+        if groupings_file_path.lower().endswith('.json'):
+            return json.load(f)
+        return [{'group': line.strip()} for line in f if line.strip()]
+
+
+def align_groupings(groupings_file_path, transcript_file_path, use_index=True, fuzzy=False,
+                    band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE, use_cache=False, incremental=False):
+    """
+    Reads and cleans the groupings and transcript once, aligns them, and
+    returns everything a build needs: the original grouping fields, the
+    group's start/end times and the timings of the words it matched.
+
+    Args:
+        groupings_file_path (str): The path to the groupings file (JSON or one grouping per line).
+        transcript_file_path (str or Transcript): The path to the JSON file containing
+                                                  word-level timestamps, or an already loaded Transcript.
+        use_index (bool): Resolve groupings through a word index (see find_group_match).
+                          Set to False to fall back to the original sliding-slice scan.
+        fuzzy (bool): Tolerate misheard words with a banded alignment (see align_groups_fuzzy).
+                      Each entry then also carries a 'score' between 0 and 1.
+        band (int): Half-width of the fuzzy alignment band, in words.
+        min_score (float): Minimum fraction of matching words for a fuzzy match.
+        use_cache (bool): Keep the parsed transcript and the alignment in a cache
+                          folder next to the transcript (see alignment_cache_for),
+                          so a rerun with unchanged inputs skips straight to the result.
+        incremental (bool): With use_cache, remember this run's spans and, when the
+                            groupings file is edited, only search again for the groupings
+                            the edit affects (see realign_changed_groupings). The result
+                            is the same as without it.
 
-        # Read the groupings from the JSON groupings file
-        with open(groupings_file_path, 'r', encoding='utf-8') as f:
-            grouping_data = json.load(f)
+    Returns:
+        list: One dictionary per non-empty grouping, in order. Each is a copy
+              of the grouping data with 'start_time', 'end_time' and 'words'
+              added. Unmatched groupings have None times and no words.
+              Returns an empty list if files cannot be read.
+    """
+    cache = None
+    if use_cache and not isinstance(transcript_file_path, Transcript):
+        cache = alignment_cache_for(transcript_file_path)
+
+    try:
+        if cache is not None:
+            # Both inputs are keyed by content, so any edit invalidates the entries
+            transcript_digest = file_digest(transcript_file_path)
+            alignment_key = cache_key('alignment', ALIGNMENT_CACHE_VERSION, file_digest(groupings_file_path),
+                                      transcript_digest, use_index, fuzzy, band, min_score)
+            alignment = cache.get(alignment_key)
+            if alignment is not None:
+                return alignment
+
+        # Read the transcript into compact columns, unless it already is a Transcript
+        if isinstance(transcript_file_path, Transcript):
+            transcript = transcript_file_path
+        elif cache is not None:
+            transcript_key = cache_key(
+                'transcript', ALIGNMENT_CACHE_VERSION, transcript_digest)
+            transcript = cache.get(transcript_key)
+            if transcript is None:
+                transcript = Transcript.from_json(transcript_file_path)
+                cache.put(transcript_key, transcript)
+        else:
+            transcript = Transcript.from_json(transcript_file_path)
+
+        # Read the groupings from the groupings file
+        grouping_data = load_groupings(groupings_file_path)
 
     except FileNotFoundError as e:
         print(f"Error: Could not find the file - {e.filename}")
         return []
-    except json.JSONDecodeError:
-        print(
-            f"Error: Could not decode JSON from {transcript_file_path}. Please check its format.")
+    except json.JSONDecodeError as e:
+        print(f"Error decoding JSON from {e.doc}. Please check file format.")
         return []
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         return []
 
-    # Clean the words in the transcript data for easier matching
-    cleaned_transcript_words = [clean_word(
-        item['word']) for item in transcript_data]
+    # Skip empty groupings, they have nothing to show
+    grouping_data = [
+        item for item in grouping_data if item.get("group", "").strip()]
+
+    # The transcript words are already cleaned and interned, so the groupings
+    # are cleaned and encoded into the same token IDs for matching
+    cleaned_groups = [transcript.encode(words) for words in clean_word_lists(
+        item["group"].split() for item in grouping_data)]
+
+    # With incremental alignment, start from the spans of the previous run on this groupings file
+    # (fuzzy alignments are always redone in full, see realign_changed_groupings)
+    state_key = None
+    previous_state = None
+    if cache is not None and incremental and not fuzzy:
+        state_key = cache_key('incremental', ALIGNMENT_CACHE_VERSION, os.path.abspath(groupings_file_path),
+                              transcript_digest, use_index)
+        previous_state = cache.get(state_key)
+        # Only trust spans that were matched against this very transcript
+        if previous_state is not None and (previous_state.get('transcript') != transcript_digest or
+                                           len(previous_state['spans']) != len(previous_state['groups'])):
+            previous_state = None
+
+    if previous_state is not None:
+        spans = realign_changed_groupings(transcript.token_ids, previous_state['groups'], previous_state['spans'],
+                                          cleaned_groups, use_index=use_index, fuzzy=fuzzy,
+                                          band=band, min_score=min_score)
+    else:
+        spans = match_groupings(transcript.token_ids, cleaned_groups, use_index=use_index,
+                                fuzzy=fuzzy, band=band, min_score=min_score)
+
+    if state_key is not None:
+        cache.put(state_key, {
+            'transcript': transcript_digest,
+            'groups': [tuple(group) for group in cleaned_groups],
+            'spans': spans
+        })
+
+    alignment = []
+    for item, span in zip(grouping_data, spans):
+        # Start with original data (group, style, etc.)
+        entry = item.copy()
+        entry['start_time'] = None
+        entry['end_time'] = None
+        entry['words'] = []
+        if fuzzy:
+            entry['score'] = 0.0
+
+        if span is not None:
+            start_word_index, end_word_index, score = span
+            # Get the start time from the first word and the end time from the last word of the match
+            entry['start_time'], entry['end_time'] = transcript.span_times(
+                start_word_index, end_word_index)
+            # Add the detailed word timings
+            for word_index in range(start_word_index, end_word_index + 1):
+                entry['words'].append({
+                    "word": transcript.word(word_index),
+                    "start": transcript.starts[word_index],
+                    "end": transcript.ends[word_index]
+                })
+            if fuzzy:
+                entry['score'] = score
+
+        alignment.append(entry)
 
-    results = []
-    transcript_cursor = 0  # This pointer keeps track of our position in the transcript
+    if cache is not None:
+        cache.put(alignment_key, alignment)
+
+    return alignment
+
+
+def alignment_cache_for(transcript_file_path, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Returns the DiskCache that lives next to a transcript file (in a
+    ALIGNMENT_CACHE_FOLDER sub-folder) and holds its parsed transcripts and alignments.
+    """
+    transcript_folder = os.path.dirname(os.path.abspath(transcript_file_path))
+    return DiskCache(os.path.join(transcript_folder, ALIGNMENT_CACHE_FOLDER), max_bytes)
 
-    # Iterate over each grouping to find its match in the transcript
-    for item in grouping_data:
-        group = item["group"]
-        grouping_words = group.split()
-        if not grouping_words:
-            continue
 
-        cleaned_grouping_words = [clean_word(word) for word in grouping_words]
+def stream_align_groupings(groupings, transcript_words, lookahead=DEFAULT_LOOKAHEAD):
+    """
+    Aligns groupings against a transcript while both are still being read,
+    yielding each grouping as soon as its match is resolved.
+
+    Only a window of at most lookahead transcript words after the cursor is
+    kept in memory, so memory stays constant however long the transcript is.
+    A grouping that is not found within that window is reported as unmatched
+    and the cursor stays where it was, as in find_group_match.
+
+    Args:
+        groupings (str or iterable): A groupings file path (JSON, JSON Lines or
+                                     one grouping per line) or an iterable of grouping dicts.
+        transcript_words (str or iterable): A transcript file path (JSON or JSON Lines)
+                                            or an iterable of word dicts with "word", "start" and "end".
+        lookahead (int): The maximum number of transcript words searched for a grouping.
+
+    Yields:
+        dict: One entry per non-empty grouping, shaped like the entries of
+              align_groupings ('start_time' and 'end_time' are None and
+              'words' is empty when the grouping was not found).
+    """
+    if isinstance(groupings, str):
+        groupings = iter_groupings(groupings)
+    if isinstance(transcript_words, str):
+        transcript_words = iter_json_records(transcript_words)
+    transcript_words = iter(transcript_words)
+
+    clean = cached_cleaner()  # Repeated words are only cleaned once
+
+    # window[head:] holds (cleaned word, word record) pairs for the words after the cursor
+    window = []
+    head = 0
+    transcript_exhausted = False
+
+    for item in groupings:
+        group = item.get("group", "").strip()
+        if not group:
+            continue
+        cleaned_grouping_words = [clean(word) for word in group.split()]
         num_grouping_words = len(cleaned_grouping_words)
 
-        # Search for the sequence of words in the transcript, starting from the cursor
-        for i in range(transcript_cursor, len(cleaned_transcript_words) - num_grouping_words + 1):
-            # Check if the slice of transcript words matches the current grouping
-            transcript_slice = cleaned_transcript_words[i: i +
-                                                        num_grouping_words]
-
-            if transcript_slice == cleaned_grouping_words:
-                # Match found!
-                start_word_index = i
-                end_word_index = i + num_grouping_words - 1
-
-                # Get the start time from the first word of the match
-                start_time = transcript_data[start_word_index]['start']
-                # Get the end time from the last word of the match
-                end_time = transcript_data[end_word_index]['end']
-
-                results.append({
-                    'grouping': group,
-                    'start_time': start_time,
-                    'end_time': end_time
-                })
+        # Slide along the window, reading more transcript words only when needed
+        start = head
+        found = False
+        while True:
+            while (len(window) - start < num_grouping_words and not transcript_exhausted
+                   and len(window) - head < lookahead):
+                record = next(transcript_words, None)
+                if record is None:
+                    transcript_exhausted = True
+                else:
+                    window.append((clean(record['word']), record))
+            if len(window) - start < num_grouping_words:
+                break  # Ran out of transcript (or lookahead) before finding the grouping
+            if all(window[start + k][0] == cleaned_grouping_words[k] for k in range(num_grouping_words)):
+                found = True
+                break
+            start += 1
+
+        entry = item.copy()
+        entry['start_time'] = None
+        entry['end_time'] = None
+        entry['words'] = []
+        if found:
+            matched_records = [record for _, record in window[start: start +
+                                                              num_grouping_words]]
+            entry['start_time'] = matched_records[0]['start']
+            entry['end_time'] = matched_records[-1]['end']
+            entry['words'] = [{"word": record['word'], "start": record['start'], "end": record['end']}
+                              for record in matched_records]
+
+            # Move the cursor past the match and forget the words before it
+            head = start + num_grouping_words
+            if head >= lookahead:
+                del window[:head]
+                head = 0
+
+        yield entry
+
+
+def matched_groupings(alignment):
+    """
+    Returns the entries of an alignment (see align_groupings) that were found in the transcript.
+    """
+    return [entry for entry in alignment if entry['start_time'] is not None]
 
-                # Move the cursor to the position after the found match
-                # This ensures we search for the next grouping from this point onward
-                transcript_cursor = end_word_index + 1
-                break  # Stop searching for this grouping and move to the next one
 
+def _grouping_times(alignment, fuzzy):
+    """
+    Reduces an alignment to the grouping / start_time / end_time results
+    returned by find_grouping_times and find_grouping_times_json.
+    """
+    results = []
+    for entry in matched_groupings(alignment):
+        result = {
+            'grouping': entry['group'],
+            'start_time': entry['start_time'],
+            'end_time': entry['end_time']
+        }
+        if fuzzy:
+            result['score'] = entry['score']
+        results.append(result)
     return results
 
 
+def find_grouping_times(groupings_file_path, transcript_file_path, use_index=True, fuzzy=False,
+                        band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE):
+    """
+    Matches word groupings from a text file to a transcript JSON file
+    to determine the start and end time of each grouping.
+
+    Args:
+        groupings_file_path (str): The path to the text file containing word groupings (one per line).
+        transcript_file_path (str): The path to the JSON file containing word-level timestamps.
+        use_index (bool): Resolve groupings through a word index (see find_group_match).
+                          Set to False to fall back to the original sliding-slice scan.
+        fuzzy (bool): Tolerate misheard words with a banded alignment (see align_groups_fuzzy).
+                      Each result then also carries a 'score' between 0 and 1.
+        band (int): Half-width of the fuzzy alignment band, in words.
+        min_score (float): Minimum fraction of matching words for a fuzzy match.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary contains the
+              grouping, its start time, and its end time. Returns an empty
+              list if files cannot be read or no matches are found.
+    """
+    alignment = align_groupings(groupings_file_path, transcript_file_path, use_index=use_index,
+                                fuzzy=fuzzy, band=band, min_score=min_score)
+    return _grouping_times(alignment, fuzzy)
+
+
+def find_grouping_times_json(groupings_file_path, transcript_file_path, use_index=True, fuzzy=False,
+                             band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE):
+    """
+    Matches word groupings from a JSON file to a transcript JSON file
+    to determine the start and end time of each grouping.
+
+    Args:
+        groupings_file_path (str): The path to the JSON file containing word groupings (one per line).
+        transcript_file_path (str): The path to the JSON file containing word-level timestamps.
+        use_index (bool): Resolve groupings through a word index (see find_group_match).
+                          Set to False to fall back to the original sliding-slice scan.
+        fuzzy (bool): Tolerate misheard words with a banded alignment (see align_groups_fuzzy).
+                      Each result then also carries a 'score' between 0 and 1.
+        band (int): Half-width of the fuzzy alignment band, in words.
+        min_score (float): Minimum fraction of matching words for a fuzzy match.
+
+    Returns:
+        list: A list of dictionaries, where each dictionary contains the
+              grouping, its start time, and its end time. Returns an empty
+              list if files cannot be read or no matches are found.
+    """
+    alignment = align_groupings(groupings_file_path, transcript_file_path, use_index=use_index,
+                                fuzzy=fuzzy, band=band, min_score=min_score)
+    return _grouping_times(alignment, fuzzy)
+
+
 if __name__ == "__main__":
     transcript_filename = "../../input_files/attentionIsAllYouNeed1_transcript.json"
     groupings_filename = "../../input_files/attentionIsAllYouNeed1_groupings.json"
@@ -0,0 +1,222 @@
+import json
+import os
+try:
+    from helpers.text_metrics import DEFAULT_METRICS_FOLDER
+    from helpers.disk_cache import cache_key
+except ImportError:  # Running directly from the helpers folder
+    from text_metrics import DEFAULT_METRICS_FOLDER
+    from disk_cache import cache_key
+
+# The characters measured by default: printable ASCII, including the space
+DEFAULT_CHARSET = ''.join(chr(c) for c in range(32, 127))
+
+GLYPH_METRICS_FILE_EXTENSION = '.glyphs.json'
+
+
+class GlyphMetrics:
+    """
+    Per-character widths and pair corrections for one font, typeface and
+    size, so the width of any string can be computed in pure Python
+    without a Text TOP.
+
+    The width of a string is the sum of its characters' widths plus a
+    correction for every pair of neighbouring characters. When the widths
+    and corrections come from measuring every single character and every
+    pair (see from_measurements), this reproduces the measured width of
+    longer strings exactly, whether the renderer reports advance widths or
+    ink bounds, because the pair corrections absorb side bearings as well
+    as kerning. Characters that were never measured count as
+    default_advance wide, with no pair correction.
+    """
+
+    __slots__ = ('font', 'typeface', 'size', 'advances', 'kerning',
+                 'height', 'default_advance')
+
+    def __init__(self, font, typeface, size, advances=None, kerning=None, height=0.0, default_advance=None):
+        self.font = font
+        self.typeface = typeface
+        self.size = float(size)
+        self.advances = advances or {}  # Character -> width
+        self.kerning = kerning or {}  # Two-character string -> width correction
+        self.height = float(height)  # Line height of the rendered text
+        if default_advance is None:
+            default_advance = (sum(self.advances.values()) / len(self.advances)
+                               if self.advances else 0.0)
+        self.default_advance = float(default_advance)
+
+    @classmethod
+    def from_measurements(cls, measure_strings, font, typeface, size, charset=DEFAULT_CHARSET):
+        """
+        Builds the tables from real measurements: every character of charset
+        and every pair of them are measured once (len(charset) ** 2 pairs,
+        about 9,000 for the default charset).
+
+        Args:
+            measure_strings (callable): Takes a list of strings and returns a dict of
+                                        string -> (width, height), e.g.
+                                        lambda strings: measure_words(strings, base, font, typeface, size, resolution).
+            font, typeface, size: The font the measurements are made with.
+            charset (str): The characters to measure.
+        """
+        pairs = [a + b for a in charset for b in charset]
+        sizes = measure_strings(list(charset) + pairs)
+        advances = {c: sizes[c][0] for c in charset}
+        kerning = {}
+        for pair in pairs:
+            correction = round(sizes[pair][0] - advances[pair[0]] - advances[pair[1]], 3)
+            if correction:
+                kerning[pair] = correction
+        height = max(h for _, h in sizes.values())
+        return cls(font, typeface, size, advances, kerning, height)
+
+    @classmethod
+    def from_font_file(cls, font_file_path, font, typeface, size, charset=DEFAULT_CHARSET):
+        """
+        Builds the tables offline from a TrueType / OpenType font file, using
+        its horizontal advances and its 'kern' table (GPOS kerning is not
+        read). Needs the optional fontTools package.
+
+        Advances are scaled so that size is the em size in pixels; compare
+        against real measurements with error_report before relying on it.
+        """
+        try:
+            from fontTools.ttLib import TTFont
+        except ImportError:
+            raise ImportError(
+                "GlyphMetrics.from_font_file needs fontTools (pip install fonttools)")
+
+        ttfont = TTFont(font_file_path)
+        scale = float(size) / ttfont['head'].unitsPerEm
+        cmap = ttfont.getBestCmap()
+        metrics = ttfont['hmtx'].metrics
+
+        glyph_names = {}
+        advances = {}
+        for c in charset:
+            glyph_name = cmap.get(ord(c))
+            if glyph_name is not None:
+                glyph_names[glyph_name] = c
+                advances[c] = metrics[glyph_name][0] * scale
+
+        kerning = {}
+        if 'kern' in ttfont:
+            for table in ttfont['kern'].kernTables:
+                for (left, right), value in getattr(table, 'kernTable', {}).items():
+                    if left in glyph_names and right in glyph_names and value:
+                        kerning[glyph_names[left] + glyph_names[right]] = value * scale
+
+        hhea = ttfont['hhea']
+        height = (hhea.ascent - hhea.descent) * scale
+        return cls(font, typeface, size, advances, kerning, height)
+
+    def text_width(self, text):
+        """
+        Returns the width of text in pixels.
+        """
+        advances = self.advances
+        kerning = self.kerning
+        default_advance = self.default_advance
+        width = 0.0
+        previous = None
+        for c in text:
+            width += advances.get(c, default_advance)
+            if previous is not None:
+                width += kerning.get(previous + c, 0.0)
+            previous = c
+        return width
+
+    def measure(self, text):
+        """
+        Returns the (width, height) of text, like one entry of measure_words.
+        """
+        return self.text_width(text), self.height
+
+    def measure_words(self, words):
+        """
+        Returns a dict of each distinct string -> (width, height), like measure_words.
+        """
+        return {word: self.measure(word) for word in dict.fromkeys(words)}
+
+    def digest(self):
+        """
+        Returns a hash of the tables, so layouts cached with these metrics
+        are not reused once the metrics are rebuilt with different values.
+        """
+        return cache_key(self.font, self.typeface, self.size, self.height, self.default_advance,
+                         sorted(self.advances.items()), sorted(self.kerning.items()))
+
+    def error_report(self, measured):
+        """
+        Compares the computed widths against real measurements.
+
+        Args:
+            measured (dict): string -> (width, height) from text_measurement.measure_words.
+
+        Returns:
+            dict: 'count', 'mean_abs_error' and 'max_abs_error' (pixels),
+                  'mean_rel_error' (fraction of the measured width) and
+                  'worst' (the ten worst strings as (text, measured, computed)).
+        """
+        rows = []
+        for text, (width, _) in measured.items():
+            rows.append((abs(self.text_width(text) - width), text, width))
+        if not rows:
+            return {'count': 0, 'mean_abs_error': 0.0, 'max_abs_error': 0.0,
+                    'mean_rel_error': 0.0, 'worst': []}
+        rows.sort(reverse=True)
+        return {
+            'count': len(rows),
+            'mean_abs_error': sum(error for error, _, _ in rows) / len(rows),
+            'max_abs_error': rows[0][0],
+            'mean_rel_error': sum(error / width for error, _, width in rows if width) / len(rows),
+            'worst': [(text, width, self.text_width(text)) for _, text, width in rows[:10]]
+        }
+
+    def scaled(self, size):
+        """
+        Returns the same metrics scaled linearly to another font size.
+        """
+        factor = float(size) / self.size
+        return GlyphMetrics(self.font, self.typeface, size,
+                            {c: w * factor for c, w in self.advances.items()},
+                            {pair: k * factor for pair, k in self.kerning.items()},
+                            self.height * factor, self.default_advance * factor)
+
+    def save(self, file_path):
+        """
+        Writes the tables to a JSON file.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump({'font': self.font, 'typeface': self.typeface, 'size': self.size,
+                       'height': self.height, 'default_advance': self.default_advance,
+                       'advances': self.advances, 'kerning': self.kerning},
+                      f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Reads tables written by save.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['font'], data['typeface'], data['size'], data['advances'],
+                   data['kerning'], data['height'], data['default_advance'])
+
+
+def glyph_metrics_path(font, typeface, size, folder=DEFAULT_METRICS_FOLDER):
+    """
+    Returns where the glyph metrics of a font are stored by default (next
+    to the text-metrics cache, so they are shared by every project).
+    """
+    return os.path.join(folder, cache_key(font, typeface, float(size)) + GLYPH_METRICS_FILE_EXTENSION)
+
+
+def load_glyph_metrics(font, typeface, size, folder=DEFAULT_METRICS_FOLDER):
+    """
+    Returns the stored GlyphMetrics of a font, or None if they were never built.
+    """
+    path = glyph_metrics_path(font, typeface, size, folder)
+    if not os.path.exists(path):
+        return None
+    return GlyphMetrics.load(path)
@@ -1,20 +1,12 @@
 import json
-import string
+try:
+    from helpers.find_transcript_groupings import align_groupings, matched_groupings, DEFAULT_BAND, DEFAULT_MIN_SCORE
+except ImportError:  # Running directly from the helpers folder
+    from find_transcript_groupings import align_groupings, matched_groupings, DEFAULT_BAND, DEFAULT_MIN_SCORE
 
 
-def clean_word(word):
-    """
-    Cleans a word by standardizing apostrophes, converting to lowercase,
-    and removing other punctuation. This ensures consistent matching.
-    """
-    # Standardize different types of apostrophes (curly vs. straight)
-    word = word.replace("’", "'").replace("‘", "'").replace("`", "'")
-    # Define punctuation to remove, but keep the standard apostrophe
-    translator = str.maketrans('', '', string.punctuation.replace("'", ""))
-    return word.lower().translate(translator)
-
-
-def find_word_level_times(groupings_file_path, transcript_file_path):
+def find_word_level_times(groupings_file_path, transcript_file_path, use_index=True, fuzzy=False,
+                          band=DEFAULT_BAND, min_score=DEFAULT_MIN_SCORE):
     """
     Matches word groupings from a JSON file to a transcript JSON file and
     enriches the grouping data with word-level start and end times for
@@ -22,84 +14,24 @@ def find_word_level_times(groupings_file_path, transcript_file_path):
 
     Args:
         groupings_file_path (str): Path to the JSON file with word groupings and animation data.
-        transcript_file_path (str): Path to the JSON file with word-level timestamps.
+        transcript_file_path (str or Transcript): Path to the JSON file with word-level
+                                                  timestamps, or an already loaded Transcript.
+        use_index (bool): Resolve groupings through a word index. Set to False to
+                          fall back to the original sliding-slice scan.
+        fuzzy (bool): Tolerate misheard words with a banded alignment. Each result
+                      then also carries a 'score' between 0 and 1, and its 'words'
+                      are the transcript words the group was aligned to.
+        band (int): Half-width of the fuzzy alignment band, in words.
+        min_score (float): Minimum fraction of matching words for a fuzzy match.
 
     Returns:
         list: A list of dictionaries, where each dictionary contains the original
               grouping data, the group's overall start/end times, and a new 'words'
               key containing a list of individual word timings.
     """
-    try:
-        with open(transcript_file_path, 'r', encoding='utf-8') as f:
-            transcript_data = json.load(f)
-        with open(groupings_file_path, 'r', encoding='utf-8') as f:
-            grouping_data = json.load(f)
-    except FileNotFoundError as e:
-        print(f"Error: Could not find the file - {e.filename}")
-        return []
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON from {e.doc}. Please check file format.")
-        return []
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        return []
-
-    # Clean the words in the transcript data for easier matching
-    cleaned_transcript_words = [clean_word(
-        item['word']) for item in transcript_data]
-
-    results = []  # The results list will store our new, enriched data
-    transcript_cursor = 0  # This pointer keeps track of our position in the transcript
-
-    # Iterate through each item in your groupings.json
-    for grouping_item in grouping_data:
-        group_text = grouping_item.get("group", "")
-        if not group_text:
-            continue
-
-        grouping_words = group_text.split()
-        cleaned_grouping_words = [clean_word(word) for word in grouping_words]
-        num_grouping_words = len(cleaned_grouping_words)
-
-        # Search for the word sequence in the transcript, starting from the cursor
-        for i in range(transcript_cursor, len(cleaned_transcript_words) - num_grouping_words + 1):
-            transcript_slice = cleaned_transcript_words[i: i +
-                                                        num_grouping_words]
-
-            if transcript_slice == cleaned_grouping_words:
-                # --- Match Found! ---
-                start_word_index = i
-                end_word_index = i + num_grouping_words - 1
-
-                # 1. Get overall start/end times for the whole group
-                group_start_time = transcript_data[start_word_index]['start']
-                group_end_time = transcript_data[end_word_index]['end']
-
-                # 2. Get word-level details for this specific match
-                word_level_details = []
-                for word_index in range(start_word_index, end_word_index + 1):
-                    word_obj = transcript_data[word_index]
-                    word_level_details.append({
-                        "word": word_obj['word'],
-                        "start": word_obj['start'],
-                        "end": word_obj['end']
-                    })
-
-                # 3. Build the new result object
-                # Start with original data (group, style, etc.)
-                new_result_item = grouping_item.copy()
-                new_result_item['start_time'] = group_start_time
-                new_result_item['end_time'] = group_end_time
-                # Add the detailed word timings
-                new_result_item['words'] = word_level_details
-
-                results.append(new_result_item)
-
-                # 4. Move the cursor past this match to find the next one
-                transcript_cursor = end_word_index + 1
-                break  # Stop searching for this group and move to the next
-
-    return results
+    alignment = align_groupings(groupings_file_path, transcript_file_path, use_index=use_index,
+                                fuzzy=fuzzy, band=band, min_score=min_score)
+    return matched_groupings(alignment)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,129 @@
+import json
+try:
+    from helpers.streaming import iter_json_records
+except ImportError:  # Running directly from the helpers folder
+    from streaming import iter_json_records
+
+# Defaults for the generated groupings
+DEFAULT_MAX_CHARS = 36  # Budget per grouping, in characters (or pixels with a custom measure)
+DEFAULT_PAUSE_SECONDS = 0.6  # A silence at least this long always ends a grouping
+DEFAULT_ANIMATION_STYLE = "group_basic"
+DEFAULT_OPTIONS = []
+
+SENTENCE_END = ('.', '!', '?', '…')
+CLAUSE_END = (',', ';', ':', '—', '–')
+CLAUSE_BREAK_SCORE = 1000.0  # Outranks any pause (scored in seconds)
+
+
+def generate_groupings(transcript_words, max_chars=DEFAULT_MAX_CHARS, pause_seconds=DEFAULT_PAUSE_SECONDS,
+                       measure=len, animation_style=DEFAULT_ANIMATION_STYLE, options=DEFAULT_OPTIONS):
+    """
+    Splits a word-level transcript into groupings in a single pass.
+
+    A grouping always ends at a sentence end or at a pause of at least
+    pause_seconds. When the next word would push a grouping past the
+    max_chars budget, the grouping is split at its best earlier break
+    point (a clause end, or else the longest pause) if that leaves it at
+    least half full, and otherwise right before the new word. This repeats
+    until the new word fits, so only a single word longer than max_chars
+    can exceed the budget.
+
+    Args:
+        transcript_words (iterable): Word dicts with "word", "start" and "end".
+        max_chars (float): The budget for one grouping, measured with measure.
+        pause_seconds (float): The gap between one word's end and the next word's
+                               start that always starts a new grouping.
+        measure (callable): Returns the size of a piece of text. Defaults to its
+                            length in characters; pass a pixel-width function to
+                            budget in pixels instead.
+        animation_style (str): The animation_style given to every grouping.
+        options (list): The options given to every grouping.
+
+    Returns:
+        list: Grouping dictionaries in the groupings JSON schema.
+    """
+    groupings = []
+    space = measure(' ')
+
+    current = []  # [word, size, break score after this word] for the open grouping
+    current_size = 0
+    previous_end = None
+
+    def close(count):
+        # Emit the first count words of the open grouping and keep the rest open
+        nonlocal current, current_size
+        words = [word for word, _, _ in current[:count]]
+        groupings.append({
+            "group": " ".join(words),
+            "animation_style": animation_style,
+            "options": list(options)
+        })
+        current = current[count:]
+        current_size = sum(size for _, size, _ in current) + \
+            space * max(0, len(current) - 1)
+
+    for record in transcript_words:
+        word = record['word'].strip()
+        if not word:
+            continue
+
+        # A long enough pause before this word ends the open grouping,
+        # a shorter one makes the previous word a better place to split
+        if current and previous_end is not None:
+            gap = record['start'] - previous_end
+            if gap >= pause_seconds:
+                close(len(current))
+            else:
+                current[-1][2] += max(0.0, gap)
+        previous_end = record['end']
+
+        size = measure(word)
+        added_size = size + (space if current else 0)
+        while current and current_size + added_size > max_chars:
+            # Split at the best break inside the open grouping, if it is not too early.
+            # The words left open may still not leave room for this word, so check again
+            best_count = len(current)
+            best_score = 0
+            running_size = 0
+            for k, (_, word_size, score) in enumerate(current):
+                running_size += word_size + (space if k else 0)
+                if score >= best_score and running_size >= max_chars / 2:
+                    best_count, best_score = k + 1, score
+            close(best_count)
+            added_size = size + (space if current else 0)
+
+        # Clause ends are the preferred places to split, ahead of any pause
+        score = CLAUSE_BREAK_SCORE if word.endswith(CLAUSE_END) else 0.0
+        current.append([word, size, score])
+        current_size += added_size
+
+        if word.endswith(SENTENCE_END):
+            close(len(current))
+
+    if current:
+        close(len(current))
+
+    return groupings
+
+
+def generate_groupings_file(transcript_file_path, groupings_file_path, **kwargs):
+    """
+    Reads a transcript JSON file, generates groupings for it (see
+    generate_groupings) and writes them to a groupings JSON file.
+
+    Returns:
+        list: The generated groupings.
+    """
+    groupings = generate_groupings(
+        iter_json_records(transcript_file_path), **kwargs)
+    with open(groupings_file_path, 'w', encoding='utf-8') as f:
+        json.dump(groupings, f, indent=4, ensure_ascii=False)
+    return groupings
+
+
+if __name__ == "__main__":
+    transcript_filename = "../../input_files/attentionIsAllYouNeed1_transcript.json"
+    output_filename = "./testing/generated_groupings.json"
+
+    generated = generate_groupings_file(transcript_filename, output_filename)
+    print(f"Generated {len(generated)} groupings and saved them to '{output_filename}'")
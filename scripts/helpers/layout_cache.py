@@ -0,0 +1,76 @@
+import os
+try:
+    from helpers.disk_cache import DiskCache, cache_key, DEFAULT_MAX_BYTES
+except ImportError:  # Running directly from the helpers folder
+    from disk_cache import DiskCache, cache_key, DEFAULT_MAX_BYTES
+
+# Layout cache next to a groupings file (see layout_cache_for)
+LAYOUT_CACHE_FOLDER = '.layout_cache'
+# Layout cache for words that do not come from a groupings file (see default_layout_cache)
+DEFAULT_LAYOUT_CACHE_FOLDER = os.path.join(
+    os.path.expanduser('~'), '.td_layout_cache')
+
+LAYOUT_CACHE_VERSION = 1  # The packer version: bump whenever wrapping or packing results change
+
+_MISSING = object()
+
+
+def layout_key(kind, group, animation_style, options, font, typeface, size, resolution, *settings):
+    """
+    Returns the cache key of one group's layout: a hash of everything the
+    result depends on.
+
+    Args:
+        kind (str): What is cached, e.g. 'lines' or 'packing'.
+        group (str): The group text.
+        animation_style (str): The group's animation style (None if it has none).
+        options (list): The group's options.
+        font, typeface, size: The font the layout is computed for.
+        resolution (tuple): The (width, height) the layout is computed for.
+        settings: Any other parameter the result depends on (padding, strategy, seed, ...).
+    """
+    return cache_key(LAYOUT_CACHE_VERSION, kind, group, animation_style, tuple(options or ()),
+                     font, typeface, float(size), tuple(float(v) for v in resolution), settings)
+
+
+def layout_cache_for(groupings_file_path, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Returns the DiskCache that lives next to a groupings file (in a
+    LAYOUT_CACHE_FOLDER sub-folder) and holds the layouts of its groups.
+    """
+    groupings_folder = os.path.dirname(os.path.abspath(groupings_file_path))
+    return DiskCache(os.path.join(groupings_folder, LAYOUT_CACHE_FOLDER), max_bytes)
+
+
+def default_layout_cache(max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Returns the DiskCache for layouts of words that do not come from a groupings file.
+    """
+    return DiskCache(DEFAULT_LAYOUT_CACHE_FOLDER, max_bytes)
+
+
+def cached_layouts(cache, keys, compute_missing):
+    """
+    Looks up one layout per key and computes only the missing ones.
+
+    Args:
+        cache (DiskCache): The layout cache, or None to compute everything.
+        keys (list): One layout_key per group.
+        compute_missing (callable): Takes the list of positions (into keys) whose
+                                    layouts are missing and returns their layouts,
+                                    in the same order, so they can be computed as
+                                    one batch.
+
+    Returns:
+        tuple: (the layouts in key order, how many came from the cache).
+    """
+    layouts = [cache.get(key, _MISSING) if cache is not None else _MISSING for key in keys]
+    missing = [k for k, layout in enumerate(layouts) if layout is _MISSING]
+    if missing:
+        for k, layout in zip(missing, compute_missing(missing)):
+            layouts[k] = layout
+            if cache is not None:
+                cache.put(keys[k], layout, evict=False)
+        if cache is not None:
+            cache.evict()
+    return layouts, len(keys) - len(missing)
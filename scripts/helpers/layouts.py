@@ -0,0 +1,337 @@
+from collections import Counter
+from dataclasses import dataclass
+try:
+    from helpers.network_plan import OpPlan
+    from helpers.disk_cache import cache_key
+except ImportError:  # Running directly from the helpers folder
+    from network_plan import OpPlan
+    from disk_cache import cache_key
+
+# -----------------
+# LAYOUTS
+# -----------------
+# Every function here only plans operators (see network_plan.py), so a
+# whole show can be laid out without TouchDesigner.
+
+# node layout spacing
+DEFAULT_NODES_PER_ROW = 4
+DEFAULT_BASE_SPACING = 200
+DEFAULT_TOP_SPACING = 200
+
+GROUP_PREFIX = "group_"  # Every group COMP's name starts with it (see group_names)
+GROUP_ID_LENGTH = 12  # Hex digits of the hash in a group's name (see group_names)
+
+BACKGROUND_NAME = "bg1"
+AUDIOREACTIVE_NAME = "audioreactive_scale"
+GROUPS_TABLE_NAME = "groups_table"
+
+# The expression that scales a Transform TOP with the audioreactive_scale input
+AUDIOREACTIVE_SCALE_EXPR = "op('in2')['chan1']"
+
+# The 'index' channel of an Animation COMP, and the keys it starts and ends with
+INDEX_CHANNEL_ROW = ['index', 1, 'hold', 'hold', 0, 'keys', 0.3, 0.14, 0.7, 0, 0, 0]
+
+
+def key_row(frame, value):
+    """
+    Returns a row of an Animation COMP's keys table that holds value from frame on.
+    """
+    return [1, frame, value, 0, 0, "constant()", 0, 0]
+
+
+@dataclass(frozen=True)
+class LayoutSettings:
+    """
+    Everything a layout needs to know about the project: the font, the size
+    of the Text TOPs (the parent's width and height) and the last frame.
+    """
+    font: str
+    typeface: str
+    size: float
+    width: float
+    height: float
+    last_frame: float = 0
+    top_spacing: float = DEFAULT_TOP_SPACING
+
+
+def _text_top(name, text_line, settings, resolution_height, node_x, node_y):
+    return OpPlan("textTOP", name, {
+        'text': text_line,
+        'font': settings.font,
+        'typeface': settings.typeface,
+        'fontsizex': settings.size,
+        'resolutionw': settings.width,
+        'resolutionh': resolution_height
+    }, node_x=node_x, node_y=node_y, viewer=True)
+
+
+def _layout_top(inputs, settings, node_x):
+    return OpPlan("layoutTOP", "layout", {
+        'resolutionw': settings.width,
+        'resolutionh': settings.height,
+        'scaleres': 1,  # Scale Resolution to Fit
+        'align': 3,  # Align: Top to Bottom
+        'fit': 3  # Fit: Fit Best
+    }, inputs=inputs, node_x=node_x, viewer=True)
+
+
+def _stacked_lines_layout(base, processed_lines, settings, internal_node_x, internal_node_y,
+                          with_transforms=True):
+    """
+    Plans a Text TOP per line (each followed by a Transform TOP if
+    with_transforms) stacked top to bottom by a Layout TOP.
+    """
+    line_height = settings.height / len(processed_lines) if processed_lines else settings.height
+    layout_inputs = []
+    for j, text_line in enumerate(processed_lines):
+        text_top = base.add(_text_top(f"text{j}", text_line, settings, line_height,
+                                      internal_node_x, internal_node_y))
+        internal_node_y -= settings.top_spacing
+        if not with_transforms:
+            layout_inputs.append(text_top.name)
+            continue
+
+        # Create transform TOP for text TOP
+        transform_top = base.add(OpPlan("transformTOP", f"transform_{j}", {
+            'resolutionw': settings.width,
+            'resolutionh': line_height
+        }, inputs=[text_top.name], node_x=internal_node_x, viewer=True))
+        layout_inputs.append(transform_top.name)
+
+    internal_node_x += settings.top_spacing
+    layout = base.add(_layout_top(layout_inputs, settings, internal_node_x))
+    return layout, internal_node_x, internal_node_y
+
+
+def group_basic_layout(base, processed_lines, settings, internal_node_x, internal_node_y):
+    return _stacked_lines_layout(base, processed_lines, settings, internal_node_x, internal_node_y)
+
+
+def group_rectangular_fit_layout(base, processed_lines, settings, internal_node_x, internal_node_y):
+    return _stacked_lines_layout(base, processed_lines, settings, internal_node_x, internal_node_y)
+
+
+def group_swirl(base, processed_lines, settings, internal_node_x, internal_node_y):
+    return _stacked_lines_layout(base, processed_lines, settings, internal_node_x, internal_node_y)
+
+
+def word_basic(base, processed_lines, settings, internal_node_x, internal_node_y):
+    # Create a Text TOP for each word in the line
+    text_names = []
+    for j, text_line in enumerate(processed_lines):
+        text_top = base.add(_text_top(f"text{j}", text_line, settings, settings.height,
+                                      internal_node_x, internal_node_y))
+        internal_node_y -= settings.top_spacing
+        text_names.append(text_top.name)
+
+    # Create a switch between all text inputs
+    internal_node_x += settings.top_spacing
+    switch = base.add(OpPlan("switchTOP", "switch", {
+        'resolutionw': settings.width,
+        'resolutionh': settings.height
+    }, expressions={'index': "op('index_out')['index']"}, inputs=text_names,
+        node_x=internal_node_x, node_y=internal_node_y, viewer=True))
+
+    # Create animation COMP and add timing
+    internal_node_x += settings.top_spacing
+    base.add(OpPlan("animationCOMP", "switch_anim", node_x=internal_node_x, node_y=internal_node_y, tables={
+        'channels': [INDEX_CHANNEL_ROW],
+        'keys': [key_row(1, 0), key_row(settings.last_frame, 0)]
+    }))
+
+    # create null for index
+    internal_node_x += settings.top_spacing
+    base.add(OpPlan("nullCHOP", "index_out", inputs=["switch_anim"],
+                    node_x=internal_node_x, node_y=-internal_node_y))
+
+    return switch, internal_node_x, internal_node_y
+
+
+def word_impact(base, processed_lines, settings, internal_node_x, internal_node_y):
+    return _stacked_lines_layout(base, processed_lines, settings, internal_node_x, internal_node_y,
+                                 with_transforms=False)
+
+
+# "animation_style" -> the function that plans its layout
+LAYOUT_STYLES = {
+    'group_basic': group_basic_layout,
+    'group_rectangular': group_rectangular_fit_layout,
+    'group_swirl': group_swirl,
+    'word_basic': word_basic,
+    'word_impact': word_impact,
+}
+
+
+def make_layout(animation_style, base, processed_lines, options, settings):
+    """
+    Plans the operators inside a group's Base COMP: its inputs, the layout
+    of its animation_style, and the Composite, Level and Out TOPs after it.
+    """
+    # Internal position for operators inside Base COMP
+    internal_node_x = settings.top_spacing
+    internal_node_y = 0
+
+    # Create in TOP for background
+    base.add(OpPlan("inTOP", "in1", node_x=internal_node_x, node_y=internal_node_y, viewer=True))
+    internal_node_y -= settings.top_spacing
+
+    # Create in CHOP for audioreactive scale (if applicable)
+    audioreactive = "audioreactive_scale" in options
+    if audioreactive:
+        base.add(OpPlan("inCHOP", "in2", node_x=internal_node_x, node_y=internal_node_y, viewer=True))
+        internal_node_y -= settings.top_spacing
+
+    layout = None
+    layout_function = LAYOUT_STYLES.get(animation_style)
+    if layout_function is not None:
+        layout, internal_node_x, internal_node_y = layout_function(
+            base, processed_lines, settings, internal_node_x, internal_node_y)
+
+    # Add audioreactivity to transform TOPs
+    if audioreactive:
+        for op_plan in base.children:
+            if op_plan.name.startswith("transform"):
+                op_plan.expressions['sx'] = AUDIOREACTIVE_SCALE_EXPR
+                op_plan.expressions['sy'] = AUDIOREACTIVE_SCALE_EXPR
+
+    # Create a composite and level TOP
+    internal_node_x += settings.top_spacing
+    base.add(OpPlan("compositeTOP", "comp1", {'operand': 0},
+                    inputs=["in1", layout.name if layout else None], node_x=internal_node_x))
+
+    internal_node_x += settings.top_spacing
+    base.add(OpPlan("levelTOP", "level1", {'invert': 1} if "invert_colors" in options else {},
+                    inputs=["comp1"], node_x=internal_node_x))
+
+    # Create an Out TOP and connect Level TOP as Input
+    internal_node_x += settings.top_spacing
+    base.add(OpPlan("outTOP", "out1", inputs=["level1"], node_x=internal_node_x, viewer=True))
+
+
+def plan_group(name, item, processed_lines, settings, node_x, node_y):
+    """
+    Plans the Base COMP of one grouping, fed by the background and, with the
+    audioreactive_scale option, by the audioreactive scale.
+    """
+    options = item.get('options') or []
+    inputs = [BACKGROUND_NAME]
+    if "audioreactive_scale" in options:
+        inputs.append(AUDIOREACTIVE_NAME)
+    base = OpPlan("baseCOMP", name, inputs=inputs, node_x=node_x, node_y=node_y)
+    make_layout(item.get('animation_style'), base, processed_lines, options, settings)
+    return base
+
+
+def group_names(alignment):
+    """
+    Returns a stable operator name for each grouping, derived from its text
+    (and how many identical groupings come before it) instead of its
+    position, so adding, removing or reordering groupings leaves the names
+    of all the others unchanged.
+    """
+    seen = Counter()
+    names = []
+    for item in alignment:
+        text = item['group'].strip()
+        names.append(f"{GROUP_PREFIX}{cache_key(text, seen[text])[:GROUP_ID_LENGTH]}")
+        seen[text] += 1
+    return names
+
+
+def plan_text_layouts(alignment, all_lines, settings, nodes_per_row=DEFAULT_NODES_PER_ROW,
+                      base_spacing=DEFAULT_BASE_SPACING):
+    """
+    Plans a Base COMP with Text and Layout TOPs for each grouping in the
+    alignment (see align_groupings), laid out in rows of nodes_per_row.
+
+    Args:
+        alignment (list): The groupings, as returned by align_groupings.
+        all_lines (list): The wrapped lines of each grouping.
+        settings (LayoutSettings): The font and Text TOP size.
+
+    Returns:
+        list: One OpPlan per grouping, in order, named by group_names.
+    """
+    groups = []
+    for i, (name, item, processed_lines) in enumerate(zip(group_names(alignment), alignment, all_lines)):
+        # Calculate the row and column for the current node.
+        row = i // nodes_per_row
+        col = i % nodes_per_row
+        groups.append(plan_group(name, item, processed_lines, settings,
+                                 col * base_spacing, row * -base_spacing))  # Negative spacing builds downwards
+    return groups
+
+
+# -----------------
+# TABLE-DRIVEN RENDERERS
+# -----------------
+# Instead of a Base COMP per grouping, every grouping becomes a row of one
+# Table DAT, and one renderer COMP per animation style and line count reads
+# the row of the current grouping through parameter expressions.
+
+def renderer_name(animation_style, line_count):
+    return f"renderer_{animation_style}_{line_count}"
+
+
+def _table_cell(column, index_name, table_name=GROUPS_TABLE_NAME):
+    """
+    Returns the expression, for an operator inside a renderer, that reads a
+    column of the current grouping's row (the index channel of index_name
+    is the grouping's position; row 0 is the header).
+    """
+    return f"op('../{table_name}')[int(op('../{index_name}')['index']) + 1, '{column}'].val"
+
+
+def _cell_text(value):
+    return str(value).replace("\t", " ").replace("\n", " ") if value is not None else ""
+
+
+def plan_groups_table(alignment, all_lines, fps, node_x=-200, node_y=-200):
+    """
+    Plans the Table DAT with one row per grouping: its text, style, options
+    and wrapped lines, and which renderer shows it.
+
+    Returns:
+        tuple: (the Table DAT's OpPlan, the distinct (animation_style, line
+               count) pairs in order, one renderer each; a row's 'renderer'
+               column is the position of its pair).
+    """
+    max_lines = max((len(lines) for lines in all_lines), default=0)
+    renderers = {}
+    rows = [['group', 'animation_style', 'options', 'renderer', 'line_count', 'invert_colors',
+             'audioreactive_scale', 'start_frame'] + [f"line{j}" for j in range(max_lines)]]
+    for item, lines in zip(alignment, all_lines):
+        options = item.get('options') or []
+        kind = (item.get('animation_style'), len(lines))
+        renderer = renderers.setdefault(kind, len(renderers))
+        start_frame = item['start_time'] * fps if item.get('start_time') is not None else None
+        rows.append([item['group'].strip(), kind[0], " ".join(options), renderer, len(lines),
+                     int("invert_colors" in options), int("audioreactive_scale" in options), start_frame]
+                    + list(lines) + [""] * (max_lines - len(lines)))
+    text = "\n".join("\t".join(_cell_text(value) for value in row) for row in rows)
+    return OpPlan("tableDAT", GROUPS_TABLE_NAME, node_x=node_x, node_y=node_y, text=text), list(renderers)
+
+
+def plan_renderer(animation_style, line_count, settings, index_name, node_x, node_y):
+    """
+    Plans the renderer COMP for one animation style and line count: the same
+    operators make_layout plans for a grouping, with the texts, the
+    audioreactive scale and the color inversion read from the current
+    grouping's row of the groups table instead of fixed.
+    """
+    base = OpPlan("baseCOMP", renderer_name(animation_style, line_count),
+                  inputs=[BACKGROUND_NAME, AUDIOREACTIVE_NAME], node_x=node_x, node_y=node_y)
+    make_layout(animation_style, base, [""] * line_count, ["audioreactive_scale", "invert_colors"], settings)
+
+    audioreactive = _table_cell('audioreactive_scale', index_name)
+    for op_plan in base.children:
+        if op_plan.op_type == "textTOP":
+            del op_plan.parameters['text']
+            op_plan.expressions['text'] = _table_cell(f"line{op_plan.name[len('text'):]}", index_name)
+        elif op_plan.name.startswith("transform"):
+            for name in ('sx', 'sy'):
+                op_plan.expressions[name] = f"{AUDIOREACTIVE_SCALE_EXPR} if {audioreactive} == '1' else 1"
+        elif op_plan.name == "level1":
+            del op_plan.parameters['invert']
+            op_plan.expressions['invert'] = f"int({_table_cell('invert_colors', index_name)})"
+    return base
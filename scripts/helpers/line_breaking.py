@@ -0,0 +1,161 @@
+from functools import lru_cache
+try:
+    from helpers.layout_cache import layout_key, cached_layouts
+except ImportError:  # Running directly from the helpers folder
+    from layout_cache import layout_key, cached_layouts
+
+# Line breaking methods
+GREEDY = "greedy"  # Fill each line as far as it goes
+BALANCED = "balanced"  # Minimum raggedness: even out the line widths (Knuth-Plass style)
+
+# How many wrapped texts a LineBreaker remembers
+DEFAULT_LINE_CACHE_SIZE = 4096
+
+# Penalty weight for a line that is wider than max_width (a single word that does not fit)
+OVERFLOW_PENALTY = 1e6
+
+
+class LineBreaker:
+    """
+    Wraps text into lines no wider than max_width, as measured by measure.
+
+    One LineBreaker stands for one font and one width: measure returns the
+    width of a string (e.g. GlyphMetrics.text_width for pixels, or len for
+    characters), and the lines of every text wrapped are memoized.
+
+    A word that is wider than max_width on its own gets a line to itself;
+    no empty lines are ever produced.
+    """
+
+    def __init__(self, measure, max_width, method=BALANCED, cache_size=DEFAULT_LINE_CACHE_SIZE):
+        """
+        Args:
+            measure (callable): Returns the width of a string.
+            max_width (float): The widest a line may be, in measure's units.
+            method (str): GREEDY or BALANCED.
+            cache_size (int): How many wrapped texts are memoized.
+        """
+        if method not in (GREEDY, BALANCED):
+            raise ValueError(f"Unknown line breaking method '{method}'")
+        self.measure = measure
+        self.max_width = max_width
+        self.method = method
+        self.wrap = lru_cache(maxsize=cache_size)(self._wrap)
+
+    def _wrap(self, text):
+        """
+        Returns the lines of text as a tuple of strings (see wrap).
+        """
+        words = text.split()
+        if not words:
+            return ()
+        if self.method == GREEDY:
+            return self._wrap_greedy(words)
+        return self._wrap_balanced(words)
+
+    def _wrap_greedy(self, words):
+        lines = []
+        current_line = words[0]
+        for word in words[1:]:
+            candidate = f"{current_line} {word}"
+            if self.measure(candidate) > self.max_width:
+                lines.append(current_line)
+                current_line = word
+            else:
+                current_line = candidate
+        lines.append(current_line)
+        return tuple(lines)
+
+    def _wrap_balanced(self, words):
+        """
+        Chooses the breaks that minimize the sum of squared leftover widths
+        over all lines but the last, by dynamic programming over the break
+        positions. Lines are only extended while they still fit, so this
+        costs O(words * words per line) measurements.
+        """
+        n = len(words)
+        max_width = self.max_width
+        # best[i]: (cost, start of the last line) for wrapping words[:i]
+        best = [(0.0, 0)] + [None] * n
+        for start in range(n):
+            if best[start] is None:
+                continue
+            base_cost = best[start][0]
+            line = words[start]
+            for end in range(start + 1, n + 1):
+                if end > start + 1:
+                    line = f"{line} {words[end - 1]}"
+                width = self.measure(line)
+                if width > max_width and end > start + 1:
+                    break  # Adding words only makes the line wider
+                if width > max_width:
+                    cost = OVERFLOW_PENALTY * (width - max_width)
+                elif end == n:
+                    cost = 0.0  # The last line may be as short as it likes
+                else:
+                    cost = (max_width - width) ** 2
+                if best[end] is None or base_cost + cost < best[end][0]:
+                    best[end] = (base_cost + cost, start)
+
+        lines = []
+        end = n
+        while end > 0:
+            start = best[end][1]
+            lines.append(" ".join(words[start:end]))
+            end = start
+        return tuple(reversed(lines))
+
+
+def break_lines(text, max_width, measure=len, method=BALANCED):
+    """
+    Wraps one text without memoization (see LineBreaker).
+
+    Returns:
+        list: The lines, as strings.
+    """
+    return list(LineBreaker(measure, max_width, method, cache_size=0).wrap(text))
+
+
+def make_line_breaker(max_chars_per_line, method=GREEDY, metrics=None, max_width=None):
+    """
+    Returns the LineBreaker that wraps groupings: on max_chars_per_line
+    characters, or, given the font's GlyphMetrics (see font_metrics.py), on
+    pixel widths up to max_width.
+    """
+    if metrics is not None:
+        return LineBreaker(metrics.text_width, max_width, method)
+    return LineBreaker(len, max_chars_per_line, method)
+
+
+def wrap_groupings(alignment, font, typeface, size, resolution, max_chars_per_line, method=GREEDY,
+                   metrics=None, cache=None):
+    """
+    Wraps every grouping in the alignment (see align_groupings) with one
+    line breaker (see make_line_breaker). Groupings wrapped the same way in
+    an earlier run, with the same glyph metrics, come from the layout cache,
+    and only the rest are wrapped.
+
+    Args:
+        font, typeface, size: The font of the Text TOPs.
+        resolution (tuple): The (width, height) of the Text TOPs; lines are at most
+                            width pixels wide when wrapping on pixel widths.
+        max_chars_per_line (int): The most characters on a line, when wrapping on characters.
+        method (str): GREEDY or BALANCED.
+        metrics (GlyphMetrics, optional): The font's glyph metrics, to wrap on pixel
+                                          widths instead of characters. Their digest is
+                                          part of the cache key.
+        cache (DiskCache, optional): The layout cache (see layout_cache.layout_cache_for).
+
+    Returns:
+        tuple: (the lines of each grouping, as lists of strings, how many came from the cache).
+    """
+    metrics_digest = metrics.digest() if metrics is not None else None
+    keys = [layout_key('lines', item['group'].strip(), item.get('animation_style'), item.get('options'),
+                       font, typeface, size, resolution, metrics_digest, method, max_chars_per_line)
+            for item in alignment]
+
+    def wrap_missing(positions):
+        line_breaker = make_line_breaker(max_chars_per_line, method, metrics, resolution[0])
+        return [list(line_breaker.wrap(alignment[k]['group'].strip())) for k in positions]
+
+    return cached_layouts(cache, keys, wrap_missing)
@@ -0,0 +1,239 @@
+import json
+import socket
+import time
+try:
+    from helpers.text_cleaning import clean_word_lists, cached_cleaner
+    from helpers.streaming import iter_groupings, iter_json_records
+except ImportError:  # Running directly from the helpers folder
+    from text_cleaning import clean_word_lists, cached_cleaner
+    from streaming import iter_groupings, iter_json_records
+
+# How many groupings past the current one a live word may complete
+DEFAULT_MAX_SKIP = 3
+
+
+class LiveAligner:
+    """
+    Aligns a live feed of timestamped words against the groupings, one word
+    at a time, using the same clean_word normalization as the file aligners.
+
+    The aligner only tracks the current grouping and the next max_skip
+    groupings. For each of them it keeps how many of its words the most
+    recent transcript words have matched (a KMP automaton), so every word is
+    handled in bounded time and no earlier words are ever looked at again.
+
+    push_word returns a list of events, each a dict with:
+        'event': 'start' when the current grouping's first word is heard,
+                 'end' when all of its words have been heard, or
+                 'skip' when a later grouping completed first.
+        'index': the grouping's position among the non-empty groupings
+                 (the same position as in align_groupings).
+        'group': the grouping text.
+        'time':  the start time (start), end time (end) or None (skip).
+
+    A 'start' is sent as soon as a word could begin the current grouping, so
+    it can be shown right away. If that turns out to be a false start (the
+    following words do not continue the grouping), another 'start' is sent
+    for the same index with the corrected time, at the latest together with
+    its 'end'. The last 'start' of a grouping is the right one.
+    """
+
+    def __init__(self, groupings, max_skip=DEFAULT_MAX_SKIP):
+        """
+        Args:
+            groupings (str or iterable): A groupings file path or an iterable of grouping dicts.
+            max_skip (int): How many groupings past the current one may complete
+                            and skip the ones in between (e.g. after a misheard word).
+        """
+        if isinstance(groupings, str):
+            groupings = iter_groupings(groupings)
+        self.groupings = [item for item in groupings
+                          if item.get("group", "").strip()]
+        self.cleaned_groups = clean_word_lists(
+            item["group"].split() for item in self.groupings)
+        self._clean = cached_cleaner()  # Live feeds repeat words a lot
+        self.max_skip = max_skip
+        self.current = 0  # The grouping expected next
+        self.started = False  # Whether a start event was sent for the current grouping
+        self._started_at = None  # The time of that start event
+        self._states = {}  # Grouping position -> number of its words matched so far
+        self._failures = {}  # Grouping position -> KMP failure table
+        self._recent_starts = []  # Start times of the last few words, for match start times
+        self._set_window()
+
+    def done(self):
+        """
+        Returns True once every grouping has been matched or skipped.
+        """
+        return self.current >= len(self.groupings)
+
+    def push_word(self, word, start, end):
+        """
+        Feeds one transcript word to the aligner.
+
+        Args:
+            word (str): The word as recognized (it is cleaned here).
+            start (float): The word's start time, in seconds.
+            end (float): The word's end time, in seconds.
+
+        Returns:
+            list: The events caused by this word, in order.
+        """
+        events = []
+        if self.done():
+            return events
+
+        cleaned = self._clean(word)
+
+        # Remember just enough start times to date the longest grouping in the window
+        self._recent_starts.append(start)
+        if len(self._recent_starts) > self._longest:
+            del self._recent_starts[:-self._longest]
+
+        completed = None
+        for g in range(self.current, self._window_end):
+            pattern = self.cleaned_groups[g]
+            failure = self._failure_table(g)
+            state = self._states.get(g, 0)
+            while state > 0 and cleaned != pattern[state]:
+                state = failure[state - 1]
+            if cleaned == pattern[state]:
+                state += 1
+            self._states[g] = state
+
+            if g == self.current:
+                if state == 0:
+                    self.started = False  # A false start, the grouping starts again later
+                elif not self.started:
+                    events.append(self._event('start', g, start))
+                    self.started = True
+                    self._started_at = start
+            if state == len(pattern):
+                completed = g
+                break  # The earliest completed grouping wins
+
+        if completed is not None:
+            # Groupings passed over by a later match are reported as skipped
+            for g in range(self.current, completed):
+                events.append(self._event('skip', g, None))
+            match_start = self._recent_starts[-len(
+                self.cleaned_groups[completed])]
+            if completed != self.current or not self.started or match_start != self._started_at:
+                events.append(self._event('start', completed, match_start))
+            events.append(self._event('end', completed, end))
+            self._advance(completed + 1)
+
+        return events
+
+    def _advance(self, next_grouping):
+        """
+        Moves on to next_grouping and forgets the state of everything before it.
+        """
+        self.current = next_grouping
+        self.started = False
+        self._started_at = None
+        self._states.clear()
+        self._failures = {g: table for g, table in self._failures.items()
+                          if g >= next_grouping}
+        self._set_window()
+
+    def _set_window(self):
+        """
+        Works out the groupings a word may complete from the current one on,
+        and the word count of the longest of them. Both only change when the
+        window moves.
+        """
+        self._window_end = min(len(self.groupings), self.current + self.max_skip + 1)
+        self._longest = max((len(self.cleaned_groups[g]) for g in range(self.current, self._window_end)),
+                            default=0)
+
+    def _failure_table(self, g):
+        """
+        Returns (building it on first use) the KMP failure table of grouping g.
+        """
+        table = self._failures.get(g)
+        if table is None:
+            pattern = self.cleaned_groups[g]
+            table = [0] * len(pattern)
+            k = 0
+            for i in range(1, len(pattern)):
+                while k > 0 and pattern[i] != pattern[k]:
+                    k = table[k - 1]
+                if pattern[i] == pattern[k]:
+                    k += 1
+                table[i] = k
+            self._failures[g] = table
+        return table
+
+    def _event(self, kind, g, event_time):
+        return {
+            'event': kind,
+            'index': g,
+            'group': self.groupings[g]["group"],
+            'time': event_time
+        }
+
+
+def feed_words(aligner, words, on_event):
+    """
+    Pushes word dicts ("word", "start", "end") into the aligner and passes
+    every resulting event to on_event. Stops early once all groupings are done.
+    """
+    for record in words:
+        for event in aligner.push_word(record['word'], record['start'], record['end']):
+            on_event(event)
+        if aligner.done():
+            break
+
+
+def feed_from_queue(aligner, word_queue, on_event):
+    """
+    Reads word dicts from a queue.Queue (e.g. filled by an ASR thread) until
+    it receives None, feeding each one to the aligner.
+    """
+    def queued_words():
+        while True:
+            record = word_queue.get()
+            if record is None:
+                return
+            yield record
+
+    feed_words(aligner, queued_words(), on_event)
+
+
+def feed_from_socket(aligner, host, port, on_event):
+    """
+    Connects to a local TCP socket that sends one JSON word object per line
+    and feeds the words to the aligner until the connection closes.
+    """
+    with socket.create_connection((host, port)) as connection:
+        with connection.makefile('r', encoding='utf-8') as lines:
+            feed_words(aligner, (json.loads(line)
+                       for line in lines if line.strip()), on_event)
+
+
+def replay_transcript(aligner, transcript_file_path, on_event, realtime=False):
+    """
+    Stand-in for a live ASR feed: replays a transcript JSON file word by
+    word. With realtime=True each word is held back until its end time has
+    passed on the wall clock, as it would be in a live feed.
+    """
+    def replayed_words():
+        clock_start = time.monotonic()
+        for record in iter_json_records(transcript_file_path):
+            if realtime:
+                delay = record['end'] - (time.monotonic() - clock_start)
+                if delay > 0:
+                    time.sleep(delay)
+            yield record
+
+    feed_words(aligner, replayed_words(), on_event)
+
+
+if __name__ == "__main__":
+    transcript_filename = "../../input_files/attentionIsAllYouNeed1_transcript.json"
+    groupings_filename = "../../input_files/attentionIsAllYouNeed1_groupings.json"
+
+    live_aligner = LiveAligner(groupings_filename)
+    replay_transcript(live_aligner, transcript_filename,
+                      lambda event: print(f"{event['time']}\t{event['event']}\t{event['index']}\t{event['group']}"))
@@ -0,0 +1,309 @@
+import td
+import time
+from dataclasses import replace
+try:
+    from helpers.network_plan import plan_records, diff_plan, template_key, varying_parameters
+    from helpers.layouts import GROUP_PREFIX
+except ImportError:  # Running directly from the helpers folder
+    from network_plan import plan_records, diff_plan, template_key, varying_parameters
+    from layouts import GROUP_PREFIX
+
+# Storage key, on the parent COMP, of the records of the plan applied last (see network_plan.plan_records)
+PLAN_RECORDS_KEY = 'network_plan_records'
+
+# The COMP that holds the prototypes of a TemplateCache
+TEMPLATES_NAME = "layout_templates"
+TEMPLATE_PREFIX = "template_"
+TEMPLATE_ID_LENGTH = 16
+# Parameters that differ between otherwise identical groups; everything else comes with the template
+DEFAULT_VARYING_PARAMETERS = ('text',)
+
+
+def is_templated(op_plan):
+    """
+    Returns whether op_plan is copied from a template (see TemplateCache):
+    only the group COMPs are. A show has hundreds of them in a few kinds,
+    while the other COMPs (audioreactive_scale, the table renderers) are
+    one of a kind, so a prototype of them would never be copied twice.
+    """
+    return bool(op_plan.children) and op_plan.name.startswith(GROUP_PREFIX)
+
+
+def _create_ops(op_plans, parent_op, created, templates=None):
+    """
+    Creates the planned operators and everything inside them, depth first,
+    and records each as (plan, operator, the COMP it was created in,
+    whether it was stamped from a template). With a TemplateCache, the
+    group COMPs are copied from their template instead, already configured
+    apart from their inputs.
+    """
+    for op_plan in op_plans:
+        if templates is not None and is_templated(op_plan):
+            created.append((op_plan, templates.stamp(op_plan, parent_op), parent_op, True))
+            continue
+        target = parent_op.create(getattr(td, op_plan.op_type), op_plan.name)
+        created.append((op_plan, target, parent_op, False))
+        _create_ops(op_plan.children, target, created, templates)
+
+
+def _finish_ops(created):
+    """
+    Configures and then connects freshly created operators (see _create_ops).
+    """
+    for op_plan, target, _, stamped in created:
+        if not stamped:
+            configure_op(op_plan, target)
+    for op_plan, target, created_in, _ in created:
+        connect_op(op_plan, target, created_in)
+
+
+def configure_op(op_plan, target):
+    """
+    Writes the planned parameters, expressions, node position, viewer flag
+    and tables to an existing operator.
+    """
+    target.viewer = op_plan.viewer
+    target.nodeX = op_plan.node_x
+    target.nodeY = op_plan.node_y
+    for name, value in op_plan.parameters.items():
+        setattr(target.par, name, value)
+    for name, expression in op_plan.expressions.items():
+        getattr(target.par, name).expr = expression
+    for name, rows in op_plan.tables.items():
+        table = target.op(name)
+        table.clear(keepFirstRow=True)
+        for row in rows:
+            table.appendRow(row)
+    if op_plan.text is not None:
+        target.text = op_plan.text
+
+
+def reset_dropped_parameters(op_plan, target, old_record):
+    """
+    Sets the parameters and expressions the previous plan wrote, but this
+    one does not, back to their default constant values.
+    """
+    old_parameters, old_expressions = old_record[3], old_record[4]
+    for name in old_expressions:
+        if name not in op_plan.expressions:
+            getattr(target.par, name).mode = td.ParMode.CONSTANT
+    planned = set(op_plan.parameters).union(op_plan.expressions)
+    for name in set(old_parameters + old_expressions) - planned:
+        par = getattr(target.par, name)
+        par.val = par.default
+
+
+def connect_op(op_plan, target, parent_op, rewire=False):
+    """
+    Wires the planned inputs (sibling operators, by name) to an existing
+    operator. With rewire, its current connections are removed first.
+    """
+    if rewire:
+        for connector in target.inputConnectors:
+            connector.disconnect()
+    for k, source_name in enumerate(op_plan.inputs):
+        if source_name is None:
+            continue  # Input left unconnected
+        source = parent_op.op(source_name)
+        target.inputConnectors[k].connect(source.outputConnectors[0])
+
+
+def template_name(op_plan, varying=DEFAULT_VARYING_PARAMETERS):
+    """
+    Returns the name of the prototype COMP op_plan is copied from (see TemplateCache).
+    """
+    return f"{TEMPLATE_PREFIX}{template_key(op_plan, varying)[:TEMPLATE_ID_LENGTH]}"
+
+
+def prune_templates(parent_op, plan=None, varying=DEFAULT_VARYING_PARAMETERS, name=TEMPLATES_NAME):
+    """
+    Destroys the prototypes (see TemplateCache) that no COMP of plan is
+    copied from anymore, e.g. after the last group of a kind was removed,
+    and the COMP holding them once it is empty. Without a plan, every
+    prototype is destroyed.
+
+    Returns:
+        int: How many prototypes were destroyed.
+    """
+    container = parent_op.op(name)
+    if container is None:
+        return 0
+    used = set()
+    if plan is not None:
+        used = {template_name(op_plan, varying) for op_plan in plan.ops if is_templated(op_plan)}
+    stale = [template for template in container.children if template.name not in used]
+    for template in stale:
+        template.destroy()
+    if not used:
+        container.destroy()
+    return len(stale)
+
+
+class TemplateCache:
+    """
+    Prototype COMPs for stamping out groups with copy().
+
+    Groups of the same animation style, line count and options differ only
+    in their name, inputs, position and Text TOP texts, so each distinct
+    kind (see network_plan.template_key) is built op by op once, inside a
+    COMP that never cooks, and every group of that kind is a copy of it
+    with just its texts written.
+    """
+
+    def __init__(self, parent_op, varying=DEFAULT_VARYING_PARAMETERS, name=TEMPLATES_NAME):
+        self.varying = varying
+        self.container = parent_op.op(name)
+        if self.container is None:
+            self.container = parent_op.create(td.baseCOMP, name)
+            self.container.allowCooking = False  # Templates are only copied, never shown
+            self.container.nodeX = -400
+            self.container.nodeY = -400
+        self.built = 0
+        self.stamped = 0
+
+    def template(self, op_plan):
+        """
+        Returns the prototype COMP for op_plan, building it the first time.
+        """
+        name = template_name(op_plan, self.varying)
+        template = self.container.op(name)
+        if template is None:
+            prototype = replace(op_plan, name=name, inputs=[],
+                                node_x=len(self.container.children) * 200, node_y=0)
+            created = []
+            _create_ops([prototype], self.container, created)
+            _finish_ops(created)
+            template = created[0][1]
+            self.built += 1
+        return template
+
+    def stamp(self, op_plan, parent_op):
+        """
+        Copies the template of op_plan into parent_op and writes the values
+        that differ from the template. Inputs are left to connect_op.
+        """
+        target = parent_op.copy(self.template(op_plan), name=op_plan.name)
+        for path, name, value in varying_parameters(op_plan, self.varying):
+            setattr(target.op(path).par, name, value)
+        target.nodeX = op_plan.node_x
+        target.nodeY = op_plan.node_y
+        self.stamped += 1
+        return target
+
+
+def apply_plan(plan, parent_op, use_templates=True):
+    """
+    Creates a NetworkPlan (see network_plan.py) inside parent_op in one
+    batched pass: every operator is created first, then all parameters are
+    written, then all connections are made, so no operator is wired or
+    cooked against a half-built network.
+
+    Args:
+        use_templates (bool): Copy the group COMPs from prototypes instead
+                              of creating them op by op (see TemplateCache
+                              and is_templated). Prototypes the plan does
+                              not use are destroyed either way.
+
+    Returns:
+        list: The created operators, in creation order (the contents of
+              copied COMPs are not listed).
+    """
+    created = []
+    _create_ops(plan.ops, parent_op, created, TemplateCache(parent_op) if use_templates else None)
+    _finish_ops(created)
+    prune_templates(parent_op, plan if use_templates else None)
+    parent_op.store(PLAN_RECORDS_KEY, plan_records(plan))
+    return [target for _, target, _, _ in created]
+
+
+def patch_plan(plan, parent_op, keep=(), use_templates=True):
+    """
+    Brings the network in parent_op in line with a plan, creating, updating
+    or destroying only the operators that differ from the plan applied
+    last (see network_plan.diff_plan). Unchanged COMPs are not looked into,
+    so a rerun after editing one grouping only touches that grouping's COMP.
+
+    The first time (nothing was applied to parent_op yet) every child
+    except those named in keep is destroyed and the whole plan is created.
+    Top-level operators that were deleted by hand since are created again.
+    New group COMPs are copied from templates with use_templates (see apply_plan),
+    and templates the plan no longer uses are destroyed (see prune_templates).
+
+    Returns:
+        PlanDiff: The changes that were made.
+    """
+    previous = parent_op.fetch(PLAN_RECORDS_KEY, None, search=False)
+    if previous is None:
+        for child in parent_op.findChildren(maxDepth=1):
+            if child.name not in keep:
+                child.destroy()
+        previous = {}
+    else:
+        missing = {op_plan.name for op_plan in plan.ops if parent_op.op(op_plan.name) is None}
+        if missing:
+            previous = {path: record for path, record in previous.items()
+                        if path.split("/", 1)[0] not in missing}
+
+    diff = diff_plan(plan, previous)
+    for path in diff.destroy:
+        target = parent_op.op(path)
+        if target is not None:
+            target.destroy()
+
+    created = []
+    templates = TemplateCache(parent_op) if use_templates and diff.create else None
+    for parent_path, op_plan in diff.create:
+        _create_ops([op_plan], parent_op.op(parent_path) if parent_path else parent_op, created, templates)
+
+    updated = []
+    for parent_path, op_plan, old_record in diff.update:
+        container = parent_op.op(parent_path) if parent_path else parent_op
+        target = container.op(op_plan.name)
+        reset_dropped_parameters(op_plan, target, old_record)
+        updated.append((op_plan, target, container))
+
+    for parent_path, op_plan in diff.move:
+        target = parent_op.op(f"{parent_path}/{op_plan.name}" if parent_path else op_plan.name)
+        target.nodeX = op_plan.node_x
+        target.nodeY = op_plan.node_y
+
+    for op_plan, target, _ in updated:
+        configure_op(op_plan, target)
+    _finish_ops(created)
+    for op_plan, target, container in updated:
+        connect_op(op_plan, target, container, rewire=True)
+    prune_templates(parent_op, plan if use_templates else None)
+
+    parent_op.store(PLAN_RECORDS_KEY, diff.records)
+    return diff
+
+
+def benchmark_group_build(plan, parent_op, scratch_name="template_benchmark"):
+    """
+    Times building the group COMPs of a plan (see is_templated) op by op
+    and then stamped from templates, in a scratch COMP that is
+    destroyed afterwards, and prints the time per group. Template building
+    counts towards the stamped time.
+
+    Returns:
+        dict: Seconds per group for 'op_by_op' and 'templates'.
+    """
+    comps = [replace(op_plan, inputs=[]) for op_plan in plan.ops if is_templated(op_plan)]
+    if not comps:
+        return {}
+    results = {}
+    templates = None
+    for label, use_templates in (('op_by_op', False), ('templates', True)):
+        scratch = parent_op.create(td.baseCOMP, scratch_name)
+        scratch.allowCooking = False
+        start = time.perf_counter()
+        templates = TemplateCache(scratch) if use_templates else None
+        created = []
+        _create_ops(comps, scratch, created, templates)
+        _finish_ops(created)
+        results[label] = (time.perf_counter() - start) / len(comps)
+        scratch.destroy()
+    print(f"Built {len(comps)} groups: {results['op_by_op'] * 1000:.2f} ms per group op by op, "
+          f"{results['templates'] * 1000:.2f} ms per group from {templates.built} templates "
+          f"({results['op_by_op'] / results['templates']:.1f}x)")
+    return results
@@ -0,0 +1,239 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+try:
+    from helpers.disk_cache import cache_key
+except ImportError:  # Running directly from the helpers folder
+    from disk_cache import cache_key
+
+
+@dataclass
+class OpPlan:
+    """
+    One operator to create: its type, name, parameter values, parameter
+    expressions, input connections and node position. COMPs hold the
+    operators to create inside them in children.
+
+    Plans are plain Python, so a whole network can be built, inspected and
+    timed without TouchDesigner; network_apply.apply_plan creates it.
+    """
+    op_type: str  # The operator type's name in the td module, e.g. "textTOP"
+    name: str
+    parameters: dict = field(default_factory=dict)  # Parameter name -> value
+    expressions: dict = field(default_factory=dict)  # Parameter name -> Python expression
+    inputs: list = field(default_factory=list)  # Names of the sibling operators wired to each input, in order
+    node_x: float = 0
+    node_y: float = 0
+    viewer: bool = False
+    children: list = field(default_factory=list)  # OpPlans created inside this operator
+    tables: dict = field(default_factory=dict)  # Name of a DAT inside this operator -> rows below its header
+    text: str = None  # The contents of a DAT
+
+    def add(self, op_plan):
+        """
+        Adds an operator inside this one and returns it.
+        """
+        self.children.append(op_plan)
+        return op_plan
+
+    def child(self, name):
+        """
+        Returns the operator planned inside this one under name, or None.
+        """
+        for op_plan in self.children:
+            if op_plan.name == name:
+                return op_plan
+        return None
+
+    def count(self):
+        """
+        Returns how many operators this plan creates, this one included.
+        """
+        return 1 + sum(op_plan.count() for op_plan in self.children)
+
+
+@dataclass
+class NetworkPlan:
+    """
+    The operators to create in one parent COMP, in creation order.
+    """
+    ops: list = field(default_factory=list)
+
+    def add(self, op_plan):
+        """
+        Adds an operator to the plan and returns it.
+        """
+        self.ops.append(op_plan)
+        return op_plan
+
+    def extend(self, op_plans):
+        self.ops.extend(op_plans)
+
+    def find(self, name):
+        """
+        Returns the top-level operator planned under name, or None.
+        """
+        for op_plan in self.ops:
+            if op_plan.name == name:
+                return op_plan
+        return None
+
+    def count(self):
+        """
+        Returns how many operators the plan creates in total.
+        """
+        return sum(op_plan.count() for op_plan in self.ops)
+
+
+def _shape(op_plan, varying):
+    """
+    Returns everything planned for an operator and its children except the
+    parameters named in varying.
+    """
+    parameters = {name: value for name, value in op_plan.parameters.items() if name not in varying}
+    return (op_plan.op_type, op_plan.name, parameters, op_plan.expressions, op_plan.inputs,
+            op_plan.node_x, op_plan.node_y, op_plan.viewer, op_plan.tables, op_plan.text,
+            [_shape(child, varying) for child in op_plan.children])
+
+
+def template_key(op_plan, varying):
+    """
+    Returns a hash that is the same for every COMP plan that differs from
+    this one only in its name, inputs, node position and the parameters
+    named in varying (anywhere inside it), so one prototype COMP can be
+    copied for all of them (see network_apply.TemplateCache).
+    """
+    return cache_key(op_plan.op_type, op_plan.parameters, op_plan.expressions, op_plan.viewer,
+                     op_plan.tables, op_plan.text, [_shape(child, varying) for child in op_plan.children])
+
+
+def varying_parameters(op_plan, varying, parent_path=""):
+    """
+    Returns (path inside op_plan, parameter name, value) for every parameter
+    named in varying of the operators inside op_plan: the values a copy of
+    its template still needs.
+    """
+    values = []
+    for child in op_plan.children:
+        path = f"{parent_path}/{child.name}" if parent_path else child.name
+        values.extend((path, name, value) for name, value in child.parameters.items() if name in varying)
+        values.extend(varying_parameters(child, varying, path))
+    return values
+
+
+def op_digest(op_plan):
+    """
+    Returns a hash of everything planned for one operator but its node
+    position and its children.
+    """
+    return cache_key(op_plan.op_type, op_plan.parameters, op_plan.expressions, op_plan.inputs,
+                     op_plan.viewer, op_plan.tables, op_plan.text)
+
+
+def _add_records(op_plans, parent_path, records):
+    tree_digests = []
+    for op_plan in op_plans:
+        path = f"{parent_path}/{op_plan.name}" if parent_path else op_plan.name
+        digest = op_digest(op_plan)
+        position = (op_plan.node_x, op_plan.node_y)
+        children_digest = _add_records(op_plan.children, path, records) if op_plan.children else None
+        tree_digest = cache_key(digest, position, children_digest)
+        records[path] = (op_plan.op_type, digest, tree_digest,
+                         tuple(op_plan.parameters), tuple(op_plan.expressions), position)
+        tree_digests.append(tree_digest)
+    return cache_key(*tree_digests)
+
+
+def plan_records(plan):
+    """
+    Describes every operator of a plan by its path relative to the parent
+    COMP (e.g. "group_3f2a/text0"), for diff_plan to compare against later.
+
+    Records are plain tuples so they can be kept in an operator's storage:
+    (op_type, digest of the operator, digest of it, its position and
+    everything inside it, planned parameter names, planned expression
+    names, (node_x, node_y)).
+
+    Returns:
+        dict: path -> record.
+    """
+    records = {}
+    _add_records(plan.ops, "", records)
+    return records
+
+
+@dataclass
+class PlanDiff:
+    """
+    What has to change to turn the network of a previous plan into a new one.
+    """
+    create: list = field(default_factory=list)  # (parent path, OpPlan) of new operators, with all their children
+    update: list = field(default_factory=list)  # (parent path, OpPlan, previous record) of changed operators
+    move: list = field(default_factory=list)  # (parent path, OpPlan) of operators that only changed position
+    destroy: list = field(default_factory=list)  # Paths of operators to remove, with all their children
+    records: dict = field(default_factory=dict)  # The new plan's records (see plan_records)
+
+    def is_empty(self):
+        return not (self.create or self.update or self.move or self.destroy)
+
+
+def _diff_level(op_plans, parent_path, previous, previous_children, records, diff):
+    """
+    Compares the operators planned inside one parent with the previous plan's.
+    """
+    planned = set()
+    created_names = set()
+    kept = []  # Operators that stay as they are, unless an input gets recreated
+    for op_plan in op_plans:
+        path = f"{parent_path}/{op_plan.name}" if parent_path else op_plan.name
+        planned.add(op_plan.name)
+        record = records[path]
+        old = previous.get(path)
+        if old is None or old[0] != op_plan.op_type:
+            if old is not None:
+                diff.destroy.append(path)  # Same name, other type: replace it
+            diff.create.append((parent_path, op_plan))
+            created_names.add(op_plan.name)
+            continue
+        if old[2] == record[2]:
+            kept.append((op_plan, old))
+            continue  # Nothing changed in or below this operator
+        if old[1] != record[1]:
+            diff.update.append((parent_path, op_plan, old))
+        else:
+            kept.append((op_plan, old))
+            if old[5] != record[5]:
+                diff.move.append((parent_path, op_plan))  # Only moved, e.g. when a group before it was removed
+        _diff_level(op_plan.children, path, previous, previous_children, records, diff)
+
+    # Recreated operators lose their outgoing connections, so rewire whatever they feed
+    if created_names:
+        for op_plan, old in kept:
+            if created_names.intersection(op_plan.inputs):
+                diff.update.append((parent_path, op_plan, old))
+
+    for name in previous_children.get(parent_path, ()):
+        if name not in planned:
+            diff.destroy.append(f"{parent_path}/{name}" if parent_path else name)
+
+
+def diff_plan(plan, previous):
+    """
+    Compares a plan with the records of the plan applied before (see
+    plan_records). Operators are matched by path, so only operators that
+    were added, removed or changed show up in the diff, and an unchanged
+    COMP is skipped without looking at its children.
+
+    Args:
+        plan (NetworkPlan): The network wanted now.
+        previous (dict): The records of the network as it is, {} if there is none.
+
+    Returns:
+        PlanDiff: The changes, in the order they should be made: destroy, then create, then update and move.
+    """
+    previous_children = defaultdict(list)
+    for path in previous:
+        parent_path, _, name = path.rpartition("/")
+        previous_children[parent_path].append(name)
+    diff = PlanDiff(records=plan_records(plan))
+    _diff_level(plan.ops, "", previous, previous_children, diff.records, diff)
+    return diff
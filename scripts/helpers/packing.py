@@ -0,0 +1,302 @@
+import random
+
+# Packing strategies
+MAXRECTS = "maxrects"  # Keeps every maximal free rectangle (best short side fit); best for mixed heights
+SKYLINE = "skyline"  # Tracks only the outline of what is placed; fast, and densest for same-height words
+SHELF = "shelf"  # The original single-pass shelf packer
+
+# Fit modes, for words that do not all fit at full size (see pack_words)
+FIT_NONE = None  # Skip words that do not fit
+FIT_GLOBAL = "global"  # Shrink every word by the same factor
+FIT_PER_WORD = "per_word"  # Shrink only the biggest words, down to a common longest side
+
+DEFAULT_MIN_SCALE = 0.05  # The smallest scale the fit search will try
+DEFAULT_FIT_ITERATIONS = 16  # Binary search steps (the scale is found to within 1 / 2**16 of its range)
+
+# Words set in one font share a height, which suits the skyline best
+DEFAULT_PACKING_STRATEGY = SKYLINE
+
+
+def _maxrects_pack(sizes, container_width, container_height, allow_rotation, rng):
+    """
+    Places rectangles with the MaxRects algorithm: the free space is kept as
+    a list of (possibly overlapping) maximal free rectangles, and each
+    rectangle goes where it leaves the shortest leftover side.
+
+    Returns a list of (x, y, rotated) or None per size, in the same order.
+    """
+    free = [(0.0, 0.0, float(container_width), float(container_height))]
+    placements = []
+    for width, height in sizes:
+        best = None
+        orientations = [(width, height, False)]
+        if allow_rotation and width != height:
+            orientations.append((height, width, True))
+        for fx, fy, fw, fh in free:
+            for w, h, rotated in orientations:
+                if w <= fw and h <= fh:
+                    leftover_w, leftover_h = fw - w, fh - h
+                    score = (min(leftover_w, leftover_h), max(leftover_w, leftover_h), rng.random())
+                    if best is None or score < best[0]:
+                        best = (score, fx, fy, w, h, rotated)
+        if best is None:
+            placements.append(None)
+            continue
+
+        _, x, y, w, h, rotated = best
+        placements.append((x, y, rotated))
+
+        # Split every free rectangle the new one overlaps into the free parts around it
+        split = []
+        for fx, fy, fw, fh in free:
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                split.append((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                split.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                split.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                split.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                split.append((fx, y + h, fw, fy + fh - y - h))
+
+        # Drop free rectangles that lie inside another one
+        split.sort(key=lambda r: r[2] * r[3], reverse=True)
+        free = []
+        for r in split:
+            rx, ry, rw, rh = r
+            if not any(rx >= ox and ry >= oy and rx + rw <= ox + ow and ry + rh <= oy + oh
+                       for ox, oy, ow, oh in free):
+                free.append(r)
+    return placements
+
+
+def _skyline_pack(sizes, container_width, container_height, allow_rotation, rng):
+    """
+    Places rectangles with the skyline algorithm: the bottom edge of what
+    has been placed so far is kept as a list of (x, y, width) segments, and
+    each rectangle goes where its bottom edge ends up highest (then leftmost).
+
+    Returns a list of (x, y, rotated) or None per size, in the same order.
+    """
+    skyline = [(0.0, 0.0, float(container_width))]
+    placements = []
+    for width, height in sizes:
+        best = None
+        orientations = [(width, height, False)]
+        if allow_rotation and width != height:
+            orientations.append((height, width, True))
+        for i, (x, _, _) in enumerate(skyline):
+            for w, h, rotated in orientations:
+                if x + w > container_width:
+                    continue
+                # The rectangle rests on the lowest point of the segments it spans
+                y = 0.0
+                j = i
+                while j < len(skyline) and skyline[j][0] < x + w:
+                    y = max(y, skyline[j][1])
+                    j += 1
+                if y + h > container_height:
+                    continue
+                score = (y + h, x, rng.random())
+                if best is None or score < best[0]:
+                    best = (score, i, x, y, w, h, rotated)
+        if best is None:
+            placements.append(None)
+            continue
+
+        _, i, x, y, w, h, rotated = best
+        placements.append((x, y, rotated))
+
+        # Raise the skyline under the new rectangle and merge equal neighbours
+        new_skyline = skyline[:i] + [(x, y + h, w)]
+        for sx, sy, sw in skyline[i:]:
+            if sx + sw <= x + w:
+                continue
+            if sx < x + w:
+                sw -= x + w - sx
+                sx = x + w
+            new_skyline.append((sx, sy, sw))
+        skyline = []
+        for segment in new_skyline:
+            if skyline and skyline[-1][1] == segment[1]:
+                px, py, pw = skyline[-1]
+                skyline[-1] = (px, py, pw + segment[2])
+            else:
+                skyline.append(segment)
+    return placements
+
+
+def _shelf_pack(sizes, container_width, container_height, allow_rotation, rng):
+    """
+    Places rectangles left to right on shelves, starting a new shelf below
+    the tallest rectangle of the current one when the next does not fit.
+
+    Returns a list of (x, y, rotated) or None per size, in the same order.
+    """
+    shelf_x = shelf_y = shelf_height = 0.0
+    placements = []
+    for width, height in sizes:
+        placement = None
+        while placement is None:
+            fits_horizontally = shelf_x + width <= container_width and shelf_y + height <= container_height
+            fits_vertically = allow_rotation and shelf_x + height <= container_width and \
+                shelf_y + width <= container_height
+            if fits_horizontally or fits_vertically:
+                rotated = fits_vertically and (not fits_horizontally or rng.random() < 0.5)
+                w, h = (height, width) if rotated else (width, height)
+                placement = (shelf_x, shelf_y, rotated)
+                shelf_x += w
+                shelf_height = max(shelf_height, h)
+            elif shelf_x > 0:
+                # Start a new shelf and try again
+                shelf_x, shelf_y, shelf_height = 0.0, shelf_y + shelf_height, 0.0
+            else:
+                break
+        placements.append(placement)
+    return placements
+
+
+_PACKERS = {
+    MAXRECTS: _maxrects_pack,
+    SKYLINE: _skyline_pack,
+    SHELF: _shelf_pack,
+}
+
+
+def pack_rectangles(sizes, container_width, container_height, strategy=DEFAULT_PACKING_STRATEGY,
+                    allow_rotation=True, seed=None, sort_by_size=True):
+    """
+    Packs rectangles into a container (origin top-left, y down).
+
+    Args:
+        sizes (list): (width, height) of each rectangle.
+        container_width (float): The container width.
+        container_height (float): The container height.
+        strategy (str): MAXRECTS, SKYLINE or SHELF.
+        allow_rotation (bool): Whether rectangles may be turned by 90 degrees.
+        seed: Seed for the random tie-breaks, so the same input always packs the same way.
+        sort_by_size (bool): Place the biggest rectangles first (denser), instead of in order.
+                             Placements are returned in input order either way.
+
+    Returns:
+        list: (x, y, rotated) of each rectangle's top-left corner, or None
+              for rectangles that did not fit.
+    """
+    if strategy not in _PACKERS:
+        raise ValueError(f"Unknown packing strategy '{strategy}'")
+    rng = random.Random(seed)
+    order = list(range(len(sizes)))
+    if sort_by_size:
+        order.sort(key=lambda k: (max(sizes[k]), min(sizes[k])), reverse=True)
+    packed = _PACKERS[strategy]([sizes[k] for k in order], container_width, container_height,
+                                allow_rotation, rng)
+    placements = [None] * len(sizes)
+    for k, placement in zip(order, packed):
+        placements[k] = placement
+    return placements
+
+
+def _pack_words_at(words, word_sizes, scales, container_width, container_height, padding, pack_args):
+    """
+    Packs the words with each one shrunk by its scale. Returns the placements
+    and the scaled (width, height) of every word.
+    """
+    scaled_sizes = [(word_sizes[word][0] * scale, word_sizes[word][1] * scale)
+                    for word, scale in zip(words, scales)]
+    placements = pack_rectangles([(w + padding, h + padding) for w, h in scaled_sizes],
+                                 container_width, container_height, *pack_args)
+    return placements, scaled_sizes
+
+
+def _fit_scales(words, word_sizes, container_width, container_height, padding, pack_args,
+                fit, min_scale, iterations):
+    """
+    Binary-searches the largest scales (at most 1) at which every word packs.
+    Only arithmetic: the sizes are scaled, never re-measured.
+    """
+    longest_sides = [max(word_sizes[word]) for word in words]
+    biggest = max(longest_sides)
+
+    def scales_for(t):
+        if fit == FIT_GLOBAL:
+            return [t] * len(words)
+        # FIT_PER_WORD: t is the longest side allowed, as a fraction of the biggest word's
+        return [min(1.0, t * biggest / side) if side else 1.0 for side in longest_sides]
+
+    def all_fit(t):
+        placements, _ = _pack_words_at(words, word_sizes, scales_for(t), container_width,
+                                       container_height, padding, pack_args)
+        return all(placement is not None for placement in placements)
+
+    if all_fit(1.0):
+        return scales_for(1.0)
+    low, high = min_scale, 1.0
+    if not all_fit(low):
+        print(f"Warning: Not every word fits even at scale {min_scale}.")
+        return scales_for(low)
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        if all_fit(middle):
+            low = middle
+        else:
+            high = middle
+    return scales_for(low)
+
+
+def pack_words(words, word_sizes, container_width, container_height, padding,
+               strategy=DEFAULT_PACKING_STRATEGY, allow_rotation=True, seed=None, sort_by_size=True,
+               fit=FIT_NONE, min_scale=DEFAULT_MIN_SCALE, fit_iterations=DEFAULT_FIT_ITERATIONS):
+    """
+    Packs words into a container and returns the layout_data used by
+    create_layout_from_data.
+
+    Args:
+        words (list): The words to pack (repeats are packed once per occurrence).
+        word_sizes (dict): word -> (width, height), e.g. from measure_words.
+        padding (float): Space kept to the right of and below every word.
+        fit (str): What to do when not every word fits at full size:
+                   FIT_NONE skips the words that do not fit, FIT_GLOBAL
+                   binary-searches one scale for all words and FIT_PER_WORD
+                   binary-searches the longest side any word may have,
+                   shrinking only the words bigger than that.
+        min_scale (float): The smallest scale the fit search tries.
+        fit_iterations (int): How many binary search steps the fit search takes.
+        Other arguments: see pack_rectangles.
+
+    Returns:
+        list: One dict per placed word, in input order, with 'word', 'x' and 'y'
+              (the word's center, origin top-left), 'rotation' (0 or 90),
+              'width' and 'height' (unrotated, after scaling) and 'scale'
+              (the factor to multiply the font size by).
+    """
+    words = list(words)
+    if not words:
+        return []
+    if fit not in (FIT_NONE, FIT_GLOBAL, FIT_PER_WORD):
+        raise ValueError(f"Unknown fit mode '{fit}'")
+    pack_args = (strategy, allow_rotation, seed, sort_by_size)
+    scales = [1.0] * len(words)
+    if fit != FIT_NONE:
+        scales = _fit_scales(words, word_sizes, container_width, container_height, padding,
+                             pack_args, fit, min_scale, fit_iterations)
+    placements, scaled_sizes = _pack_words_at(words, word_sizes, scales, container_width,
+                                              container_height, padding, pack_args)
+
+    layout_data = []
+    for word, placement, (width, height), scale in zip(words, placements, scaled_sizes, scales):
+        if placement is None:
+            print(f"Warning: Word '{word}' cannot fit. Container is full. Skipping.")
+            continue
+        x, y, rotated = placement
+        layout_data.append({
+            'word': word,
+            'x': x + (height if rotated else width) / 2,
+            'y': y + (width if rotated else height) / 2,
+            'rotation': 90 if rotated else 0,
+            'width': width,
+            'height': height,
+            'scale': scale
+        })
+    return layout_data
@@ -1,5 +1,10 @@
-import random
 import td
+import sys
+sys.path.extend(
+    ["C:/Projects/td-automated-text-layouts/scripts"])
+from helpers.text_measurement import measure_words, destroy_measurement_pool  # nopep8
+from helpers.packing import pack_words, SKYLINE, FIT_GLOBAL  # nopep8
+from helpers.layout_cache import layout_key, default_layout_cache, cached_layouts  # nopep8
 
 # --- SCRIPT PARAMETERS ---
 my_words = ["attention", "is", "all", "you",
@@ -8,6 +13,18 @@ container_w = 1920
 container_h = 1080
 padding = 25
 
+# --- PACKING PARAMETERS ---
+# "skyline", "maxrects" or "shelf" (see helpers/packing.py)
+PACKING_STRATEGY = SKYLINE
+# The same seed always gives the same layout; set to None for a new layout every run
+RANDOM_SEED = 0
+# When not every word fits at FONT_SIZE: "global" shrinks all words by the same factor,
+# "per_word" shrinks only the biggest words, None skips the words that do not fit
+FIT_MODE = FIT_GLOBAL
+# Reuse the placements computed for the same words and settings in an earlier run
+# (only with a RANDOM_SEED, since without one every run is meant to differ)
+USE_LAYOUT_CACHE = True
+
 # --- FONT PARAMETERS ---
 FONT_NAME = "Bahnschrift"
 FONT_TYPEFACE = "Regular"
@@ -17,118 +34,29 @@ FONT_SIZE = 130
 NODE_SPACE_X = 200
 NODE_SPACE_Y = 150
 
-# --- HELPER FUNCTIONS ---
-
-
-def get_word_dimensions(word_string):
-    """
-    Creates a temporary Text TOP and Info CHOP to get the precise pixel
-    dimensions of a rendered word.
-    """
-    # This function assumes it's being run from a script inside 'base1'
-    # or that op('base1') is a valid path.
-    base = op('base1')
-    if not base:
-        print("ERROR: Base component 'base1' not found.")
-        return 0, 0
-
-    text_top = base.op('temp_text') or base.create(td.textTOP, "temp_text")
-    text_top.par.text = word_string
-    text_top.par.font = FONT_NAME
-    text_top.par.typeface = FONT_TYPEFACE
-    text_top.par.fontsizex = FONT_SIZE
-    text_top.par.resolutionw = container_w
-    text_top.par.resolutionh = container_h
-
-    info_chop = base.op('temp_info') or base.create(td.infoCHOP, "temp_info")
-    info_chop.par.op = text_top
-    info_chop.cook(force=True)  # Ensure the CHOP has the latest values
-
-    width = float(info_chop['text_width'])
-    height = float(info_chop['text_height'])
-
-    return width, height
-
 # --- LOGIC & CALCULATION ---
 
 
-def pack_words_generatively(words_to_pack, container_width, container_height, padding):
+def pack_words_generatively(words_to_pack, container_width, container_height, padding,
+                            strategy=PACKING_STRATEGY, seed=RANDOM_SEED, fit=FIT_MODE):
     """
     Calculates the position and rotation for each word to fit inside a container.
     This function DOES NOT create any TouchDesigner nodes.
-    It returns a list of placement data.
+    It returns a list of placement data (see helpers/packing.py).
     """
-    layout_data = []
-
-    # Shelf state initialization (origin is top-left)
-    shelf_x = 0
-    shelf_y = 0
-    shelf_height = 0
-
-    words_queue = list(words_to_pack)
-
-    while words_queue:
-        word = words_queue[0]
-        original_width, original_height = get_word_dimensions(word)
-
-        # Dimensions for horizontal and vertical placement, including padding
-        h_width = original_width + padding
-        h_height = original_height + padding
-        v_width = original_height + padding
-        v_height = original_width + padding
-
-        # Check if either orientation can fit on the current shelf
-        can_fit_horizontally = (shelf_x + h_width) <= container_width
-        can_fit_vertically = (shelf_x + v_width) <= container_width
-
-        placed_on_current_shelf = False
-
-        # Determine which orientation to use
-        chosen_rotation = 0
-        if can_fit_horizontally and can_fit_vertically:
-            chosen_rotation = 0 if random.choice([True, False]) else 90
-            placed_on_current_shelf = True
-        elif can_fit_horizontally:
-            chosen_rotation = 0
-            placed_on_current_shelf = True
-        elif can_fit_vertically:
-            chosen_rotation = 90
-            placed_on_current_shelf = True
-
-        if placed_on_current_shelf:
-            # Calculate word's center based on its top-left corner and dimensions
-            if chosen_rotation == 0:
-                center_x = shelf_x + (original_width / 2)
-                center_y = shelf_y + (original_height / 2)
-                shelf_x += h_width
-                shelf_height = max(shelf_height, h_height)
-            else:  # rotation is 90
-                center_x = shelf_x + (original_height / 2)
-                center_y = shelf_y + (original_width / 2)
-                shelf_x += v_width
-                shelf_height = max(shelf_height, v_height)
-
-            layout_data.append({
-                'word': word,
-                'x': center_x,
-                'y': center_y,
-                'rotation': chosen_rotation
-            })
-            words_queue.pop(0)
-        else:
-            # Word doesn't fit, start a new shelf
-            new_shelf_y = shelf_y + shelf_height
-            min_new_height = min(h_height, v_height)
-
-            if (new_shelf_y + min_new_height) <= container_height:
-                shelf_y = new_shelf_y
-                shelf_x = 0
-                shelf_height = 0
-            else:
-                print(
-                    f"Warning: Word '{word}' cannot fit. Container full. Skipping.")
-                words_queue.pop(0)
-
+    words = list(words_to_pack)
+
+    def compute_layout(_):
+        # Measure every word up front, a whole batch per cook
+        word_sizes = measure_words(words, op('base1'), FONT_NAME, FONT_TYPEFACE, FONT_SIZE,
+                                   (container_w, container_h))
+        return [pack_words(words, word_sizes, container_width, container_height, padding,
+                           strategy=strategy, seed=seed, fit=fit)]
+
+    key = layout_key('packing', " ".join(words), None, None, FONT_NAME, FONT_TYPEFACE, FONT_SIZE,
+                     (container_width, container_height), padding, strategy, fit, seed)
+    cache = default_layout_cache() if USE_LAYOUT_CACHE and seed is not None else None
+    (layout_data,), _ = cached_layouts(cache, [key], compute_layout)
     return layout_data
 
 # --- TOUCHDESIGNER NODE CREATION ---
@@ -163,7 +91,7 @@ def create_layout_from_data(layout_data, container_width, container_height):
         text_top.par.text = word_string
         text_top.par.font = FONT_NAME
         text_top.par.typeface = FONT_TYPEFACE
-        text_top.par.fontsizex = FONT_SIZE
+        text_top.par.fontsizex = FONT_SIZE * data.get('scale', 1.0)  # Shrunk to fit, if needed
         text_top.par.resolutionw = container_w
         text_top.par.resolutionh = container_h
 
@@ -204,34 +132,39 @@ def create_layout_from_data(layout_data, container_width, container_height):
 # EXECUTION
 # --------
 
-print("Starting layout process...")
+def run():
+    """
+    Main execution function to run the entire process.
+    """
+    print("Starting layout process...")
+
+    # Ensure a clean slate
+    base = op('base1')
+    if base:
+        base.destroy()
+
+    me.parent().create(baseCOMP, "base1")
 
-# Ensure a clean slate
-base = op('base1')
-if base:
-    base.destroy()
+    # 1. Calculate the layout
+    print("Calculating word positions...")
+    layout = pack_words_generatively(
+        my_words, container_w, container_h, padding)
 
-me.parent().create(baseCOMP, "base1")
+    # 2. Build the TouchDesigner network from the calculated data
+    print("Creating TouchDesigner nodes...")
+    create_layout_from_data(layout, container_w, container_h)
 
-# 1. Calculate the layout
-print("Calculating word positions...")
-layout = pack_words_generatively(
-    my_words, container_w, container_h, padding)
+    # Clean up temporary nodes
+    destroy_measurement_pool(op('base1'))
 
-# 2. Build the TouchDesigner network from the calculated data
-print("Creating TouchDesigner nodes...")
-create_layout_from_data(layout, container_w, container_h)
+    print("\n--- Layout Calculation Complete ---")
+    for item in layout:
+        print(
+            f"Word: '{item['word']}', Center: ({item['x']:.1f}, {item['y']:.1f}), Rot: {item['rotation']} deg")
 
-# Clean up temporary nodes
-base = op('base1')
-if base.op('temp_text'):
-    base.op('temp_text').destroy()
-if base.op('temp_info'):
-    base.op('temp_info').destroy()
+    print("\nScript finished.")
 
-print("\n--- Layout Calculation Complete ---")
-for item in layout:
-    print(
-        f"Word: '{item['word']}', Center: ({item['x']:.1f}, {item['y']:.1f}), Rot: {item['rotation']} deg")
 
-print("\nScript finished.")
+# Importing this module creates nothing. To build the layout, call run() from a Text DAT:
+#     from helpers.rectangle_packing import run
+#     run()
@@ -1,5 +1,12 @@
-import random
 import td
+import sys
+sys.path.extend(
+    ["C:/Projects/td-automated-text-layouts/scripts"])
+from helpers.text_measurement import measure_words, destroy_measurement_pool  # nopep8
+from helpers.packing import pack_words, SKYLINE, FIT_GLOBAL  # nopep8
+from helpers.layout_cache import layout_key, default_layout_cache, cached_layouts  # nopep8
+from helpers.batch_packing import read_layout_file  # nopep8
+from helpers.word_cloud import place_word_cloud, frequency_scales, SPIRAL  # nopep8
 
 # --- SCRIPT PARAMETERS ---
 my_words = ["attention", "is", "all", "you",
@@ -8,6 +15,24 @@ container_w = 1920
 container_h = 1080
 padding = 25
 
+# --- PACKING PARAMETERS ---
+# "skyline", "maxrects" or "shelf" (see helpers/packing.py)
+PACKING_STRATEGY = SKYLINE
+# The same seed always gives the same layout; set to None for a new layout every run
+RANDOM_SEED = 0
+# When not every word fits at FONT_SIZE: "global" shrinks all words by the same factor,
+# "per_word" shrinks only the biggest words, None skips the words that do not fit
+FIT_MODE = FIT_GLOBAL
+# Reuse the placements computed for the same words and settings in an earlier run
+# (only with a RANDOM_SEED, since without one every run is meant to differ)
+USE_LAYOUT_CACHE = True
+
+# --- WORD CLOUD PARAMETERS ---
+# True places the words free-form as a word cloud (sized by how often they occur) instead of packing them
+USE_WORD_CLOUD = False
+# "spiral" grows the cloud from the center, "random" scatters it over the canvas
+CLOUD_PLACEMENT = SPIRAL
+
 # --- FONT PARAMETERS ---
 FONT_NAME = "Bahnschrift"
 FONT_TYPEFACE = "Regular"
@@ -17,129 +42,48 @@ FONT_SIZE = 130
 NODE_SPACE_X = 200
 NODE_SPACE_Y = 150
 
-# --- HELPER FUNCTIONS ---
+# --- LOGIC & CALCULATION ---
 
 
-def get_word_dimensions(word_string, base_op):
+def pack_words_generatively(words_to_pack, container_width, container_height, padding, base_op,
+                            strategy=PACKING_STRATEGY, seed=RANDOM_SEED, fit=FIT_MODE):
     """
-    Uses a temporary Text TOP and Info CHOP to get the precise pixel
-    dimensions of a rendered word.
+    Calculates the position and rotation for each word to fit inside a container.
+    This function DOES NOT create any TouchDesigner nodes.
+    It returns a list of placement data (see helpers/packing.py).
     """
-    if not base_op:
-        print("ERROR: Base component not found in get_word_dimensions.")
-        return 0, 0
-
-    text_top = base_op.op('temp_text') or base_op.create(
-        td.textTOP, "temp_text")
-    text_top.par.text = word_string
-    text_top.par.font = FONT_NAME
-    text_top.par.typeface = FONT_TYPEFACE
-    text_top.par.fontsizex = FONT_SIZE
-
-    # The resolution here just needs to be large enough not to clip the text
-    text_top.par.resolutionw = container_w
-    text_top.par.resolutionh = container_h
-
-    info_chop = base_op.op('temp_info') or base_op.create(
-        td.infoCHOP, "temp_info")
-    info_chop.par.op = text_top
-    info_chop.cook(force=True)  # Ensure the CHOP has the latest values
-
-    width = float(info_chop['text_width'])
-    height = float(info_chop['text_height'])
-
-    return width, height
-
-# --- LOGIC & CALCULATION ---
+    words = list(words_to_pack)
+
+    def compute_layout(_):
+        # Measure every word up front, a whole batch per cook
+        word_sizes = measure_words(words, base_op, FONT_NAME, FONT_TYPEFACE, FONT_SIZE,
+                                   (container_w, container_h))
+        return [pack_words(words, word_sizes, container_width, container_height, padding,
+                           strategy=strategy, seed=seed, fit=fit)]
+
+    key = layout_key('packing', " ".join(words), None, None, FONT_NAME, FONT_TYPEFACE, FONT_SIZE,
+                     (container_width, container_height), padding, strategy, fit, seed)
+    cache = default_layout_cache() if USE_LAYOUT_CACHE and seed is not None else None
+    (layout_data,), _ = cached_layouts(cache, [key], compute_layout)
+    return layout_data
 
 
-def pack_words_generatively(words_to_pack, container_width, container_height, padding, base_op):
+def place_words_as_cloud(words_to_place, container_width, container_height, padding, base_op,
+                         placement=CLOUD_PLACEMENT, seed=RANDOM_SEED):
     """
-    Calculates the position and rotation for each word to fit inside a container.
-    This function DOES NOT create any TouchDesigner nodes.
-    It returns a list of placement data.
+    Places each distinct word once, free-form, scaled by how often it
+    occurs (see helpers/word_cloud.py). Like pack_words_generatively it
+    only returns placement data and creates no nodes.
     """
-    layout_data = []
-
-    # Shelf state initialization (origin is top-left)
-    shelf_x = 0
-    shelf_y = 0
-    shelf_height = 0
-
-    words_queue = list(words_to_pack)
-
-    while words_queue:
-        word = words_queue[0]
-        original_width, original_height = get_word_dimensions(word, base_op)
-
-        # Dimensions for horizontal and vertical placement, including padding
-        h_width = original_width + padding
-        h_height = original_height + padding
-        v_width = original_height + padding
-        v_height = original_width + padding
-
-        # Check if either orientation can fit on the current shelf
-        can_fit_horizontally = (shelf_x + h_width) <= container_width
-        can_fit_vertically = (shelf_x + v_width) <= container_width
-
-        placed_on_current_shelf = False
-
-        # Determine which orientation to use
-        chosen_rotation = 0
-        if can_fit_horizontally and can_fit_vertically:
-            chosen_rotation = 0 if random.choice([True, False]) else 90
-            placed_on_current_shelf = True
-        elif can_fit_horizontally:
-            chosen_rotation = 0
-            placed_on_current_shelf = True
-        elif can_fit_vertically:
-            chosen_rotation = 90
-            placed_on_current_shelf = True
-
-        if placed_on_current_shelf:
-            # Calculate word's center based on its top-left corner and dimensions
-            if chosen_rotation == 0:
-                center_x = shelf_x + (original_width / 2)
-                center_y = shelf_y + (original_height / 2)
-                shelf_x += h_width
-                shelf_height = max(shelf_height, h_height)
-            else:  # rotation is 90
-                center_x = shelf_x + (original_height / 2)
-                center_y = shelf_y + (original_width / 2)
-                shelf_x += v_width
-                shelf_height = max(shelf_height, v_height)
-
-            layout_data.append({
-                'word': word,
-                'x': center_x,
-                'y': center_y,
-                'width': original_width,
-                'height': original_height,
-                'rotation': chosen_rotation
-            })
-            words_queue.pop(0)
-        else:
-            # Word doesn't fit, try to start a new shelf
-            new_shelf_y = shelf_y + shelf_height
-
-            # Check if the word can fit on a new shelf in *at least one* orientation
-            can_start_new_shelf_h = (
-                new_shelf_y + h_height) <= container_height and h_width <= container_width
-            can_start_new_shelf_v = (
-                new_shelf_y + v_height) <= container_height and v_width <= container_width
-
-            if can_start_new_shelf_h or can_start_new_shelf_v:
-                shelf_y = new_shelf_y
-                shelf_x = 0
-                shelf_height = 0
-                # The loop will continue and retry the word on the next iteration
-            else:
-                # Word truly cannot fit.
-                print(
-                    f"Warning: Word '{word}' cannot fit. Container is full. Skipping.")
-                words_queue.pop(0)
+    scales = frequency_scales(words_to_place)
+    words = list(scales)  # Distinct words, most frequent (biggest) first
 
-    return layout_data
+    # Measure every word up front, a whole batch per cook
+    word_sizes = measure_words(words, base_op, FONT_NAME, FONT_TYPEFACE, FONT_SIZE,
+                               (container_w, container_h))
+
+    return place_word_cloud(words, word_sizes, container_width, container_height, padding,
+                            placement=placement, scales=scales, seed=seed)
 
 # --- TOUCHDESIGNER NODE CREATION ---
 
@@ -172,7 +116,7 @@ def create_layout_from_data(layout_data, container_width, container_height, base
         text_top.par.text = word_string
         text_top.par.font = FONT_NAME
         text_top.par.typeface = FONT_TYPEFACE
-        text_top.par.fontsizex = FONT_SIZE
+        text_top.par.fontsizex = FONT_SIZE * data.get('scale', 1.0)  # Shrunk to fit, if needed
 
         # --- CRITICAL FIX: Set resolution to match the text content ---
         # This ensures the rotation pivot is the center of the word.
@@ -212,6 +156,23 @@ def create_layout_from_data(layout_data, container_width, container_height, base
     out.setInputs([comp])
 
 
+def create_layouts_from_file(layout_file_path, parent_op):
+    """
+    Builds one Base COMP per group from a layout-data file packed headless
+    by helpers/batch_packing.py, so no packing happens in TouchDesigner.
+    """
+    layout_file = read_layout_file(layout_file_path)
+    if (layout_file['font'], layout_file['typeface'], layout_file['font_size']) != \
+            (FONT_NAME, FONT_TYPEFACE, float(FONT_SIZE)):
+        print(f"Warning: '{layout_file_path}' was packed for {layout_file['font']} "
+              f"{layout_file['typeface']} {layout_file['font_size']}, not the current font.")
+
+    for group in layout_file['groups']:
+        group_base = parent_op.create(baseCOMP, f"group{group['index']}")
+        create_layout_from_data(group['words'], layout_file['container_width'],
+                                layout_file['container_height'], group_base)
+
+
 # --------
 # EXECUTION
 # --------
@@ -230,18 +191,19 @@ def run():
 
     # 1. Calculate the layout
     print("Calculating word positions...")
-    layout = pack_words_generatively(
-        my_words, container_w, container_h, padding, base)
+    if USE_WORD_CLOUD:
+        layout = place_words_as_cloud(
+            my_words, container_w, container_h, padding, base)
+    else:
+        layout = pack_words_generatively(
+            my_words, container_w, container_h, padding, base)
 
     # 2. Build the TouchDesigner network from the calculated data
     print("Creating TouchDesigner nodes...")
     create_layout_from_data(layout, container_w, container_h, base)
 
     # Clean up temporary nodes
-    if base.op('temp_text'):
-        base.op('temp_text').destroy()
-    if base.op('temp_info'):
-        base.op('temp_info').destroy()
+    destroy_measurement_pool(base)
 
     print("\n--- Layout Calculation Complete ---")
     for item in layout:
@@ -251,5 +213,6 @@ def run():
     print("\nScript finished.")
 
 
-# To run this, execute the run() function from a Text DAT.
-run()
+# Importing this module creates nothing. To build the layout, call run() from a Text DAT:
+#     from helpers.rectangle_packing_adjusted import run
+#     run()
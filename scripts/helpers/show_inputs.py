@@ -0,0 +1,61 @@
+try:
+    from helpers.find_transcript_groupings import align_groupings, matched_groupings
+    from helpers.text_measurement import glyph_metrics_for
+    from helpers.line_breaking import wrap_groupings
+    from helpers.layout_cache import layout_cache_for
+except ImportError:  # Running directly from the helpers folder
+    from find_transcript_groupings import align_groupings, matched_groupings
+    from text_measurement import glyph_metrics_for
+    from line_breaking import wrap_groupings
+    from layout_cache import layout_cache_for
+
+# Settings shared by every automated_text_layouts script, so the scripts cannot drift apart
+
+# Reuse the parsed transcript and alignment from the last run when neither input file changed,
+# and only realign the edited groupings when just the groupings file changed.
+# The cache lives in a .alignment_cache folder next to the transcript.
+USE_ALIGNMENT_CACHE = True
+
+# Reuse the wrapped lines of groupings whose text, style, font and wrapping settings are unchanged
+# since the last run. The cache lives in a .layout_cache folder next to the groupings file.
+USE_LAYOUT_CACHE = True
+
+# Lines are wrapped on MAX_CHARS_PER_LINE characters. Set to True to wrap them to the width of
+# the Text TOPs (the parent's width) instead, measured in pixels with the font's glyph metrics.
+# These are built from Text TOP measurements the first time a font is used and stored with the
+# text-metrics cache (see helpers/font_metrics.py).
+WRAP_ON_PIXEL_WIDTH = False
+
+# "greedy" fills each line as far as it goes, "balanced" evens out the line widths of a grouping
+LINE_BREAKING = "greedy"
+
+# The maximum number of characters allowed on a single line of text when WRAP_ON_PIXEL_WIDTH is False.
+# The user must determine this value based on the chosen font and font size.
+MAX_CHARS_PER_LINE = 12
+
+
+def align_and_wrap(groupings_filename, transcript_filename, parent_op, font, typeface, size):
+    """
+    Aligns the groupings with the transcript (see align_groupings) and wraps
+    each grouping into lines for the Text TOPs of parent_op (see
+    wrap_groupings), with the settings above.
+
+    Returns:
+        tuple: (alignment, the lines of each grouping in alignment order).
+    """
+    alignment = align_groupings(
+        groupings_filename, transcript_filename,
+        use_cache=USE_ALIGNMENT_CACHE, incremental=USE_ALIGNMENT_CACHE)
+    print(
+        f"Matched {len(matched_groupings(alignment))} of {len(alignment)} groupings to the transcript.")
+
+    # Plain numbers, not the Par objects, so they can be hashed into cache keys
+    resolution = (int(parent_op.par.w.eval()), int(parent_op.par.h.eval()))
+    metrics = None
+    if WRAP_ON_PIXEL_WIDTH:
+        metrics = glyph_metrics_for(parent_op, font, typeface, size, resolution)
+    all_lines, reused = wrap_groupings(
+        alignment, font, typeface, size, resolution, MAX_CHARS_PER_LINE, LINE_BREAKING,
+        metrics, layout_cache_for(groupings_filename) if USE_LAYOUT_CACHE else None)
+    print(f"Reused the wrapped lines of {reused} of {len(alignment)} groupings")
+    return alignment, all_lines
@@ -0,0 +1,187 @@
+try:
+    from helpers.network_plan import OpPlan, NetworkPlan
+    from helpers.backgrounds import background_one
+    from helpers.cooking_window import cooking_window_callback, DEFAULT_WINDOW_BEFORE, DEFAULT_WINDOW_AFTER
+    from helpers.layouts import (plan_text_layouts, plan_groups_table, plan_renderer, key_row,
+                                 INDEX_CHANNEL_ROW, BACKGROUND_NAME, AUDIOREACTIVE_NAME, GROUPS_TABLE_NAME,
+                                 DEFAULT_NODES_PER_ROW, DEFAULT_BASE_SPACING)
+except ImportError:  # Running directly from the helpers folder
+    from network_plan import OpPlan, NetworkPlan
+    from backgrounds import background_one
+    from cooking_window import cooking_window_callback, DEFAULT_WINDOW_BEFORE, DEFAULT_WINDOW_AFTER
+    from layouts import (plan_text_layouts, plan_groups_table, plan_renderer, key_row,
+                         INDEX_CHANNEL_ROW, BACKGROUND_NAME, AUDIOREACTIVE_NAME, GROUPS_TABLE_NAME,
+                         DEFAULT_NODES_PER_ROW, DEFAULT_BASE_SPACING)
+
+MAIN_SWITCH_NAME = "mainSwitch"
+MAIN_ANIMATION_NAME = "mainAnimation"
+MAIN_INDEX_NAME = "main_index_out"
+AUDIO_FILE_NAME = "audio_file"
+AUDIO_INFO_NAME = "audio_info"
+WATCHED_FILE_NAME = "groupings_watch"
+WATCHER_NAME = "groupings_watch_execute"
+COOKING_WINDOW_NAME = "cooking_window_execute"
+COOKING_GROUPS_NAME = "cooking_window_groups"
+
+# The DAT Execute callback of plan_file_watcher
+WATCHER_CALLBACK = """# Reruns the build script whenever the watched file is saved
+def onTableChange(dat):
+    op({script_path!r}).run(delayFrames=1)
+    return
+"""
+
+
+def plan_audio(audio_filename, base_spacing=DEFAULT_BASE_SPACING):
+    """
+    Plans the Audio File In CHOP, its Audio Device Out and Info CHOPs, and
+    the audioreactive_scale COMP that turns the audio into a scale channel.
+    """
+    audio_file = OpPlan("audiofileinCHOP", AUDIO_FILE_NAME, {'file': audio_filename, 'playmode': 0},
+                        node_x=-base_spacing * 2, node_y=300, viewer=True)
+    audio_out = OpPlan("audiodeviceoutCHOP", "audio_out", inputs=[AUDIO_FILE_NAME],
+                       node_x=-base_spacing, node_y=450, viewer=True)
+    audio_info = OpPlan("infoCHOP", AUDIO_INFO_NAME, inputs=[AUDIO_FILE_NAME],
+                        node_x=-base_spacing, node_y=350, viewer=True)
+
+    # Audioreactive Scale group: in -> average -> spectrum -> analyze -> range -> out
+    audioreactive_scale = OpPlan("baseCOMP", AUDIOREACTIVE_NAME, inputs=[AUDIO_FILE_NAME],
+                                 node_x=-base_spacing, node_y=200)
+    chain = [
+        ("inCHOP", "in1", {}),
+        ("mathCHOP", "math1", {'chanop': 5}),  # Combine Channels = Average
+        ("audiospectrumCHOP", "audiospect1", {'fftsize': 5}),
+        ("analyzeCHOP", "analyze1", {}),
+        # Adjust the From and To Ranges based on your audio file
+        ("mathCHOP", "math2", {'fromrange1': 0, 'fromrange2': 0.5, 'torange1': 0.8, 'torange2': 1}),
+        ("nullCHOP", "null1", {}),
+        ("outCHOP", "out1", {}),
+    ]
+    previous = None
+    for k, (op_type, name, parameters) in enumerate(chain):
+        audioreactive_scale.add(OpPlan(op_type, name, parameters, inputs=[previous] if previous else [],
+                                       node_x=k * 200, viewer=True))
+        previous = name
+
+    return [audio_file, audio_out, audio_info, audioreactive_scale]
+
+
+def plan_main_animation(alignment, group_names, fps, last_frame, nodes_per_row=DEFAULT_NODES_PER_ROW,
+                        base_spacing=DEFAULT_BASE_SPACING):
+    """
+    Plans the main Switch TOP fed by every group, and the Animation COMP
+    whose 'index' channel switches to each grouping at its start time.
+    """
+    # Position the switch to the right of the vertical stack of groups
+    node_x_start = (nodes_per_row * base_spacing) + 100
+    main_switch = OpPlan("switchTOP", MAIN_SWITCH_NAME, expressions={'index': f"op('{MAIN_INDEX_NAME}')['index']"},
+                         inputs=list(group_names), node_x=node_x_start, viewer=True)
+
+    # The key value is the group's position, which is also its mainSwitch input
+    keys = [key_row(1, 0)]
+    for i, item in enumerate(alignment):
+        if item["start_time"] is None:
+            continue  # Grouping was not found in the transcript
+        keys.append(key_row(item["start_time"] * fps, i))
+    keys.append(key_row(last_frame, 0))
+
+    node_x_start += base_spacing
+    anim = OpPlan("animationCOMP", MAIN_ANIMATION_NAME, node_x=node_x_start,
+                  tables={'channels': [INDEX_CHANNEL_ROW], 'keys': keys})
+
+    # A Null CHOP to hold the index channel value
+    node_x_start += base_spacing
+    index_out = OpPlan("nullCHOP", MAIN_INDEX_NAME, inputs=[MAIN_ANIMATION_NAME],
+                       node_x=node_x_start, viewer=True)
+
+    return [main_switch, anim, index_out]
+
+
+def plan_show(alignment, all_lines, settings, audio_filename, fps,
+              nodes_per_row=DEFAULT_NODES_PER_ROW, base_spacing=DEFAULT_BASE_SPACING):
+    """
+    Plans the whole network of a show: audio, background, one Base COMP per
+    grouping and the main animation switching between them.
+
+    Args:
+        alignment (list): The groupings, as returned by align_groupings.
+        all_lines (list): The wrapped lines of each grouping.
+        settings (LayoutSettings): The font, Text TOP size and last frame.
+        audio_filename (str): The show's audio file.
+        fps (float): The project's frame rate, to turn start times into frames.
+
+    Returns:
+        NetworkPlan: The operators to create in the parent COMP (see network_apply.apply_plan).
+    """
+    plan = NetworkPlan()
+    plan.extend(plan_audio(audio_filename, base_spacing))
+    plan.add(background_one(settings.width, settings.height, BACKGROUND_NAME))
+    groups = plan_text_layouts(alignment, all_lines, settings, nodes_per_row, base_spacing)
+    plan.extend(groups)
+    plan.extend(plan_main_animation(alignment, [group.name for group in groups], fps,
+                                    settings.last_frame, nodes_per_row, base_spacing))
+    return plan
+
+
+def plan_table_show(alignment, all_lines, settings, audio_filename, fps,
+                    nodes_per_row=DEFAULT_NODES_PER_ROW, base_spacing=DEFAULT_BASE_SPACING):
+    """
+    Plans the network of a show in table-driven mode: every grouping is a
+    row of one Table DAT (see layouts.plan_groups_table), and the main
+    switch picks the renderer COMP of the current grouping's style and line
+    count, which reads its texts and options from that row. The number of
+    operators depends only on how many styles and line counts are used,
+    not on the length of the transcript.
+
+    Arguments and return value: see plan_show.
+    """
+    plan = NetworkPlan()
+    plan.extend(plan_audio(audio_filename, base_spacing))
+    plan.add(background_one(settings.width, settings.height, BACKGROUND_NAME))
+    table, kinds = plan_groups_table(alignment, all_lines, fps)
+    plan.add(table)
+
+    renderers = []
+    for i, (animation_style, line_count) in enumerate(kinds):
+        row = i // nodes_per_row
+        col = i % nodes_per_row
+        renderers.append(plan.add(plan_renderer(animation_style, line_count, settings, MAIN_INDEX_NAME,
+                                                col * base_spacing, row * -base_spacing)))
+
+    main_switch, anim, index_out = plan_main_animation(
+        alignment, [renderer.name for renderer in renderers], fps, settings.last_frame, nodes_per_row,
+        base_spacing)
+    # The index channel is the grouping's position; its row says which renderer shows it
+    main_switch.expressions['index'] = (f"int(op('{GROUPS_TABLE_NAME}')"
+                                        f"[int(op('{MAIN_INDEX_NAME}')['index']) + 1, 'renderer'].val)")
+    plan.extend([main_switch, anim, index_out])
+    return plan
+
+
+def plan_file_watcher(file_path, script_path, node_x=-400, node_y=-200):
+    """
+    Plans a File In DAT that reloads file_path whenever it changes on disk,
+    and a DAT Execute DAT that then reruns the script DAT at script_path.
+    """
+    watched_file = OpPlan("fileinDAT", WATCHED_FILE_NAME, {'file': file_path, 'refresh': 1},
+                          node_x=node_x, node_y=node_y)
+    watcher = OpPlan("datexecuteDAT", WATCHER_NAME, {'dat': WATCHED_FILE_NAME, 'tablechange': 1},
+                     node_x=node_x + 200, node_y=node_y,
+                     text=WATCHER_CALLBACK.format(script_path=script_path))
+    return [watched_file, watcher]
+
+
+def plan_cooking_window(group_names, before=DEFAULT_WINDOW_BEFORE, after=DEFAULT_WINDOW_AFTER,
+                        node_x=-400, node_y=-300):
+    """
+    Plans a Table DAT listing the group COMPs in show order, and a CHOP
+    Execute DAT that, whenever the main index channel moves on to another
+    grouping, lets only the groups from before groups ahead of it to after
+    groups following it cook (see cooking_window.py). Only the groups
+    leaving or entering the window are touched, so the cost of each change
+    does not grow with the length of the show.
+    """
+    groups = OpPlan("tableDAT", COOKING_GROUPS_NAME, node_x=node_x, node_y=node_y, text="\n".join(group_names))
+    execute = OpPlan("chopexecuteDAT", COOKING_WINDOW_NAME, {'chop': MAIN_INDEX_NAME, 'valuechange': 1},
+                     node_x=node_x + 200, node_y=node_y,
+                     text=cooking_window_callback(COOKING_GROUPS_NAME, before, after))
+    return [groups, execute]
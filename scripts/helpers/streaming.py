@@ -0,0 +1,72 @@
+import json
+
+# How much of a file is read at a time by the streaming readers
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_records(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the records of a JSON file one at a time without loading the
+    whole file. The file can either hold a single JSON array (like the
+    transcript and groupings files) or be JSON Lines (one record per line).
+
+    Args:
+        file_path (str): The path to the JSON or JSON Lines file.
+        chunk_size (int): How many characters to read at a time.
+
+    Yields:
+        The decoded records, in file order.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = ''
+        pos = 0
+        at_eof = False
+        in_array = None  # Decided by the first non-whitespace character
+
+        while True:
+            # Skip whitespace, separators and the brackets of the outer array
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and in_array is None:
+                in_array = buffer[pos] == '['
+                if in_array:
+                    pos += 1
+                    continue
+            if pos < len(buffer) and in_array and buffer[pos] == ']':
+                return
+
+            if pos < len(buffer):
+                try:
+                    record, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if at_eof:
+                        raise
+                    record, end = None, None
+                # A record that runs to the end of the buffer may continue in the next chunk
+                if end is not None and (end < len(buffer) or at_eof):
+                    yield record
+                    pos = end
+                    continue
+            elif at_eof:
+                return
+
+            # Need more text: drop what has been consumed and read the next chunk
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            at_eof = not chunk
+
+
+def iter_groupings(groupings_file_path):
+    """
+    Yields groupings one at a time from a JSON / JSON Lines groupings file, or
+    from a text file with one grouping per line (as {"group": line}).
+    """
+    if groupings_file_path.lower().endswith('.txt'):
+        with open(groupings_file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield {'group': line.strip()}
+    else:
+        yield from iter_json_records(groupings_file_path)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# The helpers import each other as helpers.<module>, like the entry scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def boxes(sizes, placements):
+    """
+    Returns (left, top, right, bottom) of every placed rectangle.
+    """
+    placed = []
+    for (width, height), placement in zip(sizes, placements):
+        if placement is None:
+            continue
+        x, y, rotated = placement
+        if rotated:
+            width, height = height, width
+        placed.append((x, y, x + width, y + height))
+    return placed
+
+
+def assert_inside_without_overlap(placed, container_width, container_height):
+    """
+    Checks that the (left, top, right, bottom) boxes lie inside the container
+    and that no two of them overlap.
+    """
+    for left, top, right, bottom in placed:
+        assert left >= 0 and top >= 0
+        assert right <= container_width + 1e-6 and bottom <= container_height + 1e-6
+    for k, a in enumerate(placed):
+        for b in placed[k + 1:]:
+            overlap = a[0] < b[2] - 1e-6 and b[0] < a[2] - 1e-6 and a[1] < b[3] - 1e-6 and b[1] < a[3] - 1e-6
+            assert not overlap, (a, b)
@@ -0,0 +1,173 @@
+from helpers.cooking_window import (GroupComps, active_window, window_changes, set_cooking_window,
+                                    move_cooking_window, cooking_window_callback, release_textures,
+                                    restore_textures)
+from helpers.show_plan import plan_cooking_window
+
+
+class FakeValue:
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self):
+        return self.value
+
+
+class FakePar:
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, FakeValue(value))
+
+
+class FakeTOP:
+    def __init__(self, name, width, height):
+        self.name = name
+        self.par = FakePar()
+        self.par.resolutionw = width
+        self.par.resolutionh = height
+
+    def resolution(self):
+        return self.par.resolutionw.eval(), self.par.resolutionh.eval()
+
+
+class FakeComp:
+    def __init__(self, name):
+        self.name = name
+        self.allowCooking = True
+        self.children = {"text0": FakeTOP("text0", 1920, 540), "layout": FakeTOP("layout", 1920, 1080)}
+        self.storage = {}
+        self.cooks = []  # The resolution of text0 at every cook
+
+    def cook(self, force=False, recurse=False):
+        self.cooks.append(self.children["text0"].resolution())
+
+    def findChildren(self):
+        return list(self.children.values())
+
+    def relativePath(self, child):
+        return child.name
+
+    def op(self, path):
+        return self.children.get(path)
+
+    def fetch(self, key, default=None, search=True):
+        return self.storage.get(key, default)
+
+    def store(self, key, value):
+        self.storage[key] = value
+
+    def unstore(self, key):
+        del self.storage[key]
+
+    def released(self):
+        return all(child.resolution() == (1, 1) for child in self.children.values())
+
+
+class FakeCell:
+    def __init__(self, val):
+        self.val = val
+
+
+class FakeTable:
+    def __init__(self, names):
+        self.names = names
+
+    @property
+    def numRows(self):
+        return len(self.names)
+
+    def __getitem__(self, cell):
+        return FakeCell(self.names[cell[0]])
+
+
+class FakeParent:
+    def __init__(self, comps):
+        self.comps = {comp.name: comp for comp in comps}
+        self.looked_up = []
+
+    def op(self, name):
+        self.looked_up.append(name)
+        return self.comps[name]
+
+
+def cooking(comps):
+    return [k for k, comp in enumerate(comps) if comp.allowCooking]
+
+
+def test_window_is_clipped_to_the_show():
+    assert list(active_window(0, 10)) == [0, 1]
+    assert list(active_window(9, 10, before=1, after=2)) == [8, 9]
+    assert list(active_window(4.0, 10, before=1, after=1)) == [3, 4, 5]
+
+
+def test_window_changes_only_list_groups_entering_or_leaving():
+    assert window_changes(3, 4, 10) == ([5], [3])
+    assert window_changes(0, 7, 10, before=1, after=1) == ([6, 7, 8], [0, 1])
+    assert window_changes(2, 2, 10) == ([], [])
+
+
+def test_moving_the_window_follows_the_index_and_cooks_new_groups():
+    comps = [FakeComp(f"group_{k}") for k in range(6)]
+    set_cooking_window(comps, 0)
+    assert cooking(comps) == [0, 1]
+
+    for previous, index, expected in [(0, 1, [1, 2]), (1, 2, [2, 3]), (2, 5, [5]), (5, 0, [0, 1])]:
+        move_cooking_window(comps, previous, index)
+        assert cooking(comps) == expected
+    # Released after the build, cooked at full size on entering the window, released on leaving it
+    assert comps[3].cooks == [(1, 1), (1920, 540), (1, 1)]
+
+
+def test_only_groups_in_the_window_keep_their_textures():
+    comps = [FakeComp(f"group_{k}") for k in range(50)]
+    set_cooking_window(comps, 0, before=1, after=2)
+
+    for index in range(1, 50):
+        move_cooking_window(comps, index - 1, index, before=1, after=2)
+        full_size = [k for k, comp in enumerate(comps) if not comp.released()]
+        assert full_size == list(active_window(index, 50, before=1, after=2))
+    assert comps[10].children["layout"].resolution() == (1, 1)
+
+    move_cooking_window(comps, 49, 10, before=1, after=2)
+    assert comps[10].children["text0"].resolution() == (1920, 540)
+    assert comps[10].children["layout"].resolution() == (1920, 1080)
+    assert comps[10].storage == {}
+
+
+def test_release_records_resolutions_a_rebuild_wrote_again():
+    comp = FakeComp("group_0")
+    release_textures(comp)
+    comp.children["text0"].par.resolutionw = 1280  # An update after a resize, while released
+    comp.children["text0"].par.resolutionh = 360
+
+    release_textures(comp)
+    assert comp.released()
+    restore_textures(comp)
+
+    assert comp.children["text0"].resolution() == (1280, 360)
+    assert comp.children["layout"].resolution() == (1920, 1080)
+
+
+def test_groups_are_resolved_by_name_and_only_when_touched():
+    comps = [FakeComp(f"group_{k}") for k in range(1000)]
+    set_cooking_window(comps, 500)
+    parent = FakeParent(comps)
+
+    move_cooking_window(GroupComps(FakeTable([comp.name for comp in comps]), parent), 500, 501)
+
+    assert cooking(comps) == [501, 502]
+    assert sorted(parent.looked_up) == ["group_500", "group_502"]
+
+
+def test_callback_imports_the_helper_and_moves_the_window():
+    comps = [FakeComp(f"group_{k}") for k in range(4)]
+    set_cooking_window(comps, 0)
+    parent = FakeParent(comps)
+    table = FakeTable([comp.name for comp in comps])
+    table_dat, execute_dat = plan_cooking_window([comp.name for comp in comps])
+    assert table_dat.text.split("\n") == table.names
+
+    callback = {'op': lambda name: table, 'parent': lambda: parent}
+    exec(cooking_window_callback(table_dat.name), callback)
+    callback['onValueChange'](None, 0, 2.0, 0.0)
+
+    assert cooking(comps) == [2, 3]
+    assert execute_dat.parameters['chop'] == 'main_index_out'
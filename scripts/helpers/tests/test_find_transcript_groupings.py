@@ -0,0 +1,123 @@
+import json
+import os
+import random
+
+from helpers.find_transcript_groupings import (match_groupings, realign_changed_groupings, align_groupings,
+                                               find_grouping_times_json)
+
+INPUT_FOLDER = os.path.join(os.path.dirname(__file__), "..", "..", "..", "input_files")
+SAMPLE_TRANSCRIPT = os.path.join(INPUT_FOLDER, "attentionIsAllYouNeed1_transcript.json")
+SAMPLE_GROUPINGS = os.path.join(INPUT_FOLDER, "attentionIsAllYouNeed1_groupings.json")
+
+
+def random_transcript(num_words, vocabulary_size=300, seed=1):
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(vocabulary_size)]
+    return [rng.choice(vocabulary) for _ in range(num_words)]
+
+
+def test_fuzzy_without_anchors_finds_groupings_in_part_of_the_transcript():
+    # Two-word groupings are too short to anchor on, and only cover the second half
+    transcript = random_transcript(2000)
+    groups = [transcript[i:i + 2] for i in range(1000, 2000, 2)]
+
+    spans = match_groupings(transcript, groups, fuzzy=True)
+
+    assert [span[:2] for span in spans] == [(i, i + 1) for i in range(1000, 2000, 2)]
+
+
+def test_fuzzy_without_anchors_keeps_misheard_groupings():
+    transcript = random_transcript(2000)
+    groups = [transcript[i:i + 2] for i in range(1000, 2000, 2)]
+    for group in groups[::5]:
+        group[1] = "misheard"
+
+    spans = match_groupings(transcript, groups, fuzzy=True)
+
+    assert all(span is not None and span[0] == 1000 + 2 * k for k, span in enumerate(spans))
+    assert spans[0][2] == 0.5
+
+
+def test_index_and_scan_give_the_same_exact_matches():
+    # A small vocabulary, so groupings repeat and partial matches are common
+    transcript = random_transcript(3000, vocabulary_size=20, seed=2)
+    rng = random.Random(3)
+    groups = []
+    for start in range(0, 2900, 37):
+        groups.append(transcript[start:start + rng.randint(1, 6)])
+        groups.append(["never", "said"])  # Unmatched groupings leave the cursor in place
+
+    assert match_groupings(transcript, groups, use_index=True) == match_groupings(transcript, groups, use_index=False)
+
+
+def test_index_and_scan_give_the_same_times_for_the_sample_show():
+    assert (find_grouping_times_json(SAMPLE_GROUPINGS, SAMPLE_TRANSCRIPT, use_index=True) ==
+            find_grouping_times_json(SAMPLE_GROUPINGS, SAMPLE_TRANSCRIPT, use_index=False))
+
+
+def incremental_and_full_spans(transcript, previous_groups, groups):
+    previous_spans = match_groupings(transcript, previous_groups)
+    incremental = realign_changed_groupings(transcript, [tuple(group) for group in previous_groups],
+                                            previous_spans, groups)
+    return incremental, match_groupings(transcript, groups)
+
+
+def repeating_show(seed):
+    # A small vocabulary, so an edit can pull the groupings after it onto other occurrences
+    transcript = random_transcript(3000, vocabulary_size=15, seed=seed)
+    rng = random.Random(seed)
+    groups = []
+    start = 0
+    while start < 2900:
+        length = rng.randint(1, 4)
+        groups.append(transcript[start:start + length])
+        start += length + rng.randint(0, 3)
+    return transcript, groups, rng
+
+
+def test_incremental_realignment_equals_a_full_one_after_an_insert():
+    for seed in range(20):
+        transcript, groups, rng = repeating_show(seed)
+        k = rng.randrange(len(groups))
+        edited = groups[:k] + [transcript[rng.randrange(2900):][:rng.randint(1, 3)]] + groups[k:]
+
+        incremental, full = incremental_and_full_spans(transcript, groups, edited)
+        assert incremental == full
+
+
+def test_incremental_realignment_equals_a_full_one_after_a_delete():
+    for seed in range(20):
+        transcript, groups, rng = repeating_show(seed)
+        k = rng.randrange(len(groups))
+        edited = groups[:k] + groups[k + 1:]
+
+        incremental, full = incremental_and_full_spans(transcript, groups, edited)
+        assert incremental == full
+
+
+def test_incremental_realignment_equals_a_full_one_after_an_edit():
+    for seed in range(20):
+        transcript, groups, rng = repeating_show(seed)
+        edited = list(groups)
+        for k in rng.sample(range(len(groups)), 3):
+            edited[k] = groups[k] + ["w0"] if k % 2 else ["never", "said"]
+
+        incremental, full = incremental_and_full_spans(transcript, groups, edited)
+        assert incremental == full
+
+
+def test_incremental_alignment_of_an_edited_groupings_file_equals_a_full_one(tmp_path):
+    transcript_path = tmp_path / "transcript.json"
+    transcript_path.write_bytes(open(SAMPLE_TRANSCRIPT, 'rb').read())
+    groupings = json.load(open(SAMPLE_GROUPINGS, encoding='utf-8'))
+    groupings_path = tmp_path / "groupings.json"
+    groupings_path.write_text(json.dumps(groupings), encoding='utf-8')
+    align_groupings(str(groupings_path), str(transcript_path), use_cache=True, incremental=True)
+
+    # Insert a copy of a later grouping, drop one and reword another
+    edited = groupings[:2] + [groupings[10]] + groupings[2:5] + groupings[6:]
+    edited[8] = dict(edited[8], group=edited[8]['group'] + " attention")
+    groupings_path.write_text(json.dumps(edited), encoding='utf-8')
+
+    assert (align_groupings(str(groupings_path), str(transcript_path), use_cache=True, incremental=True) ==
+            align_groupings(str(groupings_path), str(transcript_path)))
@@ -0,0 +1,95 @@
+import json
+import random
+
+from helpers.generate_groupings import (generate_groupings, generate_groupings_file, SENTENCE_END,
+                                        DEFAULT_ANIMATION_STYLE)
+from helpers.find_transcript_groupings import load_groupings
+
+
+def timed_words(words, gaps=None):
+    # Words of 0.3 seconds, separated by the given gaps (0.1 seconds by default)
+    records = []
+    time = 0.0
+    for k, word in enumerate(words):
+        records.append({"word": word, "start": time, "end": time + 0.3})
+        time += 0.3 + (gaps[k] if gaps else 0.1)
+    return records
+
+
+def random_speech(num_words, seed):
+    rng = random.Random(seed)
+    words = []
+    gaps = []
+    for _ in range(num_words):
+        word = "".join(rng.choice("abcdefgh") for _ in range(rng.randint(1, 9)))
+        word += rng.choice(["", "", "", "", ",", ";", ".", "?"])
+        words.append(word)
+        gaps.append(rng.choice([0.0, 0.05, 0.1, 0.3, 0.5, 0.8]))
+    return timed_words(words, gaps)
+
+
+def generate_groupings_file_from(records, folder, groupings_path):
+    transcript_path = folder / "transcript.json"
+    transcript_path.write_text(json.dumps(records), encoding="utf-8")
+    return generate_groupings_file(str(transcript_path), str(groupings_path))
+
+
+def test_groupings_never_exceed_the_budget():
+    for seed in range(10):
+        groupings = generate_groupings(random_speech(2000, seed), max_chars=20)
+        assert all(len(grouping["group"]) <= 20 for grouping in groupings)
+
+
+def test_words_left_open_by_a_split_are_checked_against_the_budget_again():
+    # The clause end splits off the first word, but the rest still leaves no room for the last one
+    records = timed_words(["aaaaaaaaaa,", "bbbbbbbb", "cccccccccccc"])
+
+    groupings = generate_groupings(records, max_chars=20)
+
+    assert [grouping["group"] for grouping in groupings] == ["aaaaaaaaaa,", "bbbbbbbb", "cccccccccccc"]
+
+
+def test_groupings_keep_every_word_in_order():
+    records = random_speech(2000, 1)
+
+    groupings = generate_groupings(records, max_chars=20)
+
+    assert " ".join(grouping["group"] for grouping in groupings).split() == [record["word"] for record in records]
+
+
+def test_long_pauses_and_sentence_ends_always_close_a_grouping():
+    records = random_speech(2000, 2)
+
+    groupings = generate_groupings(records, max_chars=30, pause_seconds=0.6)
+
+    # The words that end a grouping, by their position in the transcript
+    last_words = set()
+    position = -1
+    for grouping in groupings:
+        position += len(grouping["group"].split())
+        last_words.add(position)
+    for k, record in enumerate(records[:-1]):
+        if records[k + 1]["start"] - record["end"] >= 0.6 or record["word"].endswith(SENTENCE_END):
+            assert k in last_words
+
+
+def test_groupings_split_at_a_clause_end_before_a_longer_pause():
+    # "six" does not fit, and the comma after "three" beats the pause after "four"
+    records = timed_words(["one", "two", "three,", "four", "five", "six"], [0.1, 0.1, 0.1, 0.5, 0.1, 0.1])
+
+    groupings = generate_groupings(records, max_chars=24, pause_seconds=0.6)
+
+    assert [grouping["group"] for grouping in groupings] == ["one two three,", "four five six"]
+
+
+def test_generated_groupings_file_uses_the_groupings_schema(tmp_path):
+    path = tmp_path / "groupings.json"
+
+    groupings = generate_groupings_file_from(random_speech(200, 3), tmp_path, path)
+
+    assert load_groupings(str(path)) == groupings
+    for grouping in groupings:
+        assert set(grouping) == {"group", "animation_style", "options"}
+        assert grouping["animation_style"] == DEFAULT_ANIMATION_STYLE
+        assert grouping["options"] == []
+    assert groupings[0]["options"] is not groupings[1]["options"]
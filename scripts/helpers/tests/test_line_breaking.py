@@ -0,0 +1,74 @@
+from helpers.line_breaking import LineBreaker, wrap_groupings, break_lines, GREEDY, BALANCED
+from helpers.font_metrics import GlyphMetrics
+from helpers.disk_cache import DiskCache
+
+
+def character_wrap(words, max_chars_per_line):
+    """
+    The character-count wrapping loop the entry scripts used before LineBreaker.
+    """
+    processed_lines = []
+    current_line = ""
+    for word in words:
+        if len(current_line) + len(word) + 1 > max_chars_per_line:
+            processed_lines.append(current_line)
+            current_line = word
+        else:
+            current_line += f" {word}" if current_line else word
+    processed_lines.append(current_line)
+    return processed_lines
+
+
+def test_default_wrapping_matches_the_character_count_loop():
+    texts = ["attention is all you need", "to create dynamic typography", "a b c d e f g h i j k l m",
+             "need", "you need to create all of it"]
+    alignment = [{"group": text} for text in texts]
+
+    all_lines, reused = wrap_groupings(alignment, "Bahnschrift", "Regular", 130, (1920, 1080), 12)
+
+    assert all_lines == [character_wrap(text.split(), 12) for text in texts]
+    assert reused == 0
+
+
+def test_pixel_wrapping_uses_the_metrics_and_width():
+    metrics = GlyphMetrics("f", "t", 10, {c: 10.0 for c in "abcd "})
+
+    all_lines, _ = wrap_groupings([{"group": "aa bb cc dd"}], "f", "t", 10, (50, 10), 2, GREEDY, metrics)
+
+    assert all_lines == [["aa bb", "cc dd"]]
+
+
+def test_cached_lines_are_not_reused_with_rebuilt_metrics(tmp_path):
+    cache = DiskCache(str(tmp_path / "layouts"))
+    alignment = [{"group": "aa bb cc dd"}]
+    narrow = GlyphMetrics("f", "t", 10, {c: 10.0 for c in "abcd "})
+    wide = GlyphMetrics("f", "t", 10, {c: 20.0 for c in "abcd "})
+
+    wrap_groupings(alignment, "f", "t", 10, (50, 10), 2, GREEDY, narrow, cache)
+    all_lines, reused = wrap_groupings(alignment, "f", "t", 10, (50, 10), 2, GREEDY, wide, cache)
+
+    assert reused == 0
+    assert all_lines == [["aa", "bb", "cc", "dd"]]
+
+    # The same metrics loaded back from disk still reuse the lines
+    wide.save(str(tmp_path / "wide.glyphs.json"))
+    reloaded = GlyphMetrics.load(str(tmp_path / "wide.glyphs.json"))
+    assert wrap_groupings(alignment, "f", "t", 10, (50, 10), 2, GREEDY, reloaded, cache)[1] == 1
+
+
+def test_lines_fit_and_keep_every_word():
+    text = "the quick brown fox jumps over the lazy dog and keeps running far away"
+    for method in (GREEDY, BALANCED):
+        lines = break_lines(text, 16, method=method)
+        assert " ".join(lines) == text
+        assert all(len(line) <= 16 for line in lines)
+
+
+def test_balanced_evens_out_the_lines():
+    assert break_lines("aaa bb cc ddddd", 6, method=GREEDY) == ["aaa bb", "cc", "ddddd"]
+    assert break_lines("aaa bb cc ddddd", 6, method=BALANCED) == ["aaa", "bb cc", "ddddd"]
+
+
+def test_overlong_word_gets_a_line_of_its_own():
+    assert LineBreaker(len, 5, GREEDY).wrap("a typography b") == ("a", "typography", "b")
+    assert break_lines("", 5) == []
@@ -0,0 +1,39 @@
+from helpers.live_alignment import LiveAligner
+
+
+def push_words(aligner, text):
+    """
+    Feeds the words of text one per second and returns (event, index, time) tuples.
+    """
+    events = []
+    for k, word in enumerate(text.split()):
+        events.extend((event['event'], event['index'], event['time'])
+                      for event in aligner.push_word(word, k, k + 0.5))
+    return events
+
+
+def test_start_is_corrected_after_a_false_start():
+    events = push_words(LiveAligner([{"group": "the cat"}]), "the dog the cat")
+
+    assert events[-2:] == [('start', 0, 2), ('end', 0, 3.5)]
+
+
+def test_start_is_corrected_when_the_match_restarts_partway():
+    events = push_words(LiveAligner([{"group": "a a b"}]), "a a a b")
+
+    assert events == [('start', 0, 0), ('start', 0, 1), ('end', 0, 3.5)]
+
+
+def test_single_start_for_a_clean_match():
+    events = push_words(LiveAligner([{"group": "the cat"}, {"group": "sat down"}]), "the cat sat down")
+
+    assert events == [('start', 0, 0), ('end', 0, 1.5), ('start', 1, 2), ('end', 1, 3.5)]
+
+
+def test_later_grouping_completing_first_skips_the_current_one():
+    aligner = LiveAligner([{"group": "misheard words"}, {"group": "the cat"}])
+
+    events = push_words(aligner, "the cat")
+
+    assert events == [('skip', 0, None), ('start', 1, 0), ('end', 1, 1.5)]
+    assert aligner.done()
@@ -0,0 +1,78 @@
+from helpers.network_plan import OpPlan, NetworkPlan, plan_records, diff_plan
+from helpers.layouts import LayoutSettings, group_names
+from helpers.show_plan import plan_show, MAIN_SWITCH_NAME, MAIN_ANIMATION_NAME
+
+SETTINGS = LayoutSettings("Bahnschrift", "Regular", 130, 1920, 1080, last_frame=6000)
+TEXTS = ["attention is all", "you need", "to create", "dynamic typography", "one more", "and the last"]
+
+
+def alignment(texts=TEXTS):
+    return [{"group": text, "animation_style": "group_basic", "options": [], "start_time": k * 2.0}
+            for k, text in enumerate(texts)]
+
+
+def show(items):
+    return plan_show(items, [[item["group"]] for item in items], SETTINGS, "audio.mp3", 60)
+
+
+def test_unchanged_plan_has_no_changes():
+    diff = diff_plan(show(alignment()), plan_records(show(alignment())))
+
+    assert diff.is_empty()
+
+
+def test_first_run_creates_every_top_level_operator():
+    plan = show(alignment())
+
+    diff = diff_plan(plan, {})
+
+    assert [op_plan.name for _, op_plan in diff.create] == [op_plan.name for op_plan in plan.ops]
+    assert not diff.update and not diff.destroy
+
+
+def test_editing_one_grouping_only_touches_that_group():
+    items = alignment()
+    previous = plan_records(show(items))
+    items[2]["options"] = ["invert_colors"]
+
+    diff = diff_plan(show(items), previous)
+
+    edited = group_names(items)[2]
+    assert diff.update and all(parent_path.startswith(edited) for parent_path, _, _ in diff.update)
+    assert not diff.create and not diff.destroy and not diff.move
+
+
+def test_removing_a_grouping_destroys_it_and_moves_the_rest():
+    items = alignment()
+    names = group_names(items)
+    previous = plan_records(show(items))
+
+    diff = diff_plan(show(items[:1] + items[2:]), previous)
+
+    assert diff.destroy == [names[1]]
+    assert not diff.create
+    assert {op_plan.name for _, op_plan in diff.move} == set(names[2:])
+    # The switch loses an input and the keys shift, nothing inside the other groups changes
+    assert {op_plan.name for _, op_plan, _ in diff.update} <= {MAIN_SWITCH_NAME, MAIN_ANIMATION_NAME}
+
+
+def test_operators_fed_by_a_recreated_operator_are_rewired():
+    before = NetworkPlan([OpPlan("constantTOP", "source"), OpPlan("nullTOP", "target", inputs=["source"]),
+                          OpPlan("nullTOP", "other")])
+    after = NetworkPlan([OpPlan("noiseTOP", "source"), OpPlan("nullTOP", "target", inputs=["source"]),
+                         OpPlan("nullTOP", "other")])
+
+    diff = diff_plan(after, plan_records(before))
+
+    assert diff.destroy == ["source"]
+    assert [op_plan.name for _, op_plan in diff.create] == ["source"]
+    assert [op_plan.name for _, op_plan, _ in diff.update] == ["target"]
+
+
+def test_changed_child_is_updated_inside_its_parent():
+    before = NetworkPlan([OpPlan("baseCOMP", "group", children=[OpPlan("textTOP", "text0", {'text': "a"})])])
+    after = NetworkPlan([OpPlan("baseCOMP", "group", children=[OpPlan("textTOP", "text0", {'text': "b"})])])
+
+    diff = diff_plan(after, plan_records(before))
+
+    assert [(parent_path, op_plan.name) for parent_path, op_plan, _ in diff.update] == [("group", "text0")]
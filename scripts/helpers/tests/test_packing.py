@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from helpers.packing import pack_rectangles, pack_words, MAXRECTS, SKYLINE, SHELF, FIT_GLOBAL, FIT_PER_WORD
+from conftest import boxes, assert_inside_without_overlap
+
+STRATEGIES = [MAXRECTS, SKYLINE, SHELF]
+
+
+def random_sizes(count, seed=0):
+    rng = random.Random(seed)
+    return [(rng.randint(20, 300), rng.randint(20, 120)) for _ in range(count)]
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_rectangles_stay_inside_and_never_overlap(strategy):
+    sizes = random_sizes(300)
+
+    placements = pack_rectangles(sizes, 1920, 1080, strategy=strategy, seed=0)
+
+    assert any(placement is None for placement in placements)  # More than fits, so the container fills up
+    assert_inside_without_overlap(boxes(sizes, placements), 1920, 1080)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_same_seed_packs_the_same_way(strategy):
+    sizes = random_sizes(40, seed=1)
+
+    assert (pack_rectangles(sizes, 1920, 1080, strategy=strategy, seed=7) ==
+            pack_rectangles(sizes, 1920, 1080, strategy=strategy, seed=7))
+
+
+@pytest.mark.parametrize("fit", [FIT_GLOBAL, FIT_PER_WORD])
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_fitting_shrinks_words_until_all_of_them_fit(strategy, fit):
+    sizes = random_sizes(250, seed=2)
+    words = [f"word{k}" for k in range(len(sizes))]
+    word_sizes = dict(zip(words, sizes))
+
+    layout_data = pack_words(words, word_sizes, 1920, 1080, 10, strategy=strategy, seed=0, fit=fit)
+
+    assert [item['word'] for item in layout_data] == words
+    assert any(item['scale'] < 1 for item in layout_data)
+    placed = []
+    for item in layout_data:
+        width, height = item['width'], item['height']
+        if item['rotation'] == 90:
+            width, height = height, width
+        placed.append((item['x'] - width / 2, item['y'] - height / 2,
+                       item['x'] + width / 2, item['y'] + height / 2))
+    assert_inside_without_overlap(placed, 1920, 1080)
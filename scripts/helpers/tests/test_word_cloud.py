@@ -0,0 +1,39 @@
+import random
+
+import pytest
+
+from helpers.word_cloud import place_word_cloud, frequency_scales, SPIRAL, RANDOM
+from conftest import boxes, assert_inside_without_overlap
+
+
+@pytest.mark.parametrize("placement", [SPIRAL, RANDOM])
+def test_cloud_words_stay_on_the_canvas_and_never_overlap(placement):
+    rng = random.Random(0)
+    words = [f"word{k}" for k in range(120)]
+    word_sizes = {word: (rng.randint(40, 400), rng.randint(30, 130)) for word in words}
+
+    layout_data = place_word_cloud(words, word_sizes, 1920, 1080, 5, placement=placement, seed=0)
+
+    assert layout_data
+    # Records hold the center and the unrotated size of each word
+    sizes = [(item['width'], item['height']) for item in layout_data]
+    placements = []
+    for item in layout_data:
+        rotated = item['rotation'] == 90
+        width, height = (item['height'], item['width']) if rotated else (item['width'], item['height'])
+        placements.append((item['x'] - width / 2, item['y'] - height / 2, rotated))
+    assert_inside_without_overlap(boxes(sizes, placements), 1920, 1080)
+
+
+def test_spiral_cloud_starts_at_the_center():
+    layout_data = place_word_cloud(["center"], {"center": (100, 50)}, 1000, 1000, 0, seed=0,
+                                   rotation_chance=0)
+
+    assert abs(layout_data[0]['x'] - 500) <= 60 and abs(layout_data[0]['y'] - 500) <= 60
+
+
+def test_more_frequent_words_are_bigger():
+    scales = frequency_scales(["a", "b", "a", "c", "a", "b"])
+
+    assert list(scales) == ["a", "b", "c"]
+    assert scales["a"] > scales["b"] > scales["c"]
@@ -0,0 +1,65 @@
+import string
+import unicodedata
+from functools import lru_cache
+
+# How many distinct words a cached_cleaner remembers
+DEFAULT_CLEAN_CACHE_SIZE = 65536
+
+# Typographic apostrophes and quotes that stand for a straight apostrophe
+APOSTROPHES = "’‘`ʼ′‛"
+
+# Dashes and other Unicode punctuation that string.punctuation does not cover
+EXTRA_PUNCTUATION = "–—―‐‑‒−“”„‟«»‹›…¡¿·•"
+
+# Built once: apostrophes become "'", every other punctuation character is removed
+_CLEAN_TABLE = str.maketrans(
+    {**{c: "'" for c in APOSTROPHES},
+     **{c: None for c in string.punctuation.replace("'", "") + EXTRA_PUNCTUATION}})
+
+
+def clean_word(word):
+    """
+    Cleans a word by standardizing apostrophes, converting to lowercase,
+    and removing other punctuation (including curly quotes and dashes).
+    """
+    # Fold compatibility characters (full-width letters, ligatures, ...) into
+    # their plain forms. Plain ASCII words skip this, they are already folded.
+    if not word.isascii():
+        word = unicodedata.normalize('NFKC', word)
+    return word.lower().translate(_CLEAN_TABLE)
+
+
+def clean_words(words):
+    """
+    Cleans a whole column of words in one pass. Each distinct word is only
+    cleaned once, however often it repeats.
+
+    Args:
+        words (iterable): The words to clean.
+
+    Returns:
+        list: The cleaned words, in the same order.
+    """
+    words = words if isinstance(words, list) else list(words)
+    cleaned = {word: clean_word(word) for word in set(words)}
+    return [cleaned[word] for word in words]
+
+
+def clean_word_lists(word_lists):
+    """
+    Cleans several lists of words (e.g. the words of each grouping) as one
+    batch with clean_words, and returns them split up the same way.
+    """
+    word_lists = [list(words) for words in word_lists]
+    cleaned = iter(clean_words(
+        [word for words in word_lists for word in words]))
+    return [[next(cleaned) for _ in words] for words in word_lists]
+
+
+def cached_cleaner(maxsize=DEFAULT_CLEAN_CACHE_SIZE):
+    """
+    Returns a memoized clean_word for cleaning words one at a time (e.g.
+    from a stream). At most maxsize distinct words are remembered, so memory
+    stays bounded on endless feeds.
+    """
+    return lru_cache(maxsize=maxsize)(clean_word)
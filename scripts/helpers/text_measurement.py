@@ -0,0 +1,125 @@
+import td
+try:
+    from helpers.text_metrics import default_metrics_cache
+    from helpers.font_metrics import GlyphMetrics, DEFAULT_CHARSET, glyph_metrics_path, load_glyph_metrics
+except ImportError:  # Running directly from the helpers folder
+    from text_metrics import default_metrics_cache
+    from font_metrics import GlyphMetrics, DEFAULT_CHARSET, glyph_metrics_path, load_glyph_metrics
+
+# How many Text TOP / Info CHOP pairs measure words side by side
+DEFAULT_MEASURE_POOL_SIZE = 64
+
+# Names of the temporary measuring operators
+MEASURE_TEXT_PREFIX = "temp_measure_text"
+MEASURE_INFO_PREFIX = "temp_measure_info"
+MEASURE_MERGE_NAME = "temp_measure_merge"
+
+
+def _measurement_pool(base_op, pool_size, font, typeface, size, resolution):
+    """
+    Returns pool_size (Text TOP, Info CHOP) pairs inside base_op, plus a Merge
+    CHOP fed by all the Info CHOPs, creating whatever does not exist yet.
+    """
+    pairs = []
+    for k in range(pool_size):
+        text_top = base_op.op(f"{MEASURE_TEXT_PREFIX}{k}") or base_op.create(
+            td.textTOP, f"{MEASURE_TEXT_PREFIX}{k}")
+        text_top.par.font = font
+        text_top.par.typeface = typeface
+        text_top.par.fontsizex = size
+        text_top.par.resolutionw = resolution[0]
+        text_top.par.resolutionh = resolution[1]
+
+        info_chop = base_op.op(f"{MEASURE_INFO_PREFIX}{k}") or base_op.create(
+            td.infoCHOP, f"{MEASURE_INFO_PREFIX}{k}")
+        info_chop.par.op = text_top
+        pairs.append((text_top, info_chop))
+
+    merge_chop = base_op.op(MEASURE_MERGE_NAME) or base_op.create(
+        td.mergeCHOP, MEASURE_MERGE_NAME)
+    merge_chop.setInputs([info_chop for _, info_chop in pairs])
+    return pairs, merge_chop
+
+
+def measure_words(words, base_op, font, typeface, size, resolution,
+                  pool_size=DEFAULT_MEASURE_POOL_SIZE, cache=None):
+    """
+    Measures the rendered pixel size of many strings at once.
+
+    The strings are deduplicated and looked up in the text-metrics cache
+    first. The rest are measured pool_size at a time: each one is loaded
+    into its own Text TOP of a pool, and a single forced cook of the Merge
+    CHOP that gathers the pool's Info CHOPs measures the whole batch.
+    New sizes are added to the cache and saved.
+
+    Args:
+        words (iterable): The strings to measure (duplicates are fine).
+        base_op (COMP): The component to create the temporary operators in.
+        font (str): The font name.
+        typeface (str): The typeface (e.g. "Regular").
+        size (float): The font size.
+        resolution (tuple): The (width, height) of the measuring Text TOPs; large
+                            enough not to clip the text.
+        pool_size (int): How many strings are measured per cook.
+        cache (TextMetricsCache): The cache to use, defaults to default_metrics_cache().
+
+    Returns:
+        dict: Each distinct string mapped to its (width, height).
+    """
+    cache = cache or default_metrics_cache()
+    sizes = {}
+    missing = []
+    for word in dict.fromkeys(words):  # Deduplicated, in first-seen order
+        dimensions = cache.get(font, typeface, size, word)
+        if dimensions is None:
+            missing.append(word)
+        else:
+            sizes[word] = dimensions
+    cache.hits += len(sizes)
+    cache.misses += len(missing)
+    if not missing:
+        return sizes
+
+    pairs, merge_chop = _measurement_pool(
+        base_op, min(pool_size, len(missing)), font, typeface, size, resolution)
+    for batch_start in range(0, len(missing), len(pairs)):
+        batch = missing[batch_start:batch_start + len(pairs)]
+        for word, (text_top, _) in zip(batch, pairs):
+            text_top.par.text = word
+        merge_chop.cook(force=True)  # Cooks every Info CHOP (and Text TOP) of the pool
+        for word, (_, info_chop) in zip(batch, pairs):
+            width = float(info_chop['text_width'])
+            height = float(info_chop['text_height'])
+            sizes[word] = (width, height)
+            if width or height:  # A failed measurement (0, 0) is retried next time
+                cache.put(font, typeface, size, word, width, height)
+
+    cache.save()
+    return sizes
+
+
+def destroy_measurement_pool(base_op):
+    """
+    Deletes the temporary operators created by measure_words.
+    """
+    for operator in base_op.findChildren(name=f"{MEASURE_TEXT_PREFIX}*") + \
+            base_op.findChildren(name=f"{MEASURE_INFO_PREFIX}*") + \
+            base_op.findChildren(name=MEASURE_MERGE_NAME):
+        operator.destroy()
+
+
+def glyph_metrics_for(base_op, font, typeface, size, resolution, charset=DEFAULT_CHARSET, rebuild=False):
+    """
+    Returns the GlyphMetrics of a font, building them from Text TOP
+    measurements (see GlyphMetrics.from_measurements) and storing them the
+    first time. After that they load without touching TouchDesigner, so
+    layout code can use them headless or in worker processes.
+    """
+    metrics = None if rebuild else load_glyph_metrics(font, typeface, size)
+    if metrics is None:
+        metrics = GlyphMetrics.from_measurements(
+            lambda strings: measure_words(strings, base_op, font, typeface, size, resolution),
+            font, typeface, size, charset)
+        destroy_measurement_pool(base_op)
+        metrics.save(glyph_metrics_path(font, typeface, size))
+    return metrics
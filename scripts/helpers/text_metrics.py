@@ -0,0 +1,135 @@
+import json
+import os
+from collections import OrderedDict
+try:
+    from helpers.disk_cache import cache_key
+except ImportError:  # Running directly from the helpers folder
+    from disk_cache import cache_key
+
+# Shared by every project on this machine, so words measured once are never measured again
+DEFAULT_METRICS_FOLDER = os.path.join(
+    os.path.expanduser('~'), '.td_text_metrics')
+
+# How many (font, typeface, size) tables are kept in memory at once
+DEFAULT_MAX_FONTS = 16
+
+METRICS_FILE_EXTENSION = '.json'
+
+
+class TextMetricsCache:
+    """
+    Remembers the rendered pixel size of strings, keyed by
+    (font, typeface, size, string), so each one only has to be measured
+    (cooked) once.
+
+    The sizes for one font, typeface and size are kept together in a table.
+    Tables live in memory in least-recently-used order (at most max_fonts of
+    them) and on disk as one JSON file per table in folder, so they survive
+    TouchDesigner restarts and are shared between projects.
+    """
+
+    def __init__(self, folder=DEFAULT_METRICS_FOLDER, max_fonts=DEFAULT_MAX_FONTS):
+        self.folder = folder
+        self.max_fonts = max_fonts
+        self._tables = OrderedDict()  # Font key -> {string: (width, height)}
+        self._dirty = {}  # Font key -> {string: (width, height)} not yet saved
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, font_key):
+        return os.path.join(self.folder, cache_key(*font_key) + METRICS_FILE_EXTENSION)
+
+    def _read_file(self, font_key):
+        try:
+            with open(self._path(font_key), 'r', encoding='utf-8') as f:
+                return {text: tuple(size) for text, size in json.load(f)['sizes'].items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            # A damaged file only costs a re-measure
+            print(f"Warning: Ignoring unreadable metrics file {self._path(font_key)} ({e})")
+            return {}
+
+    def _table(self, font, typeface, size):
+        """
+        Returns the in-memory table for a font, loading it from disk on first use.
+        """
+        font_key = (font, typeface, float(size))
+        table = self._tables.get(font_key)
+        if table is None:
+            table = self._read_file(font_key)
+            self._tables[font_key] = table
+            while len(self._tables) > self.max_fonts:
+                evicted_key, _ = self._tables.popitem(last=False)
+                self._save_table(evicted_key)
+        else:
+            self._tables.move_to_end(font_key)
+        return font_key, table
+
+    def get(self, font, typeface, size, text):
+        """
+        Returns the cached (width, height) of text, or None if it was never measured.
+        """
+        _, table = self._table(font, typeface, size)
+        return table.get(text)
+
+    def put(self, font, typeface, size, text, width, height):
+        """
+        Records the measured (width, height) of text. Call save() to write it to disk.
+        """
+        font_key, table = self._table(font, typeface, size)
+        table[text] = (float(width), float(height))
+        self._dirty.setdefault(font_key, {})[text] = table[text]
+
+    def measure(self, font, typeface, size, text, measure_function):
+        """
+        Returns the (width, height) of text, calling measure_function(text)
+        only when it is not cached yet.
+        """
+        dimensions = self.get(font, typeface, size, text)
+        if dimensions is not None:
+            self.hits += 1
+            return dimensions
+        self.misses += 1
+        width, height = measure_function(text)
+        if width or height:  # A failed measurement (0, 0) is retried next time
+            self.put(font, typeface, size, text, width, height)
+        return width, height
+
+    def _save_table(self, font_key):
+        pending = self._dirty.pop(font_key, None)
+        if not pending:
+            return
+        # Merge with the file as it is now, another session may have added to it
+        sizes = self._read_file(font_key)
+        sizes.update(pending)
+        os.makedirs(self.folder, exist_ok=True)
+        path = self._path(font_key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        font, typeface, size = font_key
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'font': font, 'typeface': typeface, 'size': size,
+                       'sizes': {text: list(dims) for text, dims in sizes.items()}},
+                      f, ensure_ascii=False)
+        os.replace(temp_path, path)  # Readers never see a half-written file
+
+    def save(self):
+        """
+        Writes every newly measured size to disk.
+        """
+        for font_key in list(self._dirty):
+            self._save_table(font_key)
+
+
+_default_cache = None
+
+
+def default_metrics_cache():
+    """
+    Returns the TextMetricsCache shared by every script in this Python
+    session (TouchDesigner keeps imported helpers loaded between runs).
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = TextMetricsCache()
+    return _default_cache
@@ -0,0 +1,113 @@
+from array import array
+try:
+    from helpers.text_cleaning import clean_word
+    from helpers.streaming import iter_json_records
+except ImportError:  # Running directly from the helpers folder
+    from text_cleaning import clean_word
+    from streaming import iter_json_records
+
+
+class Transcript:
+    """
+    A compact, column-oriented word-level transcript.
+
+    Instead of one dictionary per word, the transcript keeps a few flat
+    columns: an interned ID for each cleaned word (what the aligners compare),
+    an interned ID for each original spelling (what gets displayed), and the
+    start and end times as arrays of doubles. A word costs 24 bytes
+    plus its share of the vocabulary.
+    """
+
+    __slots__ = ('token_ids', 'spelling_ids', 'starts', 'ends',
+                 'tokens', 'spellings', '_token_lookup', '_spelling_lookup', '_spelling_tokens')
+
+    def __init__(self):
+        self.token_ids = array('i')  # Cleaned word ID per transcript word
+        self.spelling_ids = array('i')  # Original spelling ID per transcript word
+        self.starts = array('d')  # Start time per transcript word, in seconds
+        self.ends = array('d')  # End time per transcript word, in seconds
+        self.tokens = []  # Cleaned word for each token ID
+        self.spellings = []  # Original spelling for each spelling ID
+        self._token_lookup = {}
+        self._spelling_lookup = {}
+        self._spelling_tokens = array('i')  # Token ID for each spelling ID
+
+    @classmethod
+    def from_json(cls, transcript_file_path):
+        """
+        Builds a transcript straight from a transcript JSON (or JSON Lines)
+        file. Word objects are streamed into the columns one at a time (see
+        iter_json_records), so neither the file text nor a list of
+        dictionaries is ever held in memory.
+        """
+        return cls.from_records(iter_json_records(transcript_file_path))
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds a transcript from an iterable of word dictionaries with "word", "start" and "end".
+        """
+        transcript = cls()
+        for record in records:
+            transcript.append(record['word'], record['start'], record['end'])
+        return transcript
+
+    def append(self, word, start, end):
+        """
+        Adds one word to the end of the transcript.
+        """
+        spelling_id = self._spelling_lookup.get(word)
+        if spelling_id is None:
+            # A new spelling, so clean it once and intern both forms
+            spelling_id = len(self.spellings)
+            self._spelling_lookup[word] = spelling_id
+            self.spellings.append(word)
+            self._spelling_tokens.append(self._intern_token(clean_word(word)))
+        self.spelling_ids.append(spelling_id)
+        self.token_ids.append(self._spelling_tokens[spelling_id])
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def __len__(self):
+        return len(self.token_ids)
+
+    def word(self, word_index):
+        """
+        Returns the original spelling of a transcript word.
+        """
+        return self.spellings[self.spelling_ids[word_index]]
+
+    def cleaned_word(self, word_index):
+        """
+        Returns the cleaned form of a transcript word.
+        """
+        return self.tokens[self.token_ids[word_index]]
+
+    def span_times(self, first_word_index, last_word_index):
+        """
+        Returns the (start, end) time of the words first_word_index..last_word_index, inclusive.
+        """
+        return self.starts[first_word_index], self.ends[last_word_index]
+
+    def time_slice(self, first_word_index, end_word_index):
+        """
+        Returns zero-copy views of the start and end times of the words
+        first_word_index..end_word_index - 1.
+        """
+        return (memoryview(self.starts)[first_word_index:end_word_index],
+                memoryview(self.ends)[first_word_index:end_word_index])
+
+    def encode(self, cleaned_words):
+        """
+        Converts cleaned words into token IDs that can be compared with
+        token_ids. Words that never occur in the transcript get -1.
+        """
+        return array('i', [self._token_lookup.get(word, -1) for word in cleaned_words])
+
+    def _intern_token(self, token):
+        token_id = self._token_lookup.get(token)
+        if token_id is None:
+            token_id = len(self.tokens)
+            self._token_lookup[token] = token_id
+            self.tokens.append(token)
+        return token_id
@@ -0,0 +1,261 @@
+"""
+Word-cloud placement: every word goes to the free spot of an occupancy grid
+closest to a target point (the canvas center, or a random point), so words
+never overlap. The output is the layout_data the packers produce too (see
+rectangle_packing.create_layout_from_data).
+
+The candidate tests are vectorized without NumPy. The helpers only use the
+standard library, so they run in TouchDesigner's Python and headless with
+nothing to install. Each grid row is therefore one Python integer used as a
+bit set (see OccupancyGrid). A few shifts and ANDs on it test every column of
+the row at once, the work a NumPy boolean array would do, and Python's big
+integers keep it exact for canvases of any width.
+"""
+import heapq
+import math
+import random
+from collections import Counter
+
+# Placement modes
+SPIRAL = "spiral"  # Each word goes to the free spot closest to the canvas center
+RANDOM = "random"  # Each word goes to the free spot closest to a random point
+
+DEFAULT_PLACEMENT = SPIRAL
+DEFAULT_CELL_SIZE = 4  # Grid resolution in pixels; word boxes are rounded up to whole cells
+DEFAULT_ROTATION_CHANCE = 0.25  # Share of words turned by 90 degrees
+
+# Word scales for frequency-sized clouds (see frequency_scales)
+DEFAULT_MIN_SCALE = 0.25
+DEFAULT_MAX_SCALE = 1.0
+
+
+class OccupancyGrid:
+    """
+    A uniform grid of cell_size pixel cells over the canvas that records
+    which cells are covered by placed words.
+
+    Each grid row is stored as one Python integer used as a bit set (bit c
+    set = column c occupied), so every test works on a whole row of cells
+    with a handful of big-integer operations instead of comparing the
+    candidate with each placed word: finding every spot a box fits in costs
+    a few operations per row, independent of how many words are placed.
+    """
+
+    def __init__(self, canvas_width, canvas_height, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size)
+        self.columns = int(canvas_width // cell_size)
+        self.rows = int(canvas_height // cell_size)
+        self.occupied = [0] * self.rows
+        self._full_row = (1 << self.columns) - 1
+        self._run_cache = [{} for _ in range(self.rows)]  # Row -> {box columns: start mask}
+        # (box columns, box rows, target) -> heap of (lower bound of the distance, row), see closest_free_spot
+        self._row_heaps = {}
+        self._unfit_shapes = []  # Boxes that fit nowhere; so does any box at least as big
+
+    def _starts_in_row(self, row, box_columns):
+        """
+        Returns a bit set of the columns where box_columns free cells in a
+        row begin (cached until the row changes).
+        """
+        cache = self._run_cache[row]
+        starts = cache.get(box_columns)
+        if starts is None:
+            # Bit c survives only if bits c .. c + box_columns - 1 are all free
+            starts = self._full_row & ~self.occupied[row]
+            covered = 1
+            while covered < box_columns and starts:
+                shift = min(covered, box_columns - covered)
+                starts &= starts >> shift
+                covered += shift
+            cache[box_columns] = starts
+        return starts
+
+    def free_starts(self, top_row, box_columns, box_rows):
+        """
+        Returns a bit set of the columns where a box of box_columns x box_rows
+        cells fits with its top-left cell in top_row.
+        """
+        starts = self._full_row
+        for row in range(top_row, top_row + box_rows):
+            starts &= self._starts_in_row(row, box_columns)
+            if not starts:
+                break
+        return starts
+
+    def occupy(self, left_column, top_row, box_columns, box_rows):
+        bits = ((1 << box_columns) - 1) << left_column
+        for row in range(top_row, top_row + box_rows):
+            self.occupied[row] |= bits
+            self._run_cache[row] = {}
+
+    def _nearest_in_row(self, row, box_columns, box_rows, want_column, want_row, nearest_column):
+        """
+        Returns (squared distance, column) of the free start in row nearest to
+        (want_column, want_row), or None if the box fits nowhere in that row.
+        """
+        starts = self.free_starts(row, box_columns, box_rows)
+        if not starts:
+            return None
+        best = None
+        above = starts >> nearest_column
+        if above:
+            column = nearest_column + (above & -above).bit_length() - 1
+            best = ((column - want_column) ** 2 + (row - want_row) ** 2, column)
+        lower = starts & ((1 << nearest_column) - 1)
+        if lower:
+            column = lower.bit_length() - 1
+            candidate = ((column - want_column) ** 2 + (row - want_row) ** 2, column)
+            if best is None or candidate < best:
+                best = candidate
+        return best
+
+    def closest_free_spot(self, box_columns, box_rows, target_column, target_row, remember=False):
+        """
+        Returns the (column, row) of the top-left cell of the free spot for a
+        box whose center is closest to (target_column, target_row), or None if
+        the box fits nowhere.
+
+        Rows are searched outward from the target until no nearer spot can
+        exist. With remember=True (for a target that is used again and again,
+        like the canvas center) the search keeps a heap of each row's last
+        known nearest distance for this box and target instead. Cells only
+        ever fill up, so those distances can only grow: they are lower bounds,
+        and only the rows at the top of the heap have to be looked at again.
+        """
+        last_top_row = self.rows - box_rows
+        if box_columns > self.columns or last_top_row < 0:
+            return None
+        if any(box_columns >= columns and box_rows >= rows for columns, rows in self._unfit_shapes):
+            return None
+        # Target for the top-left cell rather than the center
+        want_column = target_column - box_columns / 2
+        want_row = target_row - box_rows / 2
+        nearest_column = min(max(int(round(want_column)), 0), self.columns - 1)
+
+        if remember:
+            key = (box_columns, box_rows, target_column, target_row)
+            heap = self._row_heaps.get(key)
+            if heap is None:
+                heap = [(found[0], row) for row in range(last_top_row + 1)
+                        for found in [self._nearest_in_row(row, box_columns, box_rows, want_column,
+                                                           want_row, nearest_column)] if found]
+                heapq.heapify(heap)
+                self._row_heaps[key] = heap
+            while heap:
+                bound, row = heap[0]
+                found = self._nearest_in_row(row, box_columns, box_rows, want_column, want_row, nearest_column)
+                if found is None:
+                    heapq.heappop(heap)  # The box will never fit in this row again
+                elif found[0] <= bound:
+                    return (found[1], row)  # No other row can have a nearer spot
+                else:
+                    heapq.heapreplace(heap, (found[0], row))
+            self._unfit_shapes.append((box_columns, box_rows))
+            return None
+
+        first_row = min(max(int(round(want_row)), 0), last_top_row)
+        best = None
+        best_distance = float('inf')
+        for offset in range(max(first_row, last_top_row - first_row) + 1):
+            rows_at_offset = (first_row - offset, first_row + offset) if offset else (first_row,)
+            if min(abs(r - want_row) for r in rows_at_offset) ** 2 >= best_distance:
+                break
+            for row in rows_at_offset:
+                if 0 <= row <= last_top_row:
+                    found = self._nearest_in_row(row, box_columns, box_rows, want_column,
+                                                 want_row, nearest_column)
+                    if found is not None and found[0] < best_distance:
+                        best_distance, best = found[0], (found[1], row)
+        if best is None:
+            self._unfit_shapes.append((box_columns, box_rows))
+        return best
+
+
+def frequency_scales(words, min_scale=DEFAULT_MIN_SCALE, max_scale=DEFAULT_MAX_SCALE):
+    """
+    Counts the words and gives each distinct word a scale between min_scale
+    and max_scale by the logarithm of how often it occurs.
+
+    Returns:
+        dict: word -> scale, most frequent first.
+    """
+    counts = Counter(words)
+    if not counts:
+        return {}
+    lowest = math.log(min(counts.values()))
+    spread = math.log(max(counts.values())) - lowest
+    return {word: min_scale + (max_scale - min_scale) * ((math.log(count) - lowest) / spread if spread else 1.0)
+            for word, count in counts.most_common()}
+
+
+def place_word_cloud(words, word_sizes, canvas_width, canvas_height, padding,
+                     placement=DEFAULT_PLACEMENT, scales=None, seed=None,
+                     rotation_chance=DEFAULT_ROTATION_CHANCE, cell_size=DEFAULT_CELL_SIZE):
+    """
+    Places words free-form on a canvas, word-cloud style. Words are placed
+    biggest first, each at the free spot closest to the canvas center
+    (SPIRAL, the spot walking a spiral outward from the center would find)
+    or closest to a random point (RANDOM), so words never overlap. Free
+    spots are found on an OccupancyGrid.
+
+    Args:
+        words (list): The words to place.
+        word_sizes (dict): word -> (width, height) at scale 1, e.g. from measure_words.
+        canvas_width, canvas_height (float): The canvas size.
+        padding (float): Space kept to the right of and below every word.
+        placement (str): SPIRAL or RANDOM.
+        scales (dict): word -> scale (e.g. from frequency_scales), defaults to 1 for all.
+        seed: Seed for the random choices, so the same input always gives the same cloud.
+        rotation_chance (float): The share of words turned by 90 degrees.
+        cell_size (float): The grid resolution in pixels. Smaller packs tighter but is slower.
+
+    Returns:
+        list: layout_data records (see packing.pack_words) for the placed words, in input order.
+    """
+    if placement not in (SPIRAL, RANDOM):
+        raise ValueError(f"Unknown placement mode '{placement}'")
+    rng = random.Random(seed)
+    scales = scales or {}
+    grid = OccupancyGrid(canvas_width, canvas_height, cell_size)
+
+    boxes = []  # (columns, rows, rotated) of each word's box, padding included
+    for word in words:
+        width, height = word_sizes[word]
+        scale = scales.get(word, 1.0)
+        rotated = rng.random() < rotation_chance
+        box_width, box_height = width * scale + padding, height * scale + padding
+        if rotated:
+            box_width, box_height = box_height, box_width
+        boxes.append((math.ceil(box_width / cell_size), math.ceil(box_height / cell_size), rotated))
+
+    order = sorted(range(len(words)), key=lambda k: boxes[k][0] * boxes[k][1], reverse=True)
+    positions = [None] * len(words)
+    for k in order:
+        box_columns, box_rows, _ = boxes[k]
+        if placement == SPIRAL:
+            target = (grid.columns / 2, grid.rows / 2)
+        else:
+            target = (rng.random() * grid.columns, rng.random() * grid.rows)
+        spot = grid.closest_free_spot(box_columns, box_rows, *target, remember=placement == SPIRAL)
+        if spot is not None:
+            grid.occupy(spot[0], spot[1], box_columns, box_rows)
+            positions[k] = spot
+
+    layout_data = []
+    for word, position, (_, _, rotated) in zip(words, positions, boxes):
+        if position is None:
+            print(f"Warning: Word '{word}' found no free spot on the canvas. Skipping.")
+            continue
+        scale = scales.get(word, 1.0)
+        width, height = word_sizes[word][0] * scale, word_sizes[word][1] * scale
+        box_width, box_height = (height, width) if rotated else (width, height)
+        layout_data.append({
+            'word': word,
+            'x': position[0] * cell_size + box_width / 2,
+            'y': position[1] * cell_size + box_height / 2,
+            'rotation': 90 if rotated else 0,
+            'width': width,
+            'height': height,
+            'scale': scale
+        })
+    return layout_data